@@ -0,0 +1,222 @@
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from game_log_store import ingest_game_logs
+from head_to_head import predict_winners_batch
+from miya_metrics import build_metrics_table
+from team_names import TeamNameResolver
+from team_table import TeamTable
+from torvik_cache import load_torvik_data
+
+# Layout of one archived season:
+#   archive/<year>/torvik_data_<year>.xlsx   Torvik team results (or just its binary cache)
+#   archive/<year>/team_data/<Team>.csv      Evan Miya game logs
+#   archive/<year>/tournament_results.csv    NCAA tournament games: team_1, team_2, winner
+ARCHIVE_DIR = 'archive'
+
+def season_paths(year, archive_dir=ARCHIVE_DIR):
+    season_dir = os.path.join(archive_dir, str(year))
+    return {
+        'torvik': os.path.join(season_dir, f'torvik_data_{year}.xlsx'),
+        'team_data': os.path.join(season_dir, 'team_data'),
+        'results': os.path.join(season_dir, 'tournament_results.csv'),
+    }
+
+def available_seasons(archive_dir=ARCHIVE_DIR):
+    """
+    Years in the archive that have tournament results
+    """
+    if not os.path.isdir(archive_dir):
+        return []
+    years = [d for d in os.listdir(archive_dir) if d.isdigit()]
+    return sorted(int(y) for y in years if os.path.exists(season_paths(y, archive_dir)['results']))
+
+def evaluate_predictions(probabilities, outcomes, bins=10):
+    """
+    Scoring of win probabilities against actual outcomes
+
+    Args:
+        probabilities (array-like): Predicted probability that team_1 wins
+        outcomes (array-like): 1 if team_1 won, else 0
+        bins (int): Number of equal-width calibration bins
+    Returns:
+        dict: games, brier, log_loss, accuracy and a calibration list of
+        {bin_low, bin_high, games, mean_predicted, observed} entries
+    """
+    p = np.asarray(probabilities, dtype=float)
+    y = np.asarray(outcomes, dtype=float)
+    clipped = np.clip(p, 1e-15, 1 - 1e-15)
+
+    edges = np.linspace(0, 1, bins + 1)
+    which = np.clip(np.digitize(p, edges[1:-1]), 0, bins - 1)
+    counts = np.bincount(which, minlength=bins)
+    predicted = np.bincount(which, weights=p, minlength=bins)
+    observed = np.bincount(which, weights=y, minlength=bins)
+    calibration = [
+        {
+            'bin_low': float(edges[b]),
+            'bin_high': float(edges[b + 1]),
+            'games': int(counts[b]),
+            'mean_predicted': float(predicted[b] / counts[b]),
+            'observed': float(observed[b] / counts[b]),
+        }
+        for b in range(bins) if counts[b] > 0
+    ]
+
+    return {
+        'games': int(len(p)),
+        'brier': float(np.mean((p - y) ** 2)) if len(p) else float('nan'),
+        'log_loss': float(-np.mean(y * np.log(clipped) + (1 - y) * np.log(1 - clipped))) if len(p) else float('nan'),
+        'accuracy': float(np.mean((p > 0.5) == (y == 1))) if len(p) else float('nan'),
+        'calibration': calibration,
+    }
+
+def tournament_field(store, results):
+    """
+    The season's tournament teams (every team_1/team_2 in its results), as the game
+    log file names that head_to_head uses for the WORTH field. Names are matched to
+    the files exactly (St./State, underscores, ...); unmatched names keep their own
+    spelling with underscores
+    """
+    files = list(store.teams)
+    resolver = TeamNameResolver([team.replace('_', ' ') for team in files])
+    field = set()
+    for name in pd.concat([results['team_1'], results['team_2']]).astype(str).unique():
+        team_id = resolver.resolve_id(name)
+        field.add(files[team_id] if team_id is not None else name.replace(' ', '_'))
+    return field
+
+def load_season(year, archive_dir=ARCHIVE_DIR):
+    """
+    TeamTable (Torvik data plus MIYA metrics) and tournament results of an archived
+    season. WORTH is computed against that season's tournament field, as for the
+    live bracket, not against every team with a game log
+    """
+    paths = season_paths(year, archive_dir)
+    torvik = load_torvik_data(paths['torvik'])
+    results = pd.read_csv(paths['results'])
+    store = ingest_game_logs(paths['team_data'])
+    teams = list(store.teams)
+    table = TeamTable(torvik, build_metrics_table(teams, store.game_log, tournament_field(store, results)))
+    return table, results
+
+def season_games(table, results):
+    """
+    Tournament games resolved through the table's names. team_1, team_2 and winner
+    are matched exactly (St./State, underscores, ...), never fuzzily. Games with an
+    unknown team are skipped, and so are games whose winner is neither team (with a
+    warning) rather than being recorded as a team_1 loss
+
+    Returns:
+        tuple: (team1 ids, team2 ids, outcomes (1 if team_1 won, else 0), skipped
+        [team_1, team_2] pairs)
+    """
+    team1_ids, team2_ids, outcomes, skipped = [], [], [], []
+    for team1, team2, winner in results[['team_1', 'team_2', 'winner']].astype(str).itertuples(index=False):
+        i = table.lookup(team1)
+        j = table.lookup(team2)
+        if i is None or j is None:
+            skipped.append([team1, team2])
+            continue
+        winner_id = table.lookup(winner)
+        if winner_id not in (i, j):
+            print(f"Warning: winner '{winner}' of {team1} vs {team2} matches neither team, skipping the game")
+            skipped.append([team1, team2])
+            continue
+        team1_ids.append(i)
+        team2_ids.append(j)
+        outcomes.append(1.0 if winner_id == i else 0.0)
+    return np.array(team1_ids, dtype=np.intp), np.array(team2_ids, dtype=np.intp), np.array(outcomes), skipped
+
+def backtest_season(year, archive_dir=ARCHIVE_DIR):
+    """
+    Replay one season's tournament games through the model in a single batch
+
+    Returns:
+        dict: year, probabilities, outcomes, skipped games and the season's scores
+    """
+    table, results = load_season(year, archive_dir)
+    team1_ids, team2_ids, outcomes, skipped = season_games(table, results)
+    probabilities = predict_winners_batch(team1_ids, team2_ids, table=table)['team1_win_probability']
+
+    return {
+        'year': year,
+        'probabilities': probabilities,
+        'outcomes': outcomes,
+        'skipped': skipped,
+        'scores': evaluate_predictions(probabilities, outcomes),
+    }
+
+def _backtest_season(args):
+    year, archive_dir = args
+    try:
+        return backtest_season(year, archive_dir)
+    except Exception as e:
+        return {'year': year, 'error': str(e)}
+
+def run_backtest(years, archive_dir=ARCHIVE_DIR, workers=None):
+    """
+    Backtest every season on a process pool (seasons are independent)
+
+    Returns:
+        tuple: (list of per-season results, overall scores across all seasons)
+    """
+    tasks = [(year, archive_dir) for year in years]
+    if workers == 1 or len(tasks) <= 1:
+        seasons = list(map(_backtest_season, tasks))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            seasons = list(pool.map(_backtest_season, tasks))
+
+    scored = [s for s in seasons if 'error' not in s]
+    probabilities = np.concatenate([s['probabilities'] for s in scored]) if scored else np.empty(0)
+    outcomes = np.concatenate([s['outcomes'] for s in scored]) if scored else np.empty(0)
+    return seasons, evaluate_predictions(probabilities, outcomes)
+
+# Example usage
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backtest predict_winner on archived NCAA tournaments")
+    parser.add_argument('years', nargs='*', type=int, help="Seasons to backtest (default: all in the archive)")
+    parser.add_argument('--archive-dir', default=ARCHIVE_DIR)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--output', help="Optional JSON file for the full report, including calibration curves")
+    args = parser.parse_args()
+
+    years = args.years or available_seasons(args.archive_dir)
+    if not years:
+        print(f"No archived seasons with tournament results found in {args.archive_dir}")
+        raise SystemExit(1)
+
+    seasons, overall = run_backtest(years, args.archive_dir, args.workers)
+
+    print(f"{'Season':8} {'Games':>6} {'Brier':>8} {'LogLoss':>8} {'Accuracy':>9}")
+    for season in seasons:
+        if 'error' in season:
+            print(f"{season['year']:<8} Error: {season['error']}")
+            continue
+        scores = season['scores']
+        print(f"{season['year']:<8} {scores['games']:>6} {scores['brier']:>8.4f} {scores['log_loss']:>8.4f} {scores['accuracy']:>9.1%}")
+        for team_1, team_2 in season['skipped']:
+            print(f"  Skipped {team_1} vs {team_2}: team not found in data")
+    print(f"{'Overall':8} {overall['games']:>6} {overall['brier']:>8.4f} {overall['log_loss']:>8.4f} {overall['accuracy']:>9.1%}")
+
+    print("\nCalibration (overall):")
+    for row in overall['calibration']:
+        print(f"  {row['bin_low']:.1f}-{row['bin_high']:.1f}: {row['games']:>4} games, "
+              f"predicted {row['mean_predicted']:.1%}, observed {row['observed']:.1%}")
+
+    if args.output:
+        report = {
+            'seasons': [
+                {'year': s['year'], 'error': s['error']} if 'error' in s else
+                {'year': s['year'], 'skipped': s['skipped'], **s['scores']}
+                for s in seasons
+            ],
+            'overall': overall,
+        }
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nReport saved to {args.output}")
@@ -1,60 +1,165 @@
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import StringIO
 import pandas as pd
 import requests
-from io import StringIO
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from torvik_cache import cache_paths, project_columns, source_info, write_cache
+
+BASE_URL = "http://barttorvik.com"
+
+# Raw responses plus their ETag/Last-Modified validators, used for conditional requests
+RESPONSE_CACHE_DIR = ".torvik_http_cache"
+
+def make_session(pool_size=4, retries=3, backoff=0.5):
+    """
+    Pooled session that keeps connections alive across requests and retries
+    transient failures (connection errors, 429 and 5xx) with exponential backoff
+    """
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset(['GET']),
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+def fetch_season_csv(year, session, base_url=BASE_URL, cache_dir=RESPONSE_CACHE_DIR, timeout=30):
+    """
+    Download a season's team results CSV, revalidating any cached copy with
+    If-None-Match / If-Modified-Since so unchanged data is not downloaded again
+
+    Returns:
+        tuple: (csv text, validators dict, True if the payload changed since the last fetch)
+    """
+    url = f"{base_url}/{year}_team_results.csv"
+    body_path = os.path.join(cache_dir, f"{year}_team_results.csv")
+    meta_path = body_path + '.json'
+
+    cached = None
+    headers = {}
+    if os.path.exists(body_path) and os.path.exists(meta_path):
+        with open(meta_path) as f:
+            cached = json.load(f)
+        if cached.get('etag'):
+            headers['If-None-Match'] = cached['etag']
+        if cached.get('last_modified'):
+            headers['If-Modified-Since'] = cached['last_modified']
+
+    response = session.get(url, headers=headers, timeout=timeout)
+    if response.status_code == 304 and cached is not None:
+        with open(body_path, encoding='utf-8') as f:
+            return f.read(), cached, False
+    response.raise_for_status()
+
+    validators = {
+        'url': url,
+        'etag': response.headers.get('ETag'),
+        'last_modified': response.headers.get('Last-Modified'),
+    }
+    os.makedirs(cache_dir, exist_ok=True)
+    with open(body_path, 'w', encoding='utf-8') as f:
+        f.write(response.text)
+    with open(meta_path, 'w') as f:
+        json.dump(validators, f)
+    return response.text, validators, True
+
+def parse_torvik_csv(text):
+    """
+    Parse Torvik's team results CSV and split the record into wins and losses
+    """
+    # Read CSV with explicit parsing parameters
+    df = pd.read_csv(
+        StringIO(text),
+        sep=',',              # Explicit comma separator
+        quoting=3,            # No special quoting
+        skipinitialspace=True # Skip spaces after separators
+    )
 
-def fetch_torvik_data(year):
-    url = f"http://barttorvik.com/{year}_team_results.csv"
-    
     try:
-        response = requests.get(url)
-        response.raise_for_status()
-        
-        # Print first few lines of raw data for debugging
-        print("Raw data sample:")
-        print(response.text[:500])
-        
-        # Read CSV with explicit parsing parameters
-        df = pd.read_csv(
-            StringIO(response.text),
-            sep=',',              # Explicit comma separator
-            quoting=3,            # No special quoting
-            skipinitialspace=True # Skip spaces after separators
-        )
-        
-        # Print raw dataframe to verify column alignment
-        print("\nRaw DataFrame head:")
-        print(df.head())
-        
-        try:
-            # Now process the correctly loaded data
-            df['record'] = df['record'].astype(str)
-            df[['wins', 'losses']] = df['record'].str.extract(r'(\d+)-(\d+)')
-            df['wins'] = pd.to_numeric(df['wins'])
-            df['losses'] = pd.to_numeric(df['losses'])
-            
-            print("\nProcessed data sample:")
-            print(df[['rank', 'team', 'conf', 'record', 'wins', 'losses']].head())
-            
-        except Exception as e:
-            print(f"Error processing record data: {e}")
-            raise
-        
-        return df
-    
+        df['record'] = df['record'].astype(str)
+        df[['wins', 'losses']] = df['record'].str.extract(r'(\d+)-(\d+)')
+        df['wins'] = pd.to_numeric(df['wins'])
+        df['losses'] = pd.to_numeric(df['losses'])
+    except Exception as e:
+        print(f"Error processing record data: {e}")
+        raise
+
+    return df
+
+def fetch_torvik_data(year, session=None, base_url=BASE_URL, cache_dir=RESPONSE_CACHE_DIR):
+    """
+    Full Torvik team results for one season (None if the request failed)
+    """
+    session = session or make_session()
+    try:
+        text, _, _ = fetch_season_csv(year, session, base_url, cache_dir)
+        return parse_torvik_csv(text)
     except requests.RequestException as e:
         print(f"Error fetching data for year {year}: {e}")
         return None
 
+def season_file(year, output_dir='.'):
+    """
+    Path the season is known by (torvik_data_<year>.xlsx); its binary cache sits next to it
+    """
+    return os.path.join(output_dir, f"torvik_data_{year}.xlsx")
+
+def fetch_seasons(years, workers=4, base_url=BASE_URL, cache_dir=RESPONSE_CACHE_DIR, output_dir='.', force=False, excel=False):
+    """
+    Fetch several seasons concurrently (at most workers requests in flight, over one
+    pooled session) and write each changed season straight to the binary Torvik cache.
+    With excel, the full sheet is also exported to torvik_data_<year>.xlsx
+
+    Returns:
+        dict: year -> 'updated', 'unchanged' or an error message
+    """
+    session = make_session(pool_size=workers)
+
+    def fetch_one(year):
+        try:
+            text, validators, changed = fetch_season_csv(year, session, base_url, cache_dir)
+            path = season_file(year, output_dir)
+            written = os.path.exists(cache_paths(path)[0]) and (not excel or os.path.exists(path))
+            if not changed and not force and written:
+                return year, 'unchanged'
+            df = parse_torvik_csv(text)
+            source = dict(validators)
+            if excel:
+                # Export before the cache is stamped so the xlsx is not newer than the
+                # fetch, and record its signature in case it is touched later
+                df.to_excel(path, index=False)
+                source.update(source_info(path))
+            write_cache(project_columns(df), path, {**source, 'fetched_at': time.time_ns()})
+            return year, 'updated'
+        except Exception as e:
+            return year, f"error: {e}"
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return dict(pool.map(fetch_one, years))
+
 # Example usage
 if __name__ == "__main__":
-    df = fetch_torvik_data(2025)
-    
-    if df is not None:
-        print("\nSaving data to Excel...")
-        output_file = f"torvik_data_2025.xlsx"
-        df.to_excel(output_file, index=False)
-        print(f"Data saved to {output_file}")
-        
-        # Display final summary
-        print("\nFinal data shape:", df.shape)
-        print("\nColumns in final dataset:", ', '.join(df.columns))
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Fetch Torvik team results into the binary Torvik cache")
+    parser.add_argument('--start', type=int, default=2025, help="First season to fetch")
+    parser.add_argument('--end', type=int, help="Last season to fetch (defaults to --start)")
+    parser.add_argument('--workers', type=int, default=4, help="Maximum concurrent requests")
+    parser.add_argument('--base-url', default=BASE_URL, help="Server to fetch from (e.g. a local mirror)")
+    parser.add_argument('--force', action='store_true', help="Rewrite seasons even if unchanged")
+    parser.add_argument('--excel', action='store_true', help="Also export each season to torvik_data_<year>.xlsx")
+    args = parser.parse_args()
+
+    years = range(args.start, (args.end or args.start) + 1)
+    statuses = fetch_seasons(years, args.workers, args.base_url, force=args.force, excel=args.excel)
+    for year, status in statuses.items():
+        print(f"{year}: {status}")
+        if args.excel and status == 'updated':
+            print(f"Data saved to {season_file(year)}")
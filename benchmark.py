@@ -0,0 +1,273 @@
+import argparse
+import inspect
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+import numpy as np
+import pandas as pd
+import head_to_head
+from team_dictionary import get_teams_dictionary
+
+# Stages added after the baseline are timed only when the checked-out tree has them,
+# so the benchmark also runs on older commits for --compare
+try:
+    from game_log_store import ingest_game_logs
+except ImportError:
+    ingest_game_logs = None
+try:
+    from team_table import TeamTable
+except ImportError:
+    TeamTable = None
+try:
+    from torvik_cache import cache_paths
+except ImportError:
+    cache_paths = None
+
+# Benchmark scales: teams in the league, games per team, matchups to predict
+SCALES = {
+    'field': {'teams': 68, 'games': 35, 'matchups': 63},
+    'medium': {'teams': 180, 'games': 35, 'matchups': 1000},
+    'd1': {'teams': 360, 'games': 35, 'matchups': 10000},
+}
+
+CONFERENCES = ['ACC', 'B10', 'B12', 'BE', 'SEC', 'MWC', 'WCC', 'A10', 'Amer', 'MVC']
+
+def generate_league(output_dir, n_teams=68, n_games=35, n_matchups=63, seed=0):
+    """
+    Write a synthetic league in the repo's input formats: a Torvik sheet
+    (torvik_data_2025.xlsx), one Miya game log per team in team_data/ and matchups.xlsx.
+    Team strength drives the efficiencies and game results so metrics are realistic
+    """
+    rng = np.random.default_rng(seed)
+    names = [f"Team {i:03d}" for i in range(n_teams)]
+    strength = rng.normal(0, 1, n_teams)
+    adjoe = 108 + 6 * strength + rng.normal(0, 2, n_teams)
+    adjde = 102 - 5 * strength + rng.normal(0, 2, n_teams)
+    adjt = rng.normal(67.5, 3, n_teams)
+    rank = np.empty(n_teams, dtype=int)
+    rank[np.argsort(-strength)] = np.arange(1, n_teams + 1)
+
+    os.makedirs(os.path.join(output_dir, 'team_data'), exist_ok=True)
+    dates = pd.date_range('2024-11-04', '2025-03-16', periods=n_games).strftime('%Y-%m-%d')
+    wins = np.zeros(n_teams, dtype=int)
+    for t, name in enumerate(names):
+        opponents = rng.choice(np.delete(np.arange(n_teams), t), n_games)
+        margin = np.rint(8 * (strength[t] - strength[opponents]) + rng.normal(0, 11, n_games))
+        margin[margin == 0] = 1
+        score_t = np.rint(rng.normal(72, 8, n_games) + margin / 2)
+        wins[t] = np.count_nonzero(margin > 0)
+        pd.DataFrame({
+            'date': dates,
+            'opponent': [names[o] for o in opponents],
+            'opp_rank': np.where(rank[opponents] <= 100, rank[opponents], np.nan),
+            'result': np.where(margin > 0, 'W', 'L'),
+            'venue': rng.choice(['home', 'away', 'neutral'], n_games, p=[0.5, 0.35, 0.15]),
+            't_score_t': score_t,
+            't_score_o': score_t - margin,
+            'possessions': np.round(rng.normal(adjt[t], 3, n_games), 1),
+        }).to_csv(os.path.join(output_dir, 'team_data', name.replace(' ', '_') + '.csv'), index=False)
+
+    losses = n_games - wins
+    pd.DataFrame({
+        'rank': rank,
+        'team': names,
+        'conf': rng.choice(CONFERENCES, n_teams),
+        'record': [f"{w}-{l}" for w, l in zip(wins, losses)],
+        'adjoe': adjoe,
+        'adjde': adjde,
+        'barthag': 1 / (1 + np.exp(-(adjoe - adjde) / 10)),
+        'adjt"': adjt,
+        'wins': wins,
+        'losses': losses,
+    }).to_excel(os.path.join(output_dir, 'torvik_data_2025.xlsx'), index=False)
+
+    team_1 = rng.integers(0, n_teams, n_matchups)
+    team_2 = (team_1 + rng.integers(1, n_teams, n_matchups)) % n_teams
+    pd.DataFrame({
+        'team_1': [names[t] for t in team_1],
+        'team_2': [names[t] for t in team_2],
+        'seed_1': rng.integers(1, 17, n_matchups),
+        'seed_2': rng.integers(1, 17, n_matchups),
+    }).to_excel(os.path.join(output_dir, 'matchups.xlsx'), index=False)
+
+@contextmanager
+def working_directory(path):
+    previous = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+def time_stage(func, repeat, setup=None):
+    """
+    Run func repeat times (after setup, which is not timed), then once more under
+    tracemalloc to measure peak memory without skewing the timings
+
+    Returns:
+        dict: median/min wall time in seconds, peak traced memory in bytes, last result
+    """
+    times = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+
+    if setup is not None:
+        setup()
+    tracemalloc.start()
+    result = func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {'median_s': statistics.median(times), 'min_s': min(times), 'peak_bytes': peak, 'result': result}
+
+def accepts(func, parameter):
+    """
+    Whether func (if it exists) takes a keyword parameter
+    """
+    return func is not None and parameter in inspect.signature(func).parameters
+
+def run_benchmarks(league_dir, repeat=5):
+    """
+    Time each pipeline stage inside a generated league directory. Stages whose code
+    does not exist in this tree are skipped, and older entry points are used where
+    newer ones are missing (load_miya_data, predict_winner on the DataFrames)
+
+    Returns:
+        dict: Stage name -> timing summary
+    """
+    stages = {}
+    with working_directory(league_dir):
+        def clear_torvik_cache():
+            for path in cache_paths('torvik_data_2025.xlsx'):
+                if os.path.exists(path):
+                    os.remove(path)
+
+        def clear_store():
+            shutil.rmtree(os.path.join('team_data', '.store'), ignore_errors=True)
+
+        if cache_paths is not None:
+            stages['load_torvik_cold'] = time_stage(head_to_head.load_team_data, repeat, clear_torvik_cache)
+            stages['load_torvik_warm'] = time_stage(head_to_head.load_team_data, repeat)
+            data = stages['load_torvik_warm']['result']
+        else:
+            # Every load parses the xlsx
+            stages['load_torvik_cold'] = time_stage(head_to_head.load_team_data, repeat)
+            data = stages['load_torvik_cold']['result']
+
+        team_names = list(get_teams_dictionary().keys())
+        store = None
+        if ingest_game_logs is not None:
+            stages['ingest_game_logs_cold'] = time_stage(ingest_game_logs, repeat, clear_store)
+            stages['ingest_game_logs_warm'] = time_stage(ingest_game_logs, repeat)
+            store = stages['ingest_game_logs_warm']['result']
+        if store is not None and accepts(getattr(head_to_head, 'load_miya_metrics', None), 'store'):
+            stages['miya_metrics'] = time_stage(lambda: head_to_head.load_miya_metrics(team_names, store=store), repeat)
+        else:
+            stages['miya_metrics'] = time_stage(
+                lambda: head_to_head.load_miya_data(team_names, {team: {} for team in team_names}), repeat)
+        metrics = stages['miya_metrics']['result']
+
+        table = None
+        if TeamTable is not None and accepts(head_to_head.predict_winner, 'table'):
+            stages['team_table'] = time_stage(lambda: TeamTable(data, metrics), repeat)
+            table = stages['team_table']['result']
+
+        matchups = pd.read_excel('matchups.xlsx')
+        pairs = list(zip(matchups['team_1'], matchups['team_2']))
+        if table is not None:
+            stages['predict_per_matchup'] = time_stage(
+                lambda: [head_to_head.predict_winner(a, b, table=table) for a, b in pairs], repeat)
+        else:
+            stages['predict_per_matchup'] = time_stage(
+                lambda: [head_to_head.predict_winner(a, b, data, metrics) for a, b in pairs], repeat)
+        if table is not None and accepts(getattr(head_to_head, 'predict_winners_batch', None), 'table'):
+            team1_ids = table.team_ids(matchups['team_1'])
+            team2_ids = table.team_ids(matchups['team_2'])
+            stages['predict_batch'] = time_stage(
+                lambda: head_to_head.predict_winners_batch(team1_ids, team2_ids, table=table), repeat)
+
+        predictions = stages['predict_per_matchup']['result']
+        results_df = matchups.copy()
+        results_df['predicted_winner'] = [p['prediction']['winner'] for p in predictions]
+        results_df['confidence'] = [p['prediction']['win_probability'] for p in predictions]
+        results_df['predicted_score'] = [p['prediction']['score'] for p in predictions]
+        output_file = os.path.join(league_dir, 'benchmark_results.xlsx')
+        stages['excel_write'] = time_stage(lambda: results_df.to_excel(output_file, index=False), repeat)
+
+    for stage in stages.values():
+        del stage['result']
+    return stages
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+def print_report(report, baseline=None):
+    print(f"Commit {report['commit']}, scale {report['scale']} ({report['league']})")
+    header = f"{'Stage':24} {'Median':>10} {'Min':>10} {'Peak mem':>10}"
+    if baseline:
+        header += f" {'vs ' + baseline['commit']:>12}"
+    print(header)
+    for name, stage in report['stages'].items():
+        line = (f"{name:24} {stage['median_s'] * 1000:>8.2f}ms {stage['min_s'] * 1000:>8.2f}ms "
+                f"{stage['peak_bytes'] / 2 ** 20:>8.2f}MB")
+        if baseline and name in baseline['stages']:
+            line += f" {stage['median_s'] / baseline['stages'][name]['median_s']:>11.2f}x"
+        print(line)
+
+# Example usage
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the prediction pipeline on a synthetic league")
+    parser.add_argument('--scale', choices=SCALES, default='field')
+    parser.add_argument('--teams', type=int, help="Override the number of teams")
+    parser.add_argument('--games', type=int, help="Override games per team")
+    parser.add_argument('--matchups', type=int, help="Override the number of matchups")
+    parser.add_argument('--repeat', type=int, default=5, help="Runs per stage (the median is reported)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="JSON file for the results (default bench_results/<commit>_<scale>.json)")
+    parser.add_argument('--compare', help="Earlier results JSON to compare against")
+    args = parser.parse_args()
+
+    scale = dict(SCALES[args.scale])
+    for key in ('teams', 'games', 'matchups'):
+        if getattr(args, key):
+            scale[key] = getattr(args, key)
+
+    with tempfile.TemporaryDirectory() as league_dir:
+        generate_league(league_dir, scale['teams'], scale['games'], scale['matchups'], args.seed)
+        stages = run_benchmarks(league_dir, args.repeat)
+
+    report = {
+        'commit': git_commit(),
+        'scale': args.scale,
+        'league': scale,
+        'repeat': args.repeat,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'stages': stages,
+    }
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+
+    output = args.output or os.path.join('bench_results', f"{report['commit']}_{args.scale}.json")
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults saved to {output}")
@@ -0,0 +1,75 @@
+import argparse
+import numpy as np
+import pandas as pd
+from head_to_head import load_team_table
+from tournament_sim import advancement_table, load_field, run_simulation, win_probability_matrix
+
+def play_round(P, alive, half_size):
+    """
+    Exact probabilities after one round of the bracket.
+
+    alive[t] is the probability that team t won every game so far. Slots are grouped
+    into games of 2 * half_size consecutive slots; each team's chance of winning the
+    game is its chance of arriving times the sum over the opposite half of
+    P(opponent arrives) * P(team beats opponent). As in the simulator, the upper half
+    is always team1, so the lower half wins with probability 1 - P[upper, lower]
+
+    Returns:
+        np.ndarray: Probability that each team wins its game this round
+    """
+    n = len(alive)
+    slots = np.arange(n).reshape(-1, 2, half_size)
+    upper, lower = slots[:, 0, :], slots[:, 1, :]
+    p_upper = P[upper[:, :, None], lower[:, None, :]]
+    alive_upper = alive[upper]
+    alive_lower = alive[lower]
+
+    result = np.empty(n)
+    result[upper] = alive_upper * np.einsum('gij,gj->gi', p_upper, alive_lower)
+    result[lower] = alive_lower * np.einsum('gij,gi->gj', 1 - p_upper, alive_upper)
+    return result
+
+def exact_advancement(P):
+    """
+    Exact P(team wins its game in round r) for every team, by walking the bracket
+    round by round. Slot order is the bracket order used by tournament_sim, so this
+    is the oracle the simulated probabilities converge to
+
+    Returns:
+        np.ndarray: Advancement probabilities, shape (rounds, teams)
+    """
+    n = P.shape[0]
+    n_rounds = int(np.log2(n))
+    probabilities = np.empty((n_rounds, n))
+    alive = np.ones(n)
+    for r in range(n_rounds):
+        alive = play_round(P, alive, 2 ** r)
+        probabilities[r] = alive
+    return probabilities
+
+# Example usage
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Exact bracket advancement probabilities")
+    parser.add_argument('--check-sims', type=int, default=0,
+                        help="Also run this many simulations and report the largest deviation")
+    parser.add_argument('--output', help="Optional path to save the advancement table (.csv or .xlsx)")
+    args = parser.parse_args()
+
+    field = load_field()
+    P = win_probability_matrix(field['team'], load_team_table())
+    probabilities = exact_advancement(P)
+    results = advancement_table(field, probabilities)
+
+    pd.set_option('display.width', 200)
+    print(results.to_string(float_format=lambda x: f"{x:.2%}"))
+
+    if args.check_sims:
+        simulated = run_simulation(P, args.check_sims)
+        print(f"\nLargest deviation of {args.check_sims} simulations from exact: {np.abs(simulated - probabilities).max():.4%}")
+
+    if args.output:
+        if args.output.endswith('.xlsx'):
+            results.to_excel(args.output, index=False)
+        else:
+            results.to_csv(args.output, index=False)
+        print(f"\nResults saved to {args.output}")
@@ -0,0 +1,85 @@
+import argparse
+import numpy as np
+from head_to_head import load_miya_data, load_team_data, predict_winner, predict_winners_batch
+from team_dictionary import get_teams_dictionary
+from team_table import TeamTable
+from win_model import load_model_config
+
+def sample_pairs(table, config, samples=1000, seed=0):
+    """
+    Random ordered pairs of distinct teams, plus up to the same number of pairs whose
+    team1 win probability falls in the close-game band (where the winner can flip)
+
+    Returns:
+        tuple: (team1 ids, team2 ids, number of close-band pairs)
+    """
+    rng = np.random.default_rng(seed)
+    n = len(table)
+    i = rng.integers(0, n, samples)
+    j = (i + rng.integers(1, n, samples)) % n
+
+    all_i, all_j = np.meshgrid(np.arange(n), np.arange(n), indexing='ij')
+    all_i, all_j = all_i.ravel(), all_j.ravel()
+    distinct = all_i != all_j
+    all_i, all_j = all_i[distinct], all_j[distinct]
+    p = predict_winners_batch(all_i, all_j, table=table, config=config)['team1_win_probability']
+    band = config['close_game']
+    close = np.flatnonzero((p >= band['low']) & (p <= band['high']))
+    close = rng.choice(close, min(samples, len(close)), replace=False)
+    return np.concatenate([i, all_i[close]]), np.concatenate([j, all_j[close]]), len(close)
+
+def check_batch_parity(torvik_data, miya_data, samples=1000, seed=0):
+    """
+    Compare predict_winners_batch with predict_winner (the per-pair DataFrame path)
+    on sampled matchups: win probabilities, winner and scores must be identical
+
+    Returns:
+        list: (team1, team2, field, predict_winner value, batch value) per mismatch
+    """
+    config = load_model_config()
+    table = TeamTable(torvik_data, miya_data)
+    team1_ids, team2_ids, n_close = sample_pairs(table, config, samples, seed)
+    batch = predict_winners_batch(team1_ids, team2_ids, table=table, config=config)
+    print(f"Checking {len(team1_ids)} matchups ({n_close} in the "
+          f"{config['close_game']['low']}-{config['close_game']['high']} close-game band)")
+
+    mismatches = []
+    for k, (i, j) in enumerate(zip(team1_ids, team2_ids)):
+        team1, team2 = table.names[i], table.names[j]
+        result = predict_winner(team1, team2, torvik_data, miya_data, config=config)
+        if 'error' in result:
+            mismatches.append((team1, team2, 'error', result['error'], None))
+            continue
+        expected = {
+            'team1_win_probability': result['prediction']['team1_win_probability'],
+            'win_probability': result['prediction']['win_probability'],
+            'team1_wins': result['prediction']['winner'] == team1,
+            'team1_score': result['team1']['predicted_score'],
+            'team2_score': result['team2']['predicted_score'],
+        }
+        for field, value in expected.items():
+            if value != batch[field][k]:
+                mismatches.append((team1, team2, field, value, batch[field][k]))
+    return mismatches
+
+# Example usage
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check that predict_winners_batch matches predict_winner")
+    parser.add_argument('--samples', type=int, default=1000, help="Random matchups (and at most as many close games)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--torvik-file', default='torvik_data_2025.xlsx')
+    args = parser.parse_args()
+
+    data = load_team_data(args.torvik_file)
+    if data is None:
+        raise SystemExit(1)
+    team_names = list(get_teams_dictionary().keys())
+    miya_data = load_miya_data(team_names)
+
+    mismatches = check_batch_parity(data, miya_data, args.samples, args.seed)
+    for team1, team2, field, expected, actual in mismatches[:20]:
+        print(f"  {team1} vs {team2}: {field} predict_winner={expected} batch={actual}")
+    if mismatches:
+        print(f"{len(mismatches)} mismatches")
+        raise SystemExit(1)
+    print("predict_winners_batch matches predict_winner")
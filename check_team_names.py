@@ -1,13 +1,14 @@
 import pandas as pd
 import os
-import re
+from team_names import TeamNameResolver, normalize_team_name
+from torvik_cache import load_torvik_data
 
 def load_team_data(file_path='torvik_data_2025.xlsx'):
     """
     Load team data from the Excel file
     """
     try:
-        df = pd.read_excel(file_path)
+        df = load_torvik_data(file_path, columns=['team'])
         print(f"Loaded data for {len(df)} teams from {file_path}")
         return df
     except Exception as e:
@@ -45,8 +46,8 @@ def check_team_name_matches():
     if not file_team_names:
         return
     
-    # Get team names from Excel
-    excel_team_names = df['team'].str.lower().tolist()
+    # Normalize every Excel name once into a hash index
+    resolver = TeamNameResolver(df['team'])
     
     # Check for matches
     missing_matches = []
@@ -54,65 +55,20 @@ def check_team_name_matches():
         # Skip .DS_Store and other non-team files
         if file_team.startswith('.'):
             continue
-            
-        # Convert to lowercase for case-insensitive comparison
-        file_team_lower = file_team.lower()
         
-        # Handle special cases (e.g., "Saint" vs "St.")
-        file_team_normalized = normalize_team_name(file_team_lower)
-        
-        # Check if normalized team name exists in Excel data
-        match_found = False
-        for excel_team in excel_team_names:
-            excel_team_normalized = normalize_team_name(excel_team)
-            if file_team_normalized == excel_team_normalized:
-                match_found = True
-                break
-        
-        if not match_found:
+        # Case-insensitive, normalized lookup (e.g. "Saint" vs "St.")
+        if resolver.resolve_id(file_team, fuzzy=False) is None:
             missing_matches.append(file_team)
     
     # Print results
     if missing_matches:
         print("\nTeam files without matches in torvik_data_2025.xlsx:")
         for team in missing_matches:
-            print(f"  - {team}")
+            suggestions = ", ".join(f"{resolver.names[team_id]} ({score:.0%})" for team_id, score in resolver.matches(team))
+            print(f"  - {team}" + (f" (closest: {suggestions})" if suggestions else ""))
         print(f"\nTotal: {len(missing_matches)} teams without matches")
     else:
         print("\nAll team files have matches in torvik_data_2025.xlsx")
 
-def normalize_team_name(name):
-    """
-    Normalize team names to handle common variations
-    """
-    # Convert to lowercase
-    name = name.lower()
-    
-    # Handle "Saint" vs "St."
-    name = re.sub(r'\bst\.?\s', 'saint ', name)
-    
-    # Handle "State" vs "St."
-    name = re.sub(r'\bst\.?\s', 'state ', name)
-    
-    # Handle ampersands
-    name = name.replace('&', 'and')
-    
-    # Remove "University", "College", etc.
-    name = re.sub(r'\buniversity\b|\bcollege\b|\buniv\b', '', name)
-    
-    # Remove common suffixes
-    name = re.sub(r'\bstate university\b', 'state', name)
-    
-    # Remove "The" prefix
-    name = re.sub(r'^the\s+', '', name)
-    
-    # Handle hyphens and underscores
-    name = name.replace('-', ' ').replace('_', ' ')
-    
-    # Remove extra spaces
-    name = re.sub(r'\s+', ' ', name).strip()
-    
-    return name
-
 if __name__ == "__main__":
     check_team_name_matches() 
\ No newline at end of file
@@ -0,0 +1,158 @@
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from sklearn.model_selection import KFold
+from backtest import ARCHIVE_DIR, available_seasons, evaluate_predictions, load_season, season_games
+from win_model import (DEFAULT_CONFIG, DEFAULT_CONFIG_FILE, FEATURES, close_game_adjustment,
+                       linear_probability, matchup_features, save_model_config, weight_vector)
+
+# Candidate half-widths of the close-game band around 0.5 (0.05 gives 0.45-0.55)
+CLOSE_BAND_HALF_WIDTHS = np.round(np.arange(0, 0.101, 0.01), 2)
+
+def season_features(year, archive_dir=ARCHIVE_DIR):
+    """
+    Feature matrix and outcomes (1 if team_1 won) of one season's tournament games
+    """
+    table, results = load_season(year, archive_dir)
+    team1_ids, team2_ids, y, _ = season_games(table, results)
+    return matchup_features(table, team1_ids, team2_ids), y
+
+def _season_features(args):
+    return season_features(*args)
+
+def historical_features(years, archive_dir=ARCHIVE_DIR, workers=None):
+    """
+    Stack the feature matrices of every season (loaded in parallel)
+
+    Returns:
+        tuple: (X of shape (games, len(FEATURES)), outcomes y, season of every game)
+    """
+    tasks = [(year, archive_dir) for year in years]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        seasons = list(pool.map(_season_features, tasks))
+    X = np.concatenate([X for X, _ in seasons])
+    y = np.concatenate([y for _, y in seasons])
+    season = np.concatenate([np.full(len(y), year) for year, (_, y) in zip(years, seasons)])
+    return X, y, season
+
+def brier_loss(X, y, weights):
+    """
+    Brier score of the linear model for one weight vector or a stack of them
+    """
+    return np.mean((linear_probability(X, weights) - y) ** 2, axis=-1)
+
+def fit_weights(X, y, iterations=2000, tolerance=1e-10):
+    """
+    Least-squares coefficients for 0.5 + X @ w, refined by gradient descent on the
+    Brier score of the clipped model. Every step is one vectorized pass over all games
+
+    Returns:
+        np.ndarray: One weight per feature
+    """
+    weights, *_ = np.linalg.lstsq(X, y - 0.5, rcond=None)
+
+    # Step size from the Lipschitz constant of the unclipped gradient
+    step = len(y) / (2 * np.linalg.norm(X, 2) ** 2)
+    loss = brier_loss(X, y, weights)
+    for _ in range(iterations):
+        raw = 0.5 + X @ weights
+        active = (raw > 0.01) & (raw < 0.99)
+        gradient = 2 * X[active].T @ (raw[active] - y[active]) / len(y)
+        candidate = weights - step * gradient
+        candidate_loss = brier_loss(X, y, candidate)
+        if loss - candidate_loss < tolerance:
+            break
+        weights, loss = candidate, candidate_loss
+    return weights
+
+def fit_close_band(X, y, weights, half_widths=CLOSE_BAND_HALF_WIDTHS):
+    """
+    Pick the close-game band with the lowest Brier score. All candidate bands are
+    evaluated in one broadcast pass
+
+    Returns:
+        tuple: (low, high, Brier score of every candidate half-width)
+    """
+    win_prob = linear_probability(X, weights)
+    half = np.asarray(half_widths)[:, None]
+    adjusted = close_game_adjustment(win_prob, X, 0.5 - half, 0.5 + half)
+    losses = np.mean((adjusted - y) ** 2, axis=1)
+    best = half_widths[np.argmin(losses)]
+    return round(0.5 - best, 4), round(0.5 + best, 4), losses
+
+def fit_model(X, y):
+    """
+    Fit the coefficients, then the close-game band
+
+    Returns:
+        tuple: (weights, close_low, close_high)
+    """
+    weights = fit_weights(X, y)
+    low, high, _ = fit_close_band(X, y, weights)
+    return weights, low, high
+
+def predict(X, weights, close_low, close_high):
+    return close_game_adjustment(linear_probability(X, weights), X, close_low, close_high)
+
+def _fold(args):
+    X, y, train, test = args
+    weights, low, high = fit_model(X[train], y[train])
+    return evaluate_predictions(predict(X[test], weights, low, high), y[test])
+
+def cross_validate(X, y, folds=5, seed=0, workers=None):
+    """
+    k-fold cross-validation of the whole fit, with folds run on a process pool
+
+    Returns:
+        list: evaluate_predictions scores of every held-out fold
+    """
+    splits = KFold(n_splits=folds, shuffle=True, random_state=seed).split(X)
+    tasks = [(X, y, train, test) for train, test in splits]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_fold, tasks))
+
+# Example usage
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fit predict_winner coefficients on archived tournaments")
+    parser.add_argument('years', nargs='*', type=int, help="Seasons to fit on (default: all in the archive)")
+    parser.add_argument('--archive-dir', default=ARCHIVE_DIR)
+    parser.add_argument('--folds', type=int, default=5)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--output', default=DEFAULT_CONFIG_FILE, help="Config file to write the fitted weights to")
+    args = parser.parse_args()
+
+    years = args.years or available_seasons(args.archive_dir)
+    if not years:
+        print(f"No archived seasons with tournament results found in {args.archive_dir}")
+        raise SystemExit(1)
+
+    X, y, _ = historical_features(years, args.archive_dir, args.workers)
+    print(f"Fitting on {len(y)} games from {len(years)} seasons")
+
+    fold_scores = cross_validate(X, y, args.folds, workers=args.workers)
+    cv_brier = float(np.mean([s['brier'] for s in fold_scores]))
+    cv_log_loss = float(np.mean([s['log_loss'] for s in fold_scores]))
+
+    defaults = DEFAULT_CONFIG['close_game']
+    default_scores = evaluate_predictions(predict(X, weight_vector(DEFAULT_CONFIG), defaults['low'], defaults['high']), y)
+
+    weights, low, high = fit_model(X, y)
+    fitted_scores = evaluate_predictions(predict(X, weights, low, high), y)
+
+    print(f"\n{'Feature':10} {'Default':>9} {'Fitted':>9}")
+    for name, default, fitted in zip(FEATURES, weight_vector(DEFAULT_CONFIG), weights):
+        print(f"{name:10} {default:>9.4f} {fitted:>9.4f}")
+    print(f"{'band':10} {defaults['low']:.2f}-{defaults['high']:.2f} {low:>4.2f}-{high:.2f}")
+    print(f"\nBrier: default {default_scores['brier']:.4f}, fitted {fitted_scores['brier']:.4f}, "
+          f"{args.folds}-fold CV {cv_brier:.4f}")
+
+    save_model_config(weights, low, high, args.output, metadata={
+        'seasons': list(years),
+        'games': int(len(y)),
+        'cv_folds': args.folds,
+        'cv_brier': cv_brier,
+        'cv_log_loss': cv_log_loss,
+        'train_brier': fitted_scores['brier'],
+    })
+    print(f"\nWeights saved to {args.output}")
@@ -0,0 +1,211 @@
+import argparse
+import numpy as np
+import pandas as pd
+from game_log_store import ingest_game_logs
+from team_names import TeamNameResolver
+
+# Running totals kept per team, each answering one count or sum over any window
+PREFIX_COLUMNS = ['games', 'wins', 'close', 'close_wins', 'home', 'home_wins', 'away', 'away_wins', 'margin', 'margin_games']
+
+# Windowed metrics that can replace their full-season counterparts as predict_winner inputs
+FORM_METRICS = ['win_pct', 'NERVE', 'ROAD']
+
+def _ratio(numerator, denominator):
+    # numerator / denominator, 0 where there is nothing to divide by (as the Miya metrics do)
+    return np.divide(numerator, denominator, out=np.zeros(np.shape(numerator)), where=denominator > 0)
+
+class FormIndex:
+    """
+    Per-team prefix sums over the game log store, sorted by date once at build time.
+
+    Every team's games occupy a contiguous block of the date-sorted arrays, and each
+    PREFIX_COLUMNS array holds running totals with a leading zero per team, so the
+    wins, close games, venue splits and margins of any window of games are two lookups.
+    Date windows find their first game with a binary search over the team's dates
+    """
+    def __init__(self, store, torvik_data=None):
+        """
+        Args:
+            store (GameLogStore): Game logs
+            torvik_data (pd.DataFrame, optional): Torvik frame with team and conf columns,
+                used to find where each team's conference play starts
+        """
+        self.store = store
+        self.teams = list(store.teams)
+        self.team_index = {team: k for k, team in enumerate(self.teams)}
+        lengths = np.array([store.teams[team]['length'] for team in self.teams], dtype=np.int64)
+        offsets = np.array([store.teams[team]['offset'] for team in self.teams], dtype=np.int64)
+        self.lengths = lengths
+        # Team k's games are rows [starts[k], starts[k] + lengths[k]); its totals rows [starts[k] + k, ...]
+        self.starts = np.concatenate([[0], np.cumsum(lengths)[:-1]]).astype(np.int64)
+
+        rows = np.concatenate([np.arange(o, o + n) for o, n in zip(offsets, lengths)]) if len(lengths) else np.empty(0, dtype=np.int64)
+        team_of_row = np.repeat(np.arange(len(self.teams)), lengths)
+        arrays = store.arrays
+        dates = np.asarray(arrays['date'])[rows]
+        # Stable sort by team, then date, so games on the same date keep their file order
+        order = np.lexsort((dates, team_of_row))
+        rows = rows[order]
+        self.dates = dates[order]
+
+        win = np.asarray(arrays['win'])[rows]
+        venue = np.asarray(arrays['venue'])[rows]
+        margin = np.asarray(arrays['t_score_t'])[rows] - np.asarray(arrays['t_score_o'])[rows]
+        close = np.abs(margin) <= 4
+        home = venue == 0
+        away = (venue == 1) | (venue == 2)
+        values = {
+            'games': np.ones(len(rows)),
+            'wins': win,
+            'close': close,
+            'close_wins': win & close,
+            'home': home,
+            'home_wins': win & home,
+            'away': away,
+            'away_wins': win & away,
+            'margin': np.nan_to_num(margin),
+            'margin_games': ~np.isnan(margin),
+        }
+        # Insert a zero ahead of every team's block, then take one running sum: within a
+        # block, totals[i] - totals[j] is the sum over the team's games j..i-1
+        zero_at = self.starts
+        self.prefix = {}
+        for name in PREFIX_COLUMNS:
+            running = np.cumsum(np.insert(values[name].astype(np.float64), zero_at, 0))
+            block_base = np.repeat(running[zero_at + np.arange(len(self.teams))], lengths + 1)
+            self.prefix[name] = running - block_base
+
+        self.opponents = np.asarray(store.arrays['opponent'])[rows]
+        self.conference_start = self._conference_starts(torvik_data)
+
+    def _conference_starts(self, torvik_data):
+        """
+        Index (within each team's sorted games) of its first game against a team of its
+        own Torvik conference; 0 (the full season) when unknown
+        """
+        starts = np.zeros(len(self.teams), dtype=np.int64)
+        if torvik_data is None or 'conf' not in torvik_data:
+            return starts
+        names = torvik_data['team'].astype(str).tolist()
+        confs = torvik_data['conf'].astype(str).tolist()
+        resolver = TeamNameResolver(names)
+
+        def conference(name):
+            team_id = resolver.resolve_id(name, fuzzy=False)
+            return confs[team_id] if team_id is not None else None
+
+        opponent_conf = np.array([conference(name) for name in self.store.opponents], dtype=object)
+        for k, team in enumerate(self.teams):
+            own = conference(team.replace('_', ' '))
+            if own is None:
+                continue
+            start = self.starts[k]
+            in_conference = np.flatnonzero(opponent_conf[self.opponents[start:start + self.lengths[k]]] == own)
+            if len(in_conference):
+                starts[k] = in_conference[0]
+        return starts
+
+    def __contains__(self, team):
+        return team in self.team_index
+
+    def bounds(self, window):
+        """
+        First and last (exclusive) game of every team in a window
+
+        Args:
+            window: 'season', 'conference', 'last<N>' (e.g. 'last10'), an int N (last N
+                games) or a date (games on or after it, e.g. '2025-02-01')
+        Returns:
+            tuple: (start, stop) arrays of per-team game indices
+        """
+        stop = self.lengths.copy()
+        if isinstance(window, str) and window.startswith('last'):
+            window = int(window[4:])
+        if isinstance(window, (int, np.integer)):
+            return np.maximum(stop - window, 0), stop
+        if window == 'season':
+            return np.zeros_like(stop), stop
+        if window == 'conference':
+            return self.conference_start.copy(), stop
+        since = np.datetime64(pd.Timestamp(window).date(), 'D')
+        start = np.array([np.searchsorted(self.dates[s:s + n], since) for s, n in zip(self.starts, self.lengths)], dtype=np.int64)
+        return start, stop
+
+    def totals(self, start, stop, teams=None):
+        """
+        Every PREFIX_COLUMNS sum over games [start, stop) of each team
+
+        Returns:
+            dict: Column name -> array with one value per team
+        """
+        k = np.arange(len(self.teams)) if teams is None else np.asarray(teams)
+        base = self.starts[k] + k
+        return {name: values[base + stop] - values[base + start] for name, values in self.prefix.items()}
+
+    def _metrics(self, start, stop, teams=None):
+        t = self.totals(start, stop, teams)
+        return {
+            'games': t['games'].astype(np.int64),
+            'win_pct': _ratio(t['wins'], t['games']),
+            'NERVE': _ratio(t['close_wins'], t['close']),
+            'ROAD': _ratio(t['away_wins'], t['away']) - _ratio(t['home_wins'], t['home']),
+            'margin': _ratio(t['margin'], t['margin_games']),
+        }
+
+    def metrics_table(self, window):
+        """
+        Windowed win rate, NERVE, ROAD and average margin of every team
+
+        Returns:
+            pd.DataFrame: Indexed by team (file name format)
+        """
+        start, stop = self.bounds(window)
+        return pd.DataFrame(self._metrics(start, stop), index=pd.Index(self.teams, name='team'))
+
+    def team_metrics(self, team, window):
+        """
+        Windowed metrics of one team (file name format) as a dict
+        """
+        k = self.team_index[team]
+        start, stop = self.bounds(window)
+        return {name: values[0].item() for name, values in self._metrics(start[[k]], stop[[k]], [k]).items()}
+
+def windowed_miya_data(index, window, miya_data=None, metrics=FORM_METRICS):
+    """
+    MIYA data with the windowed versions of metrics (win_pct, NERVE, ROAD by
+    default) in place of the full-season values, for TeamTable / predict_winner.
+    Teams with no games in the window (e.g. last0, a future date) keep their
+    full-season values rather than a win rate of 0
+
+    Args:
+        index (FormIndex): Prefix sums of the game logs
+        window: Window spec (see FormIndex.bounds)
+        miya_data (dict or pd.DataFrame, optional): Full-season metrics keyed by file name
+    Returns:
+        dict: team (file name) -> metrics dict
+    """
+    if isinstance(miya_data, pd.DataFrame):
+        miya_data = miya_data.to_dict('index')
+    table = index.metrics_table(window)
+    form = table.loc[table['games'] > 0, list(metrics)].to_dict('index')
+    result = {team: dict(values) for team, values in (miya_data or {}).items()}
+    for team, values in form.items():
+        result.setdefault(team, {}).update(values)
+    return result
+
+# Example usage
+if __name__ == "__main__":
+    from head_to_head import load_team_data
+
+    parser = argparse.ArgumentParser(description="Windowed form metrics (hot teams)")
+    parser.add_argument('--window', default='last10', help="'season', 'conference', 'last<N>' or a start date (YYYY-MM-DD)")
+    parser.add_argument('--top', type=int, default=20)
+    args = parser.parse_args()
+
+    index = FormIndex(ingest_game_logs(), load_team_data())
+    try:
+        table = index.metrics_table(args.window)
+    except ValueError as e:
+        print(f"Error: invalid window {args.window}: {e}")
+        raise SystemExit(1)
+    print(table.sort_values(['win_pct', 'margin'], ascending=False).head(args.top).to_string(float_format=lambda v: f"{v:.3f}"))
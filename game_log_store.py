@@ -0,0 +1,311 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+import instrumentation
+from instrumentation import traced
+from miya_metrics import GameLog
+
+STORE_VERSION = 3
+DEFAULT_STORE_DIR = os.path.join('team_data', '.store')
+# Names the version subdirectory readers open; replaced atomically by each ingest
+POINTER_FILE = 'current.json'
+
+# Venue strings are stored as small integer codes
+VENUES = ['home', 'away', 'neutral']
+
+# Column name -> dtype of every array kept in the store
+COLUMNS = {
+    'date': 'datetime64[D]',
+    'opponent': 'int32',
+    'opp_rank': 'float64',
+    'win': 'bool',
+    'venue': 'int8',
+    't_score_t': 'float64',
+    't_score_o': 'float64',
+    'possessions': 'float64',
+}
+
+def file_sha1(file_path):
+    """
+    SHA-1 of a file's contents, read in 1 MB blocks
+    """
+    digest = hashlib.sha1()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def parse_game_log(file_path, opponent_codes):
+    """
+    Parse one Miya CSV into the store's column arrays. New opponent names are
+    appended to opponent_codes (name -> code)
+    """
+    df = pd.read_csv(file_path)
+    n = len(df)
+
+    opponents = df['opponent'].astype(str)
+    for name in opponents.unique():
+        if name not in opponent_codes:
+            opponent_codes[name] = len(opponent_codes)
+
+    venue = df['venue'].map({v: i for i, v in enumerate(VENUES)}).fillna(-1)
+    if 'date' in df.columns:
+        dates = pd.to_datetime(df['date'], errors='coerce').to_numpy(dtype='datetime64[D]')
+    else:
+        dates = np.full(n, np.datetime64('NaT'), dtype='datetime64[D]')
+
+    return {
+        'date': dates,
+        'opponent': opponents.map(opponent_codes).to_numpy(dtype='int32'),
+        'opp_rank': df['opp_rank'].to_numpy(dtype='float64'),
+        'win': (df['result'] == 'W').to_numpy(),
+        'venue': venue.to_numpy(dtype='int8'),
+        't_score_t': df['t_score_t'].to_numpy(dtype='float64'),
+        't_score_o': df['t_score_o'].to_numpy(dtype='float64'),
+        'possessions': df['possessions'].to_numpy(dtype='float64') if 'possessions' in df else np.full(n, np.nan),
+    }
+
+class StoreGameLog(GameLog):
+    """
+    GameLog over zero-copy slices of the store. Opponents are integer codes, so field
+    membership is tested against the codes of the field's names
+    """
+    def __init__(self, store, columns):
+        venue = columns['venue']
+        super().__init__(
+            opponent=columns['opponent'],
+            opp_rank=columns['opp_rank'],
+            win=columns['win'],
+            home=venue == 0,
+            away=(venue == 1) | (venue == 2),
+            margin=columns['t_score_t'] - columns['t_score_o'],
+            possessions=columns['possessions'],
+        )
+        self.store = store
+        self.columns = columns
+
+    def opponent_in(self, field):
+        return np.isin(self.opponent, self.store.field_codes(field))
+
+def current_version(store_dir=DEFAULT_STORE_DIR):
+    """
+    Version subdirectory the store's pointer file names (None if there is no store
+    of this STORE_VERSION)
+    """
+    try:
+        with open(os.path.join(store_dir, POINTER_FILE)) as f:
+            pointer = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return pointer.get('current') if pointer.get('version') == STORE_VERSION else None
+
+class GameLogStore:
+    """
+    Read-only view of the consolidated game-log store. Every column is memory-mapped,
+    and each team's rows are a contiguous [offset, offset + length) slice.
+
+    Each ingest writes a complete new version subdirectory of store_dir, so an open
+    store keeps reading the version it was opened on
+    """
+    def __init__(self, store_dir=DEFAULT_STORE_DIR, version=None):
+        self.store_dir = store_dir
+        self.version = version or current_version(store_dir)
+        if self.version is None:
+            raise FileNotFoundError(f"No game log store (version {STORE_VERSION}) in {store_dir}")
+        version_dir = os.path.join(store_dir, self.version)
+        with open(os.path.join(version_dir, 'manifest.json')) as f:
+            self.manifest = json.load(f)
+        self.teams = self.manifest['teams']
+        self.opponents = self.manifest['opponents']
+        self.opponent_codes = {name: code for code, name in enumerate(self.opponents)}
+        self.arrays = {
+            name: np.load(os.path.join(version_dir, f'{name}.npy'), mmap_mode='r')
+            for name in COLUMNS
+        }
+        self._field_codes = {}
+
+    def __contains__(self, team_name):
+        return team_name in self.teams
+
+    def __len__(self):
+        return len(self.teams)
+
+    def team_id(self, team_name):
+        return self.teams[team_name]['id']
+
+    def columns(self, team_name):
+        """
+        Zero-copy slices of every column for one team
+        """
+        entry = self.teams[team_name]
+        start, stop = entry['offset'], entry['offset'] + entry['length']
+        return {name: array[start:stop] for name, array in self.arrays.items()}
+
+    def game_log(self, team_name):
+        """
+        GameLog for a team (file name format, e.g. Michigan_State), or None if not stored
+        """
+        if team_name not in self.teams:
+            print(f"Team data not found in game log store for {team_name}")
+            return None
+        return StoreGameLog(self, self.columns(team_name))
+
+    def frame(self, team_name):
+        """
+        DataFrame copy of a team's stored columns, with opponent names and venues decoded
+        """
+        columns = self.columns(team_name)
+        df = pd.DataFrame({name: np.array(values) for name, values in columns.items()})
+        df['opponent'] = [self.opponents[code] for code in columns['opponent']]
+        df['venue'] = [VENUES[code] if code >= 0 else None for code in columns['venue']]
+        df['result'] = np.where(columns['win'], 'W', 'L')
+        return df.drop(columns='win')
+
+    def field_codes(self, field):
+        """
+        Opponent codes of the names in field (cached per field)
+        """
+        codes = self._field_codes.get(field)
+        if codes is None:
+            codes = np.array([self.opponent_codes[name] for name in field if name in self.opponent_codes], dtype='int32')
+            self._field_codes[field] = codes
+        return codes
+
+def store_loader(store_dir=DEFAULT_STORE_DIR, version=None):
+    """
+    game_log loader over the store opened in the calling process. Used as the
+    loader_factory of process-pool workers, which map the store instead of receiving a
+    copy; pass the parent's store.version so they read the same version even if an
+    ingest switches versions meanwhile
+    """
+    return GameLogStore(store_dir, version).game_log
+
+@traced('ingest_game_logs')
+def ingest_game_logs(data_dir='team_data', store_dir=None):
+    """
+    Merge every team CSV in data_dir into the columnar store. Only files whose mtime/size
+    changed (and whose SHA-1 no longer matches) are re-parsed; unchanged teams are copied
+    over from the existing store
+
+    Returns:
+        GameLogStore: The up-to-date store
+    """
+    store_dir = store_dir or os.path.join(data_dir, '.store')
+    files = sorted(f for f in os.listdir(data_dir) if f.endswith('.csv') and not f.startswith('.'))
+
+    old = None
+    # Stores written by another version may lack columns, so only this version's pointer is followed
+    if current_version(store_dir) is not None:
+        try:
+            old = GameLogStore(store_dir)
+        except Exception as e:
+            print(f"Error reading game log store, rebuilding: {e}")
+            old = None
+
+    opponent_codes = dict(old.opponent_codes) if old is not None else {}
+    teams = {}
+    chunks = []
+    changed = old is None or set(old.teams) != {f[:-4] for f in files}
+    offset = 0
+
+    for file_name in files:
+        team = file_name[:-4]
+        file_path = os.path.join(data_dir, file_name)
+        stat = os.stat(file_path)
+        entry = old.teams.get(team) if old is not None else None
+
+        columns = None
+        sha1 = None
+        if entry is not None:
+            if entry['mtime'] == stat.st_mtime_ns and entry['size'] == stat.st_size:
+                sha1 = entry['sha1']
+            else:
+                sha1 = file_sha1(file_path)
+                changed = True
+            if sha1 == entry['sha1']:
+                columns = old.columns(team)
+                if instrumentation.ENABLED:
+                    instrumentation.cache_hit('game_log_store')
+
+        if columns is None:
+            if instrumentation.ENABLED:
+                instrumentation.cache_miss('game_log_store')
+                instrumentation.add_bytes('game_log_store', stat.st_size)
+            try:
+                columns = parse_game_log(file_path, opponent_codes)
+            except Exception as e:
+                print(f"Error ingesting game log for {team}: {e}")
+                if instrumentation.ENABLED:
+                    instrumentation.error('game_log_store')
+                continue
+            sha1 = sha1 or file_sha1(file_path)
+            changed = True
+
+        length = len(columns['win'])
+        teams[team] = {
+            'id': len(teams),
+            'file': file_name,
+            'mtime': stat.st_mtime_ns,
+            'size': stat.st_size,
+            'sha1': sha1,
+            'offset': offset,
+            'length': length,
+        }
+        chunks.append(columns)
+        offset += length
+
+    if not changed:
+        return old
+
+    merged = {
+        name: np.concatenate([c[name] for c in chunks]).astype(dtype, copy=False) if chunks else np.empty(0, dtype=dtype)
+        for name, dtype in COLUMNS.items()
+    }
+    previous = old.version if old is not None else None
+    old = chunks = None
+
+    # Write a complete new version next to the live one, then switch readers over with a
+    # single atomic replace of the pointer file. Files of the live version are never
+    # rewritten, so open memory maps and readers racing the switch stay consistent
+    os.makedirs(store_dir, exist_ok=True)
+    version_dir = tempfile.mkdtemp(prefix='v', dir=store_dir)
+    version = os.path.basename(version_dir)
+    for name, values in merged.items():
+        np.save(os.path.join(version_dir, f'{name}.npy'), values)
+    manifest = {
+        'version': STORE_VERSION,
+        'teams': teams,
+        'opponents': sorted(opponent_codes, key=opponent_codes.get),
+    }
+    with open(os.path.join(version_dir, 'manifest.json'), 'w') as f:
+        json.dump(manifest, f)
+
+    tmp_path = os.path.join(store_dir, f'{POINTER_FILE}.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump({'version': STORE_VERSION, 'current': version}, f)
+    os.replace(tmp_path, os.path.join(store_dir, POINTER_FILE))
+
+    remove_old_versions(store_dir, keep=(version, previous))
+    return GameLogStore(store_dir, version)
+
+def remove_old_versions(store_dir, keep):
+    """
+    Delete version subdirectories not in keep, and the column and manifest files of the
+    pre-versioning layout. The version just replaced is kept so a reader that read the
+    pointer right before the switch can still open it
+    """
+    for entry in os.scandir(store_dir):
+        if entry.is_dir():
+            if entry.name.startswith('v') and entry.name not in keep:
+                shutil.rmtree(entry.path, ignore_errors=True)
+        elif entry.name == 'manifest.json' or entry.name.endswith('.npy'):
+            os.remove(entry.path)
+
+# Example usage
+if __name__ == "__main__":
+    store = ingest_game_logs()
+    print(f"Game log store holds {len(store)} teams, {len(store.arrays['win'])} games")
@@ -0,0 +1,230 @@
+import argparse
+import numpy as np
+import pandas as pd
+from head_to_head import load_team_table
+
+# Possessions predict_winner assumes, used when a team has no tempo data
+DEFAULT_POSSESSIONS = 70
+
+# Game-to-game spread of the possession count around its expectation
+POSSESSION_SD = 4.0
+
+# Points of a scoring possession (1, 2 or 3) and their shares; the chance a
+# possession scores is set so the mean points per possession match the efficiencies
+SCORING_POINTS = np.array([1, 2, 3])
+SCORING_SHARES = np.array([0.10, 0.62, 0.28])
+
+# An overtime period is 5 of the 40 minutes
+OVERTIME_SHARE = 5 / 40
+MAX_OVERTIMES = 10
+
+# Matchups x simulations drawn per chunk
+CHUNK_CELLS = 2_000_000
+
+def team_tempo(table):
+    """
+    Expected possessions per game of every team: the mean of Torvik adjt and the
+    Miya TEMPO metric where available, DEFAULT_POSSESSIONS where neither is
+
+    Returns:
+        np.ndarray: Shape (teams,)
+    """
+    sources = np.stack([table.adjt, table.TEMPO])
+    counted = ~np.isnan(sources)
+    total = np.where(counted, sources, 0).sum(axis=0)
+    count = counted.sum(axis=0)
+    return np.where(count > 0, total / np.maximum(count, 1), DEFAULT_POSSESSIONS)
+
+def expected_possessions(table, team1_ids, team2_ids, tempo=None):
+    """
+    Expected possessions of each matchup: the product of the two tempos over the
+    league average tempo, so two average teams play an average-paced game
+    """
+    tempo = team_tempo(table) if tempo is None else tempo
+    return tempo[team1_ids] * tempo[team2_ids] / tempo.mean()
+
+def points_per_possession(table, team1_ids, team2_ids):
+    """
+    Expected points per possession of each side, from the same efficiency formula
+    as predict_winner's score (adjoe * 0.01 * (100 / opponent adjde))
+
+    Returns:
+        tuple: (team1 points per possession, team2 points per possession)
+    """
+    i = np.asarray(team1_ids, dtype=np.intp)
+    j = np.asarray(team2_ids, dtype=np.intp)
+    return table.adjoe[i] / table.adjde[j], table.adjoe[j] / table.adjde[i]
+
+def outcome_probabilities(ppp):
+    """
+    Probabilities of a possession scoring 0, 1, 2 or 3 points for a given expected
+    points per possession
+
+    Returns:
+        np.ndarray: Shape ppp.shape + (4,)
+    """
+    score_chance = np.clip(ppp / (SCORING_POINTS @ SCORING_SHARES), 0, 1)
+    return np.concatenate([(1 - score_chance)[..., None], score_chance[..., None] * SCORING_SHARES], axis=-1)
+
+def _binomial(rng, n, p):
+    # Normal approximation of Binomial(n, p), rounded and kept within [0, n]
+    z = rng.standard_normal(n.shape, dtype=np.float32)
+    return np.clip(np.rint(n * p + np.sqrt(n * p * (1 - p)) * z), 0, n)
+
+def regulation_points(rng, possessions, score_chance):
+    """
+    Points scored over each game's possessions. The number of scoring possessions,
+    then how many of them were threes and ones, are drawn from the normal
+    approximation of their binomial distributions, which is accurate for a full
+    game's possession count and far cheaper than drawing every possession
+
+    Args:
+        possessions (np.ndarray): Possessions of each simulated game, shape (matchups, sims)
+        score_chance (np.ndarray): Chance a possession scores, broadcastable to possessions
+    """
+    scored = _binomial(rng, possessions, score_chance)
+    threes = _binomial(rng, scored, SCORING_SHARES[2])
+    rest = scored - threes
+    ones = _binomial(rng, rest, SCORING_SHARES[0] / (SCORING_SHARES[0] + SCORING_SHARES[1]))
+    return (ones + 2 * (rest - ones) + 3 * threes).astype(np.int32)
+
+def exact_points(rng, possessions, outcome_probs):
+    """
+    Points from exact multinomial draws of every possession outcome (used for the
+    few possessions of an overtime period)
+    """
+    counts = rng.multinomial(possessions, outcome_probs)
+    return counts[..., 1:] @ SCORING_POINTS
+
+def simulate_games(table, team1_ids, team2_ids, n_sims=10000, seed=None):
+    """
+    Simulate every matchup n_sims times from its possession outcomes. Both teams get
+    the same number of possessions; games tied at the end of regulation go to
+    overtime periods until they are decided
+
+    Returns:
+        dict: team1_score and team2_score of shape (matchups, n_sims), overtimes
+        (number of overtime periods played, same shape) and possessions (expected per matchup)
+    """
+    rng = np.random.default_rng(seed)
+    team1_ids = np.asarray(team1_ids, dtype=np.intp)
+    team2_ids = np.asarray(team2_ids, dtype=np.intp)
+    possessions = expected_possessions(table, team1_ids, team2_ids)
+    ppp1, ppp2 = points_per_possession(table, team1_ids, team2_ids)
+    probs1, probs2 = outcome_probabilities(ppp1), outcome_probabilities(ppp2)
+    chance1, chance2 = 1 - probs1[:, 0], 1 - probs2[:, 0]
+
+    m = len(team1_ids)
+    score1 = np.empty((m, n_sims), dtype=np.int32)
+    score2 = np.empty((m, n_sims), dtype=np.int32)
+    overtimes = np.zeros((m, n_sims), dtype=np.int8)
+    step = max(1, CHUNK_CELLS // n_sims)
+    for start in range(0, m, step):
+        rows = slice(start, start + step)
+        expected = possessions[rows, None].astype(np.float32)
+        count = np.maximum(np.rint(expected + POSSESSION_SD * rng.standard_normal((len(expected), n_sims), dtype=np.float32)), 1)
+        s1 = regulation_points(rng, count, chance1[rows, None])
+        s2 = regulation_points(rng, count, chance2[rows, None])
+
+        ot = np.zeros(s1.shape, dtype=np.int8)
+        ot_possessions = np.maximum(np.rint(possessions[rows] * OVERTIME_SHARE), 1).astype(np.int64)
+        for _ in range(MAX_OVERTIMES):
+            tied_rows, tied_sims = np.nonzero(s1 == s2)
+            if len(tied_rows) == 0:
+                break
+            extra = ot_possessions[tied_rows]
+            s1[tied_rows, tied_sims] += exact_points(rng, extra, probs1[rows][tied_rows])
+            s2[tied_rows, tied_sims] += exact_points(rng, extra, probs2[rows][tied_rows])
+            ot[tied_rows, tied_sims] += 1
+        # Still tied after MAX_OVERTIMES: settle it with a coin flip
+        tied = s1 == s2
+        coin = rng.random(s1.shape) < 0.5
+        s1 += tied & coin
+        s2 += tied & ~coin
+
+        score1[rows], score2[rows], overtimes[rows] = s1, s2, ot
+    return {'team1_score': score1, 'team2_score': score2, 'overtimes': overtimes, 'possessions': possessions}
+
+def summarize_games(table, team1_ids, team2_ids, games, quantiles=(0.05, 0.25, 0.5, 0.75, 0.95)):
+    """
+    Per-matchup win probability, mean scores, spread/total quantiles and overtime
+    frequency of simulate_games output
+
+    Returns:
+        pd.DataFrame: One row per matchup
+    """
+    score1 = games['team1_score']
+    score2 = games['team2_score']
+    spread = score1 - score2
+    total = score1 + score2
+    summary = pd.DataFrame({
+        'team_1': [table.names[i] for i in team1_ids],
+        'team_2': [table.names[j] for j in team2_ids],
+        'possessions': games['possessions'],
+        'team1_win_probability': (spread > 0).mean(axis=1),
+        'team1_mean_score': score1.mean(axis=1),
+        'team2_mean_score': score2.mean(axis=1),
+        'overtime_frequency': (games['overtimes'] > 0).mean(axis=1),
+    })
+    quantiles = np.asarray(quantiles)
+    for name, values in (('spread', spread), ('total', total)):
+        for q, column in zip(quantiles, np.quantile(values, quantiles, axis=1)):
+            summary[f'{name}_q{round(q * 100):02d}'] = column
+    return summary
+
+def score_distribution(games, index):
+    """
+    Probability of every final score (team1 points, team2 points) of one matchup
+
+    Returns:
+        pd.Series: Probabilities indexed by (team1_score, team2_score), most likely first
+    """
+    scores = pd.DataFrame({'team1_score': games['team1_score'][index], 'team2_score': games['team2_score'][index]})
+    return scores.value_counts(normalize=True)
+
+# Example usage
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Possession-level score simulation of matchups")
+    parser.add_argument('teams', nargs='*', help="Two teams to simulate (default: every game in --matchups)")
+    parser.add_argument('--matchups', default='matchups.xlsx')
+    parser.add_argument('--sims', type=int, default=10000, help="Simulated games per matchup")
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--output', help="Optional path to save the summary (.csv or .xlsx)")
+    args = parser.parse_args()
+
+    table = load_team_table()
+    if table is None:
+        raise SystemExit(1)
+    try:
+        if args.teams:
+            if len(args.teams) != 2:
+                raise ValueError("Give exactly two teams")
+            team1_ids, team2_ids = [table.team_id(args.teams[0])], [table.team_id(args.teams[1])]
+        else:
+            matchups = pd.read_excel(args.matchups)
+            team1_ids, team2_ids = table.team_ids(matchups['team_1']), table.team_ids(matchups['team_2'])
+    except (KeyError, ValueError) as e:
+        print(f"Error: {e}")
+        raise SystemExit(1)
+
+    games = simulate_games(table, team1_ids, team2_ids, args.sims, args.seed)
+    summary = summarize_games(table, team1_ids, team2_ids, games)
+    if args.teams:
+        row = summary.iloc[0]
+        print(f"{row['team_1']} vs {row['team_2']} ({row['possessions']:.1f} possessions)")
+        print(f"{row['team_1']} win probability: {row['team1_win_probability']:.1%}")
+        print(f"Mean score: {row['team1_mean_score']:.1f}-{row['team2_mean_score']:.1f}")
+        print(f"Spread (5%-95%): {row['spread_q05']:+.0f} to {row['spread_q95']:+.0f}, total {row['total_q05']:.0f} to {row['total_q95']:.0f}")
+        print(f"Overtime: {row['overtime_frequency']:.1%}")
+        print("Most likely scores:")
+        for (s1, s2), p in score_distribution(games, 0).head(5).items():
+            print(f"  {s1}-{s2}: {p:.2%}")
+    else:
+        print(summary.to_string(index=False, float_format=lambda v: f"{v:.2f}"))
+
+    if args.output:
+        if args.output.endswith('.csv'):
+            summary.to_csv(args.output, index=False)
+        else:
+            summary.to_excel(args.output, index=False)
+        print(f"\nSummary saved to {args.output}")
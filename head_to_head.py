@@ -1,16 +1,32 @@
+import argparse
+import numpy as np
 import pandas as pd
+import instrumentation
+from instrumentation import span, traced
 from team_dictionary import get_teams_dictionary
+from metric_cache import CachedMetrics, team_metric
+from game_log_store import ingest_game_logs
+from form_metrics import FormIndex, windowed_miya_data
+from results_sink import PREDICTION_COLUMNS, ResultsSink, export_bracket_json, export_excel, prediction_record
+from team_names import TeamNameResolver
+from team_table import MIYA_FIELDS, TeamTable
+from torvik_cache import load_torvik_data
+from win_model import close_game_adjustment, linear_probability, load_model_config, matchup_features, weight_vector
 from datetime import datetime
 import os
+import weakref
 
+@traced('load_team_data')
 def load_team_data(file_path='torvik_data_2025.xlsx'):
     try:
-        df = pd.read_excel(file_path)
+        # Served from the binary cache next to the xlsx unless the sheet changed
+        df = load_torvik_data(file_path)
         return df
     except Exception as e:
         print(f"Error loading team data: {e}")
         return None
 
+@traced('grab_team_info')
 def grab_team_info(team_name):
     """
     Grabs Miya data from the team_data folder for the team name after changing it to the right format
@@ -22,13 +38,19 @@ def grab_team_info(team_name):
         
         # Load the CSV file
         df = pd.read_csv(file_path)
+        if instrumentation.ENABLED:
+            instrumentation.add_bytes('grab_team_info', os.path.getsize(file_path))
         # print(f"Loaded team data for {team_name} from {file_path}")
         return df
     except FileNotFoundError:
         print(f"Team data file not found for {team_name} at team_data/{filename}")
+        if instrumentation.ENABLED:
+            instrumentation.error('grab_team_info')
         return None
     except Exception as e:
         print(f"Error loading team data for {team_name}: {e}")
+        if instrumentation.ENABLED:
+            instrumentation.error('grab_team_info')
         return None
 
    
@@ -38,20 +60,7 @@ def calc_WORTH(team_name, tourney_teams):
     Returns:
     float: Winning percentage against tournament teams (0 if no games played)
     """
-    df = grab_team_info(team_name)
-    
-    # Filter for games against tournament teams
-    tournament_games = df[df['opponent'].isin(tourney_teams)]
-    
-    # If no games against tournament teams, return 0
-    if len(tournament_games) == 0:
-        return 0.0
-    
-    wins = len(tournament_games[tournament_games['result'] == 'W'])
-    total_games = len(tournament_games)
-    
-    # Calculate and return winning percentage
-    return wins / total_games
+    return team_metric(team_name, 'WORTH', tourney_teams)
 
 def calc_PRIME(team_name):
     """
@@ -60,17 +69,7 @@ def calc_PRIME(team_name):
     Returns:
     float: Winning percentage against top five ranked opponents (0 if fewer than 5 games played)
     """
-    df = grab_team_info(team_name)
-    ranked_games = df[df['opp_rank'].notna()]
-    
-    # Sort by opponent rank (ascending) and take top 5
-    top_games = ranked_games.sort_values('opp_rank').head(5)
-    
-    # Count wins against top 5 opponents
-    wins = len(top_games[top_games['result'] == 'W'])
-    
-    # Calculate and return winning percentage
-    return wins / 5
+    return team_metric(team_name, 'PRIME')
 
 def calc_ROAD(team_name):
    """
@@ -79,18 +78,7 @@ def calc_ROAD(team_name):
    Returns:
    float: Road/neutral win percentage minus home win percentage
    """
-   df = grab_team_info(team_name)
-   
-   away_games = df[(df['venue'] == 'away') | (df['venue'] == 'neutral')]
-   home_games = df[df['venue'] == 'home']
-   
-   away_wins = len(away_games[away_games['result'] == 'W'])
-   home_wins = len(home_games[home_games['result'] == 'W'])
-   
-   away_win_pct = away_wins / len(away_games) if len(away_games) > 0 else 0
-   home_win_pct = home_wins / len(home_games) if len(home_games) > 0 else 0
-   
-   return away_win_pct - home_win_pct
+   return team_metric(team_name, 'ROAD')
 
 def calc_NERVE(team_name):
    """
@@ -99,69 +87,112 @@ def calc_NERVE(team_name):
    Returns:
    float: Winning percentage in close games (4 points or less difference)
    """
-   df = grab_team_info(team_name)
-   
-   close_games = df[abs(df['t_score_t'] - df['t_score_o']) <= 4]
-   
-   if len(close_games) == 0:
-       return 0.0
-   
-   wins = len(close_games[close_games['result'] == 'W'])
-   
-   return wins / len(close_games)
+   return team_metric(team_name, 'NERVE')
 
 def calc_TEMPO(team_name):
     """
-    TO-DO: Calc tempo info from Miya
+    Calcs: TEMPO
+
+    Returns:
+    float: Average possessions per game (NaN if the team's CSV has no possessions column)
+    """
+    return team_metric(team_name, 'TEMPO')
+
+@traced('load_miya_metrics')
+def load_miya_metrics(team_names, tourney_teams=None, store=None, workers=1):
     """
-    pass
+    Every registered Miya metric for each team, computed from the team's slice of the
+    game log store the first time and served from the metric cache after that (until
+    the team's CSV changes). The store is refreshed from team_data first when not provided.
+    With workers other than 1, uncached teams are computed on a process pool (None = CPU count)
 
-def load_miya_data(team_names, teams_dict):
-    for team in team_names:
-        try:
-            worth_value = calc_WORTH(team, team_names)
-            prime_value = calc_PRIME(team)
-            road_value = calc_ROAD(team)
-            nerve_value = calc_NERVE(team)
+    Returns:
+        pd.DataFrame: Per-team metrics table (one float column per metric)
+    """
+    if store is None:
+        store = ingest_game_logs()
+    field = team_names if tourney_teams is None else tourney_teams
+    return CachedMetrics(store, field).table(team_names, workers=workers)
 
-            teams_dict[team]['WORTH'] = worth_value
-            teams_dict[team]['PRIME'] = prime_value
-            teams_dict[team]['ROAD'] = road_value
-            teams_dict[team]['NERVE'] = nerve_value
-        except Exception as e:
-            print(f"Error calculating metrics for {team}: {e}")
-    return teams_dict
+def load_miya_data(team_names, teams_dict=None, workers=1):
+    """
+    Dictionary form of load_miya_metrics, keyed by team name as predict_winner expects.
+    teams_dict is left untouched; teams whose metrics failed map to an empty dict
+    """
+    metrics = load_miya_metrics(team_names, workers=workers).to_dict('index')
+    base = teams_dict if teams_dict is not None else {}
+    return {team: {**base.get(team, {}), **metrics.get(team, {})} for team in team_names}
 
+def load_team_table(file_path='torvik_data_2025.xlsx', form_window=None, data_dir='team_data'):
+    """
+    Loads Torvik data plus the MIYA metrics of every team in data_dir into a TeamTable
 
-def predict_winner(team1_name, team2_name, torvik_data=None, miya_data=None):
+    Args:
+        form_window (optional): Window spec of form_metrics (e.g. 'last10', 'conference');
+            when given, win_pct, NERVE and ROAD are taken from that window of games
+        data_dir (str): Directory of the Miya CSVs
+    """
+    data = load_team_data(file_path)
+    if data is None:
+        return None
+    store = ingest_game_logs(data_dir)
+    team_names = list(get_teams_dictionary(data_dir=data_dir).keys())
+    miya_data = load_miya_metrics(team_names, store=store)
+    if form_window is not None:
+        miya_data = windowed_miya_data(FormIndex(store, data), form_window, miya_data)
+    return TeamTable(data, miya_data)
+
+# Name resolvers of the Torvik frames passed to predict_winner, keyed by frame id
+_torvik_resolvers = {}
+
+def torvik_resolver(torvik_data):
+    """
+    TeamNameResolver over a Torvik frame's team column, built once per frame
+    """
+    cached = _torvik_resolvers.get(id(torvik_data))
+    if cached is not None and cached[0]() is torvik_data:
+        return cached[1]
+    resolver = TeamNameResolver(torvik_data['team'])
+    _torvik_resolvers[id(torvik_data)] = (weakref.ref(torvik_data, lambda _, key=id(torvik_data): _torvik_resolvers.pop(key, None)), resolver)
+    return resolver
+
+@traced('predict_winner')
+def predict_winner(team1_name, team2_name, torvik_data=None, miya_data=None, table=None, config=None):
     """
     Args:
         team1_name (str): Name of the first team
         team2_name (str): Name of the second team
         torvik_data (pd.DataFrame, optional): DataFrame containing team data
         miya_data (dict, optional): Dictionary containing MIYA metrics for teams
+        table (TeamTable, optional): Prebuilt team index; when given, teams are resolved
+            in O(1) and torvik_data/miya_data are ignored
+        config (dict, optional): Model coefficients, defaults to load_model_config()
     Returns:
         dict: Dictionary containing prediction results
     """
+    if table is not None:
+        return predict_winner_from_table(team1_name, team2_name, table, config)
+
     # Load data if not provided
     if torvik_data is None:
         torvik_data = load_team_data()
         if torvik_data is None and miya_data is None:
             return {"error": "Could not load team data"}
     
-    # Find teams in data
-    team1_df = torvik_data[torvik_data['team'].str.lower() == team1_name.lower()]
-    team2_df = torvik_data[torvik_data['team'].str.lower() == team2_name.lower()]
+    # Find teams in data through the frame's name index instead of scanning the team column
+    resolver = torvik_resolver(torvik_data)
+    team1_id = resolver.resolve_id(team1_name)
+    team2_id = resolver.resolve_id(team2_name)
     
     # Check if teams were found
-    if len(team1_df) == 0:
-        return {"error": f"Team '{team1_name}' not found in data"}
-    if len(team2_df) == 0:
-        return {"error": f"Team '{team2_name}' not found in data"}
+    if team1_id is None:
+        return {"error": f"Team '{team1_name}' not found in data{resolver.did_you_mean(team1_name)}"}
+    if team2_id is None:
+        return {"error": f"Team '{team2_name}' not found in data{resolver.did_you_mean(team2_name)}"}
     
     # Extract team data
-    team1 = team1_df.iloc[0]
-    team2 = team2_df.iloc[0]
+    team1 = torvik_data.iloc[team1_id]
+    team2 = torvik_data.iloc[team2_id]
     
     # Calculate win percentage
     team1_win_pct = team1['wins'] / (team1['wins'] + team1['losses'])
@@ -193,6 +224,17 @@ def predict_winner(team1_name, team2_name, torvik_data=None, miya_data=None):
         # Convert team names to the format used in miya_data (replace spaces with underscores)
         team1_key = team1_name.replace(' ', '_')
         team2_key = team2_name.replace(' ', '_')
+        # Names resolved from another spelling fall back to the Torvik name's file name
+        if team1_key not in miya_data:
+            team1_key = team1['team'].replace(' ', '_')
+        if team2_key not in miya_data:
+            team2_key = team2['team'].replace(' ', '_')
+
+        # Windowed form data (form_metrics) replaces the season win percentage
+        if 'win_pct' in miya_data.get(team1_key, {}):
+            team1_win_pct = miya_data[team1_key]['win_pct']
+        if 'win_pct' in miya_data.get(team2_key, {}):
+            team2_win_pct = miya_data[team2_key]['win_pct']
         
         #if any metric is too high, artificially lower it. Occurs within mid-majors
         if team1_key in miya_data:
@@ -229,17 +271,21 @@ def predict_winner(team1_name, team2_name, torvik_data=None, miya_data=None):
     #     print(f"ROAD: {team2_road:.3f}")
     #     print(f"NERVE: {team2_nerve:.3f}")
     
+    # Coefficients come from model_weights.json (fit_model.py) or the hand-tuned defaults
+    config = config or load_model_config()
+    weights = config['weights']
+
     # Calculate win probability using absolute metrics instead of advantages
     # This makes the model symmetric regardless of team order
     win_prob = 0.5 + (
-        0.03 * (team1_win_pct - team2_win_pct) +
-        0.07 * ((team1_offense - team2_defense) / 100) +
-        0.07 * ((team2_offense - team1_defense) / -100) +
-        0.22 * power_diff +
-        0.04 * (team1_worth - team2_worth) +
-        0.06 * (team1_prime - team2_prime) +
-        0.02 * (team1_road - team2_road) +
-        0.02 * (team1_nerve - team2_nerve)
+        weights['win_pct'] * (team1_win_pct - team2_win_pct) +
+        weights['offense'] * ((team1_offense - team2_defense) / 100) +
+        weights['defense'] * ((team2_offense - team1_defense) / -100) +
+        weights['barthag'] * power_diff +
+        weights['WORTH'] * (team1_worth - team2_worth) +
+        weights['PRIME'] * (team1_prime - team2_prime) +
+        weights['ROAD'] * (team1_road - team2_road) +
+        weights['NERVE'] * (team1_nerve - team2_nerve)
     )
     
     # Ensure probability is between 0 and 1
@@ -257,7 +303,7 @@ def predict_winner(team1_name, team2_name, torvik_data=None, miya_data=None):
             team2_predicted_score += 1
     
     # For close games (win probability between 40% and 60%)
-    if win_prob > .45 and win_prob < .55:
+    if win_prob > config['close_game']['low'] and win_prob < config['close_game']['high']:
         # Calculate how close the game is (0 = exactly 50%, 1 = at 40% or 60%)
         closeness = 1 - abs(win_prob - 0.5) / 0.1
         
@@ -352,6 +398,100 @@ def predict_winner(team1_name, team2_name, torvik_data=None, miya_data=None):
     
     return result
 
+def predict_winner_from_table(team1_name, team2_name, table, config=None):
+    """
+    predict_winner against a TeamTable: O(1) name lookup and array reads, no pandas
+    """
+    team1_id = table.lookup(team1_name)
+    team2_id = table.lookup(team2_name)
+    if team1_id is None:
+        return {"error": f"Team '{team1_name}' not found in data{table.resolver.did_you_mean(team1_name)}"}
+    if team2_id is None:
+        return {"error": f"Team '{team2_name}' not found in data{table.resolver.did_you_mean(team2_name)}"}
+
+    batch = predict_winners_batch([team1_id], [team2_id], table=table, config=config)
+    team1_wins = bool(batch['team1_wins'][0])
+    win_prob = float(batch['team1_win_probability'][0])
+    team1_predicted_score = int(batch['team1_score'][0])
+    team2_predicted_score = int(batch['team2_score'][0])
+
+    winner = team1_name if team1_wins else team2_name
+    predicted_score = f"{team1_predicted_score}-{team2_predicted_score}" if team1_wins else f"{team2_predicted_score}-{team1_predicted_score}"
+
+    result = {"prediction": {
+        "winner": winner,
+        "win_probability": float(batch['win_probability'][0]),
+        "score": predicted_score,
+        "team1_win_probability": win_prob
+    }}
+    for key, name, team_id, score in (("team1", team1_name, team1_id, team1_predicted_score),
+                                      ("team2", team2_name, team2_id, team2_predicted_score)):
+        result[key] = {
+            "name": name,
+            "rank": int(table.rank[team_id]),
+            "record": table.records[team_id],
+            "win_pct": float(table.win_pct[team_id]),
+            "adjoe": float(table.adjoe[team_id]),
+            "adjde": float(table.adjde[team_id]),
+            "barthag": float(table.barthag[team_id]),
+            "predicted_score": score
+        }
+        if table.has_miya[team_id]:
+            for metric in MIYA_FIELDS:
+                result[key][metric] = float(getattr(table, metric)[team_id])
+    return result
+
+@traced('predict_winners_batch')
+def predict_winners_batch(team1_ids, team2_ids, torvik_data=None, miya_data=None, table=None, config=None):
+    """
+    Vectorized predict_winner over arrays of matchups. Gives exactly the same
+    probabilities and scores as calling predict_winner on each pair
+
+    Args:
+        team1_ids (array-like): TeamTable ids (Torvik row positions) of the first teams
+        team2_ids (array-like): TeamTable ids (Torvik row positions) of the second teams
+        torvik_data (pd.DataFrame, optional): DataFrame containing team data
+        miya_data (dict, optional): Dictionary containing MIYA metrics for teams
+        table (TeamTable, optional): Prebuilt table, used instead of torvik_data/miya_data
+        config (dict, optional): Model coefficients, defaults to load_model_config()
+    Returns:
+        dict: Columnar results (one numpy array per field, one entry per matchup)
+    """
+    if table is None:
+        if torvik_data is None:
+            torvik_data = load_team_data()
+        table = TeamTable(torvik_data, miya_data)
+
+    config = config or load_model_config()
+    i = np.asarray(team1_ids, dtype=np.intp)
+    j = np.asarray(team2_ids, dtype=np.intp)
+
+    features = matchup_features(table, i, j)
+    win_prob = linear_probability(features, weight_vector(config))
+
+    team1_offense, team2_offense = table.adjoe[i], table.adjoe[j]
+    team1_defense, team2_defense = table.adjde[i], table.adjde[j]
+    team1_score = np.round(team1_offense * 0.01 * 70 * (100 / team2_defense)).astype(int)
+    team2_score = np.round(team2_offense * 0.01 * 70 * (100 / team1_defense)).astype(int)
+
+    # Ensure different scores (no ties)
+    tied = team1_score == team2_score
+    team1_score = team1_score + (tied & (win_prob > 0.5))
+    team2_score = team2_score + (tied & ~(win_prob > 0.5))
+
+    win_prob = close_game_adjustment(win_prob, features, config['close_game']['low'], config['close_game']['high'])
+
+    team1_wins = win_prob > 0.5
+    return {
+        'team1_id': i,
+        'team2_id': j,
+        'team1_wins': team1_wins,
+        'win_probability': np.where(team1_wins, win_prob, 1 - win_prob),
+        'team1_win_probability': win_prob,
+        'team1_score': team1_score,
+        'team2_score': team2_score,
+    }
+
 def print_matchup_results(results):
     """
     Print the results of a matchup prediction in a readable format
@@ -383,98 +523,90 @@ def print_matchup_results(results):
 
 # Example usage
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Predict every matchup in matchups.xlsx")
+    parser.add_argument('--form-window', help="Take win_pct, NERVE and ROAD from a form_metrics window "
+                                              "('conference', 'last<N>' or a start date) instead of the season")
+    args = parser.parse_args()
 
-    #torvik data that feeds traditional metrics
-    data = load_team_data()
+    if args.form_window is None:
+        #torvik data that feeds traditional metrics
+        data = load_team_data()
 
-    #tournament teams stored in list and dict format (to add metrics to them)
-    teams_dict = get_teams_dictionary()
-    team_names = list(teams_dict.keys())
-    teams_dict = load_miya_data(team_names, teams_dict)
+        #tournament teams stored in list and dict format (to add metrics to them)
+        teams_dict = get_teams_dictionary()
+        team_names = list(teams_dict.keys())
+        teams_dict = load_miya_data(team_names, teams_dict)
+
+        #index teams once so each prediction is an O(1) lookup
+        table = TeamTable(data, teams_dict)
+    else:
+        try:
+            table = load_team_table(form_window=args.form_window)
+        except ValueError as e:
+            print(f"Error: invalid form window {args.form_window}: {e}")
+            raise SystemExit(1)
+        if table is None:
+            raise SystemExit(1)
 
     #grab matchups to parse
     matchups_df = pd.read_excel('matchups.xlsx')
-    results_df = matchups_df.copy()
-    
-    # Add columns for predicted winner, confidence, scores and MIYA metrics
-    results_df['predicted_winner'] = None
-    results_df['confidence'] = None
-    results_df['predicted_score'] = None
-    
-    # Add columns for Team 1 MIYA metrics
-    results_df['team1_WORTH'] = None
-    results_df['team1_PRIME'] = None
-    results_df['team1_ROAD'] = None
-    results_df['team1_NERVE'] = None
-    
-    # Add columns for Team 2 MIYA metrics
-    results_df['team2_WORTH'] = None
-    results_df['team2_PRIME'] = None
-    results_df['team2_ROAD'] = None
-    results_df['team2_NERVE'] = None
-    
-    # Add advantage columns
-    results_df['WORTH_advantage'] = None
-    results_df['PRIME_advantage'] = None
-    results_df['ROAD_advantage'] = None
-    results_df['NERVE_advantage'] = None
-
-    for index, row in matchups_df.iterrows():
-        team1 = row['team_1']
-        team2 = row['team_2']
-        seed1 = row['seed_1']
-        seed2 = row['seed_2']
-        
-        # Call the predict_winner function for each matchup
-        try:
-            prediction = predict_winner(team1, team2, data, teams_dict)
-            
-            # Store the prediction results
-            results_df.at[index, 'predicted_winner'] = prediction['prediction']['winner']
-            results_df.at[index, 'confidence'] = prediction['prediction']['win_probability']
-            results_df.at[index, 'predicted_score'] = prediction['prediction']['score']
-            
-            # Store MIYA metrics for team 1 if available
-            if 'WORTH' in prediction['team1']:
-                results_df.at[index, 'team1_WORTH'] = prediction['team1']['WORTH']
-                results_df.at[index, 'team1_PRIME'] = prediction['team1']['PRIME']
-                results_df.at[index, 'team1_ROAD'] = prediction['team1']['ROAD']
-                results_df.at[index, 'team1_NERVE'] = prediction['team1']['NERVE']
-            
-            # Store MIYA metrics for team 2 if available
-            if 'WORTH' in prediction['team2']:
-                results_df.at[index, 'team2_WORTH'] = prediction['team2']['WORTH']
-                results_df.at[index, 'team2_PRIME'] = prediction['team2']['PRIME']
-                results_df.at[index, 'team2_ROAD'] = prediction['team2']['ROAD']
-                results_df.at[index, 'team2_NERVE'] = prediction['team2']['NERVE']
-            
-            # Calculate and store advantages (team1 - team2)
-            if 'WORTH' in prediction['team1'] and 'WORTH' in prediction['team2']:
-                results_df.at[index, 'WORTH_advantage'] = prediction['team1']['WORTH'] - prediction['team2']['WORTH']
-                results_df.at[index, 'PRIME_advantage'] = prediction['team1']['PRIME'] - prediction['team2']['PRIME']
-                results_df.at[index, 'ROAD_advantage'] = prediction['team1']['ROAD'] - prediction['team2']['ROAD']
-                results_df.at[index, 'NERVE_advantage'] = prediction['team1']['NERVE'] - prediction['team2']['NERVE']
-            
-            # Print progress
-            print(f"Processed matchup {index+1}/{len(matchups_df)}: {team1} ({seed1}) vs {team2} ({seed2})")
-            print(f"  Predicted winner: {prediction['prediction']['winner']} with {prediction['prediction']['win_probability']:.2%} confidence")
-            # print_matchup_results(prediction)
-        except Exception as e:
-            print(f"Error processing matchup {index+1}: {e}")
-
-    # Save the results to an Excel file in the predictions folder
-    # Create predictions directory if it doesn't exist
+
+    # Stream results to CSV in chunks: matchup columns plus typed prediction columns
     predictions_dir = "predictions"
     if not os.path.exists(predictions_dir):
         os.makedirs(predictions_dir)
     
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    output_file = os.path.join(predictions_dir, f'prediction_results_{timestamp}.xlsx')
-    
-    # Save the file
-    results_df.to_excel(output_file, index=False)
+    output_file = os.path.join(predictions_dir, f'prediction_results_{timestamp}.csv')
+    columns = {**matchups_df.dtypes.to_dict(), **PREDICTION_COLUMNS}
+
+    with ResultsSink(output_file, columns) as sink:
+        for index, row in enumerate(matchups_df.to_dict('records')):
+            team1 = row['team_1']
+            team2 = row['team_2']
+            seed1 = row['seed_1']
+            seed2 = row['seed_2']
+            
+            # Call the predict_winner function for each matchup
+            try:
+                with span('predict'):
+                    prediction = predict_winner(team1, team2, table=table)
+                row.update(prediction_record(prediction))
+                
+                # Print progress
+                print(f"Processed matchup {index+1}/{len(matchups_df)}: {team1} ({seed1}) vs {team2} ({seed2})")
+                print(f"  Predicted winner: {prediction['prediction']['winner']} with {prediction['prediction']['win_probability']:.2%} confidence")
+                # print_matchup_results(prediction)
+            except Exception as e:
+                print(f"Error processing matchup {index+1}: {e}")
+            with span('write_results'):
+                sink.append(row)
+        with span('write_results'):
+            sink.flush()
+
     print(f"\nResults saved to {output_file}")
 
+    # Optional Excel copy for bracket.html and spreadsheets
+    excel_file = os.path.join(predictions_dir, f'prediction_results_{timestamp}.xlsx')
+    with span('export_excel'):
+        export_excel(output_file, excel_file)
+    print(f"Excel copy saved to {excel_file}")
+
+    # Compact bracket JSON for bracket.html, with exact advancement odds of the field
+    from bracket_odds import exact_advancement
+    from tournament_sim import advancement_table, load_field, win_probability_matrix
+    odds = None
+    try:
+        with span('advancement_odds'):
+            field = load_field('matchups.xlsx')
+            odds = advancement_table(field, exact_advancement(win_probability_matrix(field['team'], table)))
+    except Exception as e:
+        print(f"Error computing advancement odds, exporting bracket without them: {e}")
+    bracket_file = os.path.join(predictions_dir, f'bracket_{timestamp}.json')
+    with span('export_bracket_json'):
+        export_bracket_json(output_file, bracket_file, odds)
+    print(f"Bracket saved to {bracket_file} (open it with bracket.html)")
+
     # print(teams_dict)
 
     #optional interactive mode
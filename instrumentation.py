@@ -0,0 +1,112 @@
+import atexit
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+# Opt-in stage timing. Set MM_TRACE before starting Python:
+#   MM_TRACE=1 (or summary)   print a summary table at exit
+#   MM_TRACE=trace.json       write the stats as JSON at exit
+# When MM_TRACE is unset, @traced returns the function unchanged, so a disabled run
+# executes exactly the uninstrumented code
+TRACE = os.environ.get('MM_TRACE', '')
+ENABLED = TRACE not in ('', '0')
+
+_stats = {}
+
+def _stage(name):
+    stage = _stats.get(name)
+    if stage is None:
+        stage = _stats[name] = {'calls': 0, 'wall_s': 0.0, 'bytes_read': 0, 'cache_hits': 0, 'cache_misses': 0, 'errors': 0}
+    return stage
+
+def traced(stage):
+    """
+    Decorator recording call count and wall time of a function under a stage name
+    """
+    def decorator(func):
+        if not ENABLED:
+            return func
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record = _stage(stage)
+                record['calls'] += 1
+                record['wall_s'] += time.perf_counter() - start
+        return wrapper
+    return decorator
+
+@contextmanager
+def span(stage):
+    """
+    Context manager version of traced for a block of code
+    """
+    if not ENABLED:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record = _stage(stage)
+        record['calls'] += 1
+        record['wall_s'] += time.perf_counter() - start
+
+# Counters. Call sites guard them with `if instrumentation.ENABLED:` so a disabled run
+# does not even evaluate their arguments (e.g. file sizes)
+def add_bytes(stage, n_bytes):
+    _stage(stage)['bytes_read'] += n_bytes
+
+def cache_hit(stage, count=1):
+    _stage(stage)['cache_hits'] += count
+
+def cache_miss(stage, count=1):
+    _stage(stage)['cache_misses'] += count
+
+def error(stage):
+    _stage(stage)['errors'] += 1
+
+def stats():
+    """
+    Copy of the recorded stats: stage -> calls, wall_s, bytes_read, cache_hits, cache_misses, errors
+    """
+    return {name: dict(record) for name, record in _stats.items()}
+
+def reset():
+    _stats.clear()
+
+def summary_table():
+    """
+    Recorded stats formatted as a table, slowest stage first
+    """
+    lines = [f"{'Stage':28} {'Calls':>7} {'Total':>11} {'Per call':>11} {'Read':>10} {'Hits':>6} {'Misses':>6} {'Errors':>6}"]
+    for name, record in sorted(_stats.items(), key=lambda item: -item[1]['wall_s']):
+        per_call = record['wall_s'] / record['calls'] if record['calls'] else 0
+        lines.append(
+            f"{name:28} {record['calls']:>7} {record['wall_s'] * 1000:>9.2f}ms {per_call * 1e6:>9.1f}us "
+            f"{record['bytes_read'] / 2 ** 20:>8.2f}MB {record['cache_hits']:>6} {record['cache_misses']:>6} {record['errors']:>6}"
+        )
+    return '\n'.join(lines)
+
+def write_trace(file_path):
+    with open(file_path, 'w') as f:
+        json.dump({'argv': sys.argv, 'stages': stats()}, f, indent=2)
+
+def _report():
+    if not _stats:
+        return
+    if TRACE.endswith('.json'):
+        write_trace(TRACE)
+        print(f"\nTrace saved to {TRACE}")
+    else:
+        print("\nStage timings:")
+        print(summary_table())
+
+if ENABLED:
+    atexit.register(_report)
@@ -0,0 +1,276 @@
+import argparse
+import os
+import time
+import numpy as np
+import pandas as pd
+from game_log_store import ingest_game_logs
+from head_to_head import load_team_data, load_miya_metrics, predict_winners_batch
+from miya_metrics import GameLog, compute_metrics
+from team_table import TeamTable
+from tournament_sim import advancement_table, load_field, win_probability_matrix
+
+# Columns of matchups.xlsx holding actual results (scores are optional)
+RESULT_COLUMNS = ['actual_winner', 'actual_score_1', 'actual_score_2']
+
+def round_start(n_teams, r):
+    """
+    Index of the first game of round r (games are numbered round by round, as in matchups.xlsx)
+    """
+    return n_teams - (n_teams >> r)
+
+class LiveTournament:
+    """
+    Exact advancement odds of a bracket with some results already known.
+
+    Every game keeps the probability of each team in its half of the bracket winning
+    it. A result pins its game to the winner, updates the two teams' MIYA metrics with
+    the new game and recomputes only the games on the two teams' paths to the final
+    (at most 2 * rounds games), so each update costs the same however far the
+    tournament has progressed
+    """
+    def __init__(self, field, table, store=None, config=None):
+        """
+        Args:
+            field (pd.DataFrame): team/seed per bracket slot (tournament_sim.load_field)
+            table (TeamTable): Team data; updated in place as results arrive
+            store (GameLogStore, optional): Game logs used for incremental MIYA updates
+            config (dict, optional): Model coefficients, defaults to load_model_config()
+        """
+        self.field = field.reset_index(drop=True)
+        self.table = table
+        self.store = store
+        self.config = config
+        self.n_teams = len(self.field)
+        self.n_rounds = int(np.log2(self.n_teams))
+        self.ids = table.team_ids(self.field['team'])
+        self.P = win_probability_matrix(self.field['team'], table)
+        self.winners = np.full(self.n_teams - 1, -1)
+        self.games = [None] * (self.n_teams - 1)
+        self.advancement = np.zeros((self.n_rounds, self.n_teams))
+        self.logs = {}
+        self.metrics_field = frozenset(store.teams) if store is not None else frozenset()
+        for game in range(self.n_teams - 1):
+            self._play(game)
+
+    def game_slots(self, game):
+        """
+        Round of a game and the bracket slots [start, stop) that feed it
+        """
+        r = int(np.searchsorted([round_start(self.n_teams, k) for k in range(1, self.n_rounds + 1)], game, side='right'))
+        size = 2 ** (r + 1)
+        start = (game - round_start(self.n_teams, r)) * size
+        return r, start, start + size
+
+    def slot_path(self, slot):
+        """
+        Games a bracket slot plays in if it keeps winning, first round to final
+        """
+        return [round_start(self.n_teams, r) + (slot >> (r + 1)) for r in range(self.n_rounds)]
+
+    def _arrivals(self, r, start, stop):
+        # Probability that each slot in [start, stop) reaches this round-r game
+        if r == 0:
+            return np.ones(stop - start)
+        half = (stop - start) // 2
+        first = round_start(self.n_teams, r - 1) + start // half
+        return np.concatenate([self.games[first], self.games[first + 1]])
+
+    def _play(self, game):
+        """
+        Recompute one game's winner distribution from its two feeder games
+        """
+        r, start, stop = self.game_slots(game)
+        half = (stop - start) // 2
+        if self.winners[game] >= 0:
+            result = np.zeros(stop - start)
+            result[self.winners[game] - start] = 1
+        else:
+            arrive = self._arrivals(r, start, stop)
+            upper, lower = arrive[:half], arrive[half:]
+            p_upper = self.P[start:start + half, start + half:stop]
+            result = np.concatenate([upper * (p_upper @ lower), lower * ((1 - p_upper).T @ upper)])
+        self.games[game] = result
+        self.advancement[r, start:stop] = result
+
+    def opponent(self, game, slot):
+        """
+        Slot the team in slot met in game (None while the other half is undecided)
+        """
+        r, start, stop = self.game_slots(game)
+        half = (stop - start) // 2
+        if r == 0:
+            return start + 1 if slot == start else start
+        other = round_start(self.n_teams, r - 1) + (start // half) + (1 if slot < start + half else 0)
+        winner = self.winners[other]
+        return int(winner) if winner >= 0 else None
+
+    def _add_game(self, slot, opponent_slot, win, margin):
+        """
+        Append a neutral-site tournament game to a team's log and refresh its MIYA metrics
+        """
+        table = self.table
+        team_id = self.ids[slot]
+        file_name = table.names[team_id].replace(' ', '_')
+        if self.store is None or file_name not in self.store:
+            return
+        log = self.logs.get(slot)
+        if log is None:
+            log = GameLog.from_frame(self.store.frame(file_name))
+
+        opponent_id = self.ids[opponent_slot]
+        # WORTH matches opponents against the field's file names (underscores)
+        log = GameLog(
+            opponent=np.append(log.opponent, table.names[opponent_id].replace(' ', '_')),
+            opp_rank=np.append(log.opp_rank, table.rank[opponent_id]),
+            win=np.append(log.win, win),
+            home=np.append(log.home, False),
+            away=np.append(log.away, True),
+            margin=np.append(log.margin, margin),
+            possessions=np.append(log.possessions, np.nan),
+        )
+        self.logs[slot] = log
+        table.update_miya(team_id, compute_metrics(log, self.metrics_field))
+
+    def _refresh_probabilities(self, slots):
+        """
+        Re-evaluate the model for every pairing that involves one of slots
+        """
+        slots = np.asarray(slots)
+        everyone = np.arange(self.n_teams)
+        rows = np.repeat(slots, self.n_teams)
+        cols = np.tile(everyone, len(slots))
+        team1 = np.concatenate([self.ids[rows], self.ids[cols]])
+        team2 = np.concatenate([self.ids[cols], self.ids[rows]])
+        p = predict_winners_batch(team1, team2, table=self.table, config=self.config)['team1_win_probability']
+        half = len(rows)
+        self.P[rows, cols] = p[:half]
+        self.P[cols, rows] = p[half:]
+        self.P[slots, slots] = 0.5
+
+    def record_result(self, game, winner, score_1=None, score_2=None):
+        """
+        Pin a game's result and update everything downstream of it
+
+        Args:
+            game (int): Game index (row of matchups.xlsx, 0-62)
+            winner (str): Name of the winning team
+            score_1, score_2 (int, optional): Final score of the winner and the loser
+        Returns:
+            list: Games whose odds were recomputed
+        """
+        r, start, stop = self.game_slots(game)
+        team_id = self.table.team_id(winner)
+        in_game = np.flatnonzero(self.ids[start:stop] == team_id)
+        if len(in_game) == 0:
+            raise ValueError(f"{winner} is not in game {game}")
+        slot = start + int(in_game[0])
+        if self.winners[game] == slot:
+            return []
+        if self.winners[game] >= 0:
+            raise ValueError(f"Game {game} already has winner {self.field['team'][self.winners[game]]}")
+        if self._arrivals(r, start, stop)[slot - start] == 0:
+            raise ValueError(f"{winner} was already eliminated before game {game}")
+
+        self.winners[game] = slot
+        changed = [slot]
+        loser = self.opponent(game, slot)
+        if loser is not None:
+            # Without a score the game still counts for WORTH/PRIME/ROAD; NERVE skips it
+            margin = np.nan if score_1 is None or score_2 is None else abs(float(score_1) - float(score_2))
+            self._add_game(slot, loser, True, margin)
+            self._add_game(loser, slot, False, -margin)
+            self._refresh_probabilities([slot, loser])
+            changed.append(loser)
+
+        games = sorted({g for s in changed for g in self.slot_path(s)})
+        for g in games:
+            self._play(g)
+        return games
+
+    def apply_results(self, results):
+        """
+        Record every new result in a DataFrame with game, winner, score_1 and score_2 columns
+
+        Returns:
+            int: Number of results recorded
+        """
+        recorded = 0
+        for row in results.itertuples(index=False):
+            try:
+                if self.record_result(row.game, row.winner, row.score_1, row.score_2):
+                    recorded += 1
+            except (KeyError, ValueError) as e:
+                print(f"Error recording result of game {row.game}: {e}")
+        return recorded
+
+    def odds(self):
+        """
+        Current advancement table (same layout as tournament_sim's)
+        """
+        return advancement_table(self.field, self.advancement)
+
+def results_from_matchups(matchups_file='matchups.xlsx'):
+    """
+    Actual results entered in matchups.xlsx. The row index is the game index; rows
+    without an actual_winner are games not played yet
+
+    Returns:
+        pd.DataFrame: game, winner, score_1, score_2 (scores are NaN if not entered)
+    """
+    matchups = pd.read_excel(matchups_file)
+    if 'actual_winner' not in matchups:
+        return pd.DataFrame(columns=['game', 'winner', 'score_1', 'score_2'])
+    played = matchups[matchups['actual_winner'].notna()]
+    scores = [played[c] if c in played else pd.Series(np.nan, index=played.index) for c in RESULT_COLUMNS[1:]]
+    # Scores are entered as team_1/team_2 scores: order them winner first
+    team1_won = played['actual_winner'].astype(str).str.casefold() == played['team_1'].astype(str).str.casefold()
+    return pd.DataFrame({
+        'game': played.index,
+        'winner': played['actual_winner'].astype(str),
+        'score_1': np.where(team1_won, scores[0], scores[1]),
+        'score_2': np.where(team1_won, scores[1], scores[0]),
+    })
+
+def load_live_tournament(matchups_file='matchups.xlsx', torvik_file='torvik_data_2025.xlsx'):
+    """
+    Load the team data once and build the live bracket from the matchups.xlsx field
+    """
+    data = load_team_data(torvik_file)
+    if data is None:
+        return None
+    store = ingest_game_logs()
+    table = TeamTable(data, load_miya_metrics(list(store.teams), store=store))
+    return LiveTournament(load_field(matchups_file), table, store)
+
+# Example usage
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Live bracket odds, updated as results are entered in matchups.xlsx")
+    parser.add_argument('--matchups', default='matchups.xlsx', help="Bracket and results (actual_winner, actual_score_1/2 columns)")
+    parser.add_argument('--watch', action='store_true', help="Keep running and apply new results when the file changes")
+    parser.add_argument('--interval', type=float, default=2.0, help="Seconds between checks in --watch mode")
+    parser.add_argument('--output', help="Optional path to save the advancement table (.csv or .xlsx)")
+    args = parser.parse_args()
+
+    live = load_live_tournament(args.matchups)
+    if live is None:
+        raise SystemExit(1)
+
+    last_mtime = None
+    while True:
+        mtime = os.stat(args.matchups).st_mtime_ns
+        if mtime != last_mtime:
+            last_mtime = mtime
+            start = time.perf_counter()
+            recorded = live.apply_results(results_from_matchups(args.matchups))
+            elapsed = time.perf_counter() - start
+            odds = live.odds()
+            print(f"\n{int((live.winners >= 0).sum())} games played ({recorded} new, applied in {elapsed * 1000:.1f}ms)")
+            print(odds.head(16).to_string(index=False, float_format=lambda p: f"{p:.1%}"))
+            if args.output:
+                if args.output.endswith('.csv'):
+                    odds.to_csv(args.output, index=False)
+                else:
+                    odds.to_excel(args.output, index=False)
+        if not args.watch:
+            break
+        time.sleep(args.interval)
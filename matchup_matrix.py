@@ -0,0 +1,258 @@
+import argparse
+import hashlib
+import json
+import os
+import struct
+import numpy as np
+import pandas as pd
+from head_to_head import load_team_table, predict_winners_batch
+from team_names import TeamNameResolver
+from team_table import MIYA_FIELDS, TORVIK_FIELDS
+from torvik_cache import data_signature
+from win_model import load_model_config
+
+MATRIX_VERSION = 2
+DEFAULT_MATRIX_FILE = 'matchup_matrix.bin'
+MAGIC = b'MMMATRIX'
+
+# Matrices stored after the header: name -> dtype. Row = team1, column = team2.
+# Probabilities stay float64: rounding a near-0.5 game to float32 can flip its winner
+MATRICES = {
+    'probability': np.float64,
+    'team1_score': np.int16,
+    'team2_score': np.int16,
+}
+
+# Matrix data starts on a multiple of this many bytes
+ALIGNMENT = 64
+
+def data_version(table, config):
+    """
+    Hash of every model input (team names, Torvik and MIYA arrays, coefficients).
+    The matrix is rebuilt whenever it changes
+    """
+    h = hashlib.sha1()
+    h.update(json.dumps([table.names, config['weights'], config['close_game']], sort_keys=True).encode())
+    for field in TORVIK_FIELDS + MIYA_FIELDS:
+        h.update(getattr(table, field).tobytes())
+    return h.hexdigest()
+
+def source_signature(torvik_file='torvik_data_2025.xlsx', data_dir='team_data', config=None, form_window=None):
+    """
+    Hash of the inputs the team table is loaded from (the Torvik data's
+    torvik_cache.data_signature, then path, mtime and size of every team_data CSV),
+    of the form window and of the coefficients. Checking it does not load the team data
+    """
+    config = config or load_model_config()
+    paths = []
+    if os.path.isdir(data_dir):
+        paths = sorted(entry.path for entry in os.scandir(data_dir) if entry.name.endswith('.csv'))
+    signature = [data_signature(torvik_file)]
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        signature.append([path, stat.st_mtime_ns, stat.st_size])
+    h = hashlib.sha1()
+    h.update(json.dumps([signature, form_window, config['weights'], config['close_game']], sort_keys=True).encode())
+    return h.hexdigest()
+
+def build_matrix(table, file_path=DEFAULT_MATRIX_FILE, config=None, sources=None):
+    """
+    Evaluate the model for every ordered pair of teams in one batch and write the
+    results as a memory-mappable file: a JSON header (team names, data version,
+    source signature, matrix offsets) followed by the float64/int16 matrices
+
+    Args:
+        sources (str, optional): source_signature of the files the table was loaded from
+
+    Returns:
+        MatchupMatrix: The new matrix, opened read-only
+    """
+    config = config or load_model_config()
+    n = len(table)
+    team1_ids, team2_ids = np.meshgrid(np.arange(n), np.arange(n), indexing='ij')
+    batch = predict_winners_batch(team1_ids.ravel(), team2_ids.ravel(), table=table, config=config)
+
+    probability = batch['team1_win_probability'].reshape(n, n).astype(np.float64)
+    np.fill_diagonal(probability, 0.5)
+    matrices = {
+        'probability': probability,
+        'team1_score': batch['team1_score'].reshape(n, n).astype(np.int16),
+        'team2_score': batch['team2_score'].reshape(n, n).astype(np.int16),
+    }
+
+    header = {
+        'version': MATRIX_VERSION,
+        'data_version': data_version(table, config),
+        'sources': sources,
+        'teams': table.names,
+        'offsets': {},
+    }
+    # Offsets depend on the header length and vice versa: size the header with
+    # placeholder offsets, then pad the real one to that size
+    for name in MATRICES:
+        header['offsets'][name] = 10 ** 12
+    header_size = len(MAGIC) + 8 + len(json.dumps(header).encode())
+    offset = -(-header_size // ALIGNMENT) * ALIGNMENT
+    for name, dtype in MATRICES.items():
+        header['offsets'][name] = offset
+        offset += -(-n * n * np.dtype(dtype).itemsize // ALIGNMENT) * ALIGNMENT
+    header_bytes = json.dumps(header).encode()
+    header_bytes += b' ' * (header_size - len(MAGIC) - 8 - len(header_bytes))
+
+    tmp_path = file_path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(MAGIC + struct.pack('<Q', len(header_bytes)) + header_bytes)
+        for name, dtype in MATRICES.items():
+            f.write(b'\0' * (header['offsets'][name] - f.tell()))
+            f.write(np.ascontiguousarray(matrices[name], dtype=np.dtype(dtype).newbyteorder('<')).tobytes())
+    os.replace(tmp_path, file_path)
+    return MatchupMatrix(file_path)
+
+def read_header(file_path):
+    """
+    Header of a matrix file (None if it is missing or not a matrix of this version)
+    """
+    try:
+        with open(file_path, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                return None
+            (length,) = struct.unpack('<Q', f.read(8))
+            header = json.loads(f.read(length))
+    except (OSError, ValueError, struct.error):
+        return None
+    return header if header.get('version') == MATRIX_VERSION else None
+
+class MatchupMatrix:
+    """
+    Read-only view of an all-pairs matrix file. The matrices are memory-mapped, so
+    single cells and rows are read from disk without loading the whole file
+    """
+    def __init__(self, file_path=DEFAULT_MATRIX_FILE):
+        self.file_path = file_path
+        self.header = read_header(file_path)
+        if self.header is None:
+            raise ValueError(f"{file_path} is not a matchup matrix (version {MATRIX_VERSION})")
+        self.teams = self.header['teams']
+        self.data_version = self.header['data_version']
+        self.resolver = TeamNameResolver(self.teams)
+        n = len(self.teams)
+        for name, dtype in MATRICES.items():
+            matrix = np.memmap(file_path, dtype=np.dtype(dtype).newbyteorder('<'), mode='r',
+                               offset=self.header['offsets'][name], shape=(n, n))
+            setattr(self, name, matrix)
+
+    def __len__(self):
+        return len(self.teams)
+
+    def team_id(self, name):
+        """
+        Row/column of a team, raising KeyError if it is not in the matrix
+        """
+        team_id = self.resolver.resolve_id(name)
+        if team_id is None:
+            raise KeyError(f"Team '{name}' not found in matchup matrix{self.resolver.did_you_mean(name)}")
+        return team_id
+
+    def matchup(self, team1_name, team2_name):
+        """
+        One cell of the matrix, in the format of predict_winner's 'prediction' entry
+
+        Returns:
+            dict: winner, win_probability, score and team1_win_probability
+        """
+        i = self.team_id(team1_name)
+        j = self.team_id(team2_name)
+        win_prob = float(self.probability[i, j])
+        team1_wins = win_prob > 0.5
+        score1 = int(self.team1_score[i, j])
+        score2 = int(self.team2_score[i, j])
+        return {
+            'winner': self.teams[i] if team1_wins else self.teams[j],
+            'win_probability': win_prob if team1_wins else 1 - win_prob,
+            'score': f"{score1}-{score2}" if team1_wins else f"{score2}-{score1}",
+            'team1_win_probability': win_prob,
+        }
+
+    def row(self, team_name):
+        """
+        One team against every other team
+
+        Returns:
+            pd.DataFrame: opponent, win_probability, team_score, opponent_score, sorted
+            from the team's hardest matchup to its easiest
+        """
+        i = self.team_id(team_name)
+        others = np.arange(len(self)) != i
+        row = pd.DataFrame({
+            'opponent': np.asarray(self.teams, dtype=object)[others],
+            'win_probability': np.asarray(self.probability[i])[others],
+            'team_score': np.asarray(self.team1_score[i])[others],
+            'opponent_score': np.asarray(self.team2_score[i])[others],
+        })
+        return row.sort_values('win_probability', kind='stable').reset_index(drop=True)
+
+def load_matrix(file_path=DEFAULT_MATRIX_FILE, table=None, config=None, force=False,
+                torvik_file='torvik_data_2025.xlsx', data_dir='team_data', form_window=None):
+    """
+    The matchup matrix for the current data, rebuilt only when it is out of date.
+    Without a table, the input files' signatures and the form window are compared and
+    the team data is loaded (load_team_table) only to rebuild; a given table is
+    compared by its data version
+
+    Returns:
+        MatchupMatrix: Up-to-date matrix (None if the team data could not be loaded)
+    """
+    config = config or load_model_config()
+    header = read_header(file_path)
+
+    if table is None:
+        sources = source_signature(torvik_file, data_dir, config, form_window)
+        if not force and header is not None and header.get('sources') == sources:
+            return MatchupMatrix(file_path)
+        table = load_team_table(torvik_file, form_window, data_dir)
+        if table is None:
+            return None
+        return build_matrix(table, file_path, config, sources)
+
+    if not force and header is not None and header['data_version'] == data_version(table, config):
+        return MatchupMatrix(file_path)
+    return build_matrix(table, file_path, config)
+
+# Example usage
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build and query the all-pairs matchup matrix")
+    parser.add_argument('team', nargs='?', help="Team to show against every opponent")
+    parser.add_argument('opponent', nargs='?', help="Opponent for a single matchup")
+    parser.add_argument('--output', default=DEFAULT_MATRIX_FILE)
+    parser.add_argument('--force', action='store_true', help="Rebuild even if the data is unchanged")
+    parser.add_argument('--torvik-file', default='torvik_data_2025.xlsx')
+    parser.add_argument('--data-dir', default='team_data', help="Directory of the Miya CSVs")
+    parser.add_argument('--form-window', help="Take win_pct, NERVE and ROAD from a form_metrics window "
+                                              "('conference', 'last<N>' or a start date) instead of the season")
+    args = parser.parse_args()
+
+    try:
+        matrix = load_matrix(args.output, force=args.force, torvik_file=args.torvik_file, data_dir=args.data_dir,
+                             form_window=args.form_window)
+    except ValueError as e:
+        print(f"Error: invalid form window {args.form_window}: {e}")
+        raise SystemExit(1)
+    if matrix is None:
+        raise SystemExit(1)
+    print(f"Matchup matrix {args.output}: {len(matrix)} teams, data version {matrix.data_version[:12]}")
+
+    try:
+        if args.team and args.opponent:
+            result = matrix.matchup(args.team, args.opponent)
+            print(f"Winner: {result['winner']} ({result['win_probability']:.1%} probability), score {result['score']}")
+        elif args.team:
+            row = matrix.row(args.team)
+            print(f"\n{args.team} against every opponent (hardest first):")
+            print(row.head(10).to_string(index=False))
+            print("...")
+            print(row.tail(5).to_string(index=False, header=False))
+    except KeyError as e:
+        print(f"Error: {e}")
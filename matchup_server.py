@@ -0,0 +1,288 @@
+import argparse
+import asyncio
+import json
+import os
+import threading
+import time
+from urllib.parse import parse_qs, urlsplit
+import pandas as pd
+from game_log_store import ingest_game_logs
+from head_to_head import load_team_table, predict_winner
+from live_tournament import LiveTournament, results_from_matchups
+from team_table import MIYA_FIELDS
+from torvik_cache import data_signature
+from tournament_sim import load_field
+from win_model import DEFAULT_CONFIG_FILE
+
+DEFAULT_PORT = 8000
+
+# Query parameters each endpoint needs
+REQUIRED_PARAMS = {'/matchup': ['team1', 'team2'], '/team': ['name'], '/result': ['game', 'winner']}
+
+class ModelState:
+    """
+    Team data kept resident between requests. The TeamTable is rebuilt (off the event
+    loop) only when one of the watched files changes; queries keep being answered from
+    the previous table until the new one is swapped in.
+
+    The bracket is kept as a LiveTournament: results entered in matchups.xlsx or
+    posted to /result pin their games and update the two teams' metrics in place.
+    Posted results and the swap to a reloaded bracket share a lock, and results posted
+    while a reload was building are replayed onto the new bracket before it goes live
+    """
+    def __init__(self, torvik_file='torvik_data_2025.xlsx', data_dir='team_data', matchups_file='matchups.xlsx',
+                 form_window=None):
+        self.torvik_file = torvik_file
+        self.data_dir = data_dir
+        self.matchups_file = matchups_file
+        self.form_window = form_window
+        self.table = None
+        self.signature = None
+        self.loaded_at = None
+        self.live = None
+        self.results = []
+        self.lock = threading.Lock()
+
+    def file_signature(self):
+        """
+        The form window, the Torvik data's torvik_cache.data_signature (a fetch that
+        only refreshes the cache changes it, a load that re-parses the sheet does not),
+        then (path, mtime, size) of the Miya CSVs, matchups and model weights
+        """
+        paths = [self.matchups_file, DEFAULT_CONFIG_FILE]
+        if os.path.isdir(self.data_dir):
+            paths += sorted(entry.path for entry in os.scandir(self.data_dir) if entry.name.endswith('.csv'))
+        signature = [('form_window', self.form_window), data_signature(self.torvik_file)]
+        for path in paths:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            signature.append((path, stat.st_mtime_ns, stat.st_size))
+        return tuple(signature)
+
+    def load(self):
+        """
+        Rebuild the table if the files changed since the last load
+
+        Returns:
+            bool: True if the table was (re)loaded
+        """
+        signature = self.file_signature()
+        if signature == self.signature:
+            return False
+        table = load_team_table(self.torvik_file, self.form_window, self.data_dir)
+        if table is None:
+            return False
+        with self.lock:
+            replayed = len(self.results)
+        live = None
+        try:
+            live = LiveTournament(load_field(self.matchups_file), table, ingest_game_logs(self.data_dir))
+            live.apply_results(results_from_matchups(self.matchups_file))
+            live.apply_results(self._results_frame(0, replayed))
+        except Exception as e:
+            print(f"Error loading bracket from {self.matchups_file}: {e}")
+        with self.lock:
+            if live is not None:
+                # Results posted while the new bracket was being built
+                live.apply_results(self._results_frame(replayed, len(self.results)))
+            self.table, self.live, self.signature, self.loaded_at = table, live, signature, time.time()
+        return True
+
+    def _results_frame(self, start, stop):
+        return pd.DataFrame(self.results[start:stop], columns=['game', 'winner', 'score_1', 'score_2'])
+
+    def matchup(self, team1, team2):
+        return predict_winner(team1, team2, table=self.table)
+
+    def team(self, name):
+        table = self.table
+        team_id = table.team_id(name)
+        profile = {
+            'team': table.names[team_id],
+            'record': table.records[team_id],
+            'rank': table.rank[team_id],
+            'win_pct': table.win_pct[team_id],
+            'adjoe': table.adjoe[team_id],
+            'adjde': table.adjde[team_id],
+            'barthag': table.barthag[team_id],
+        }
+        if table.has_miya[team_id]:
+            for field in MIYA_FIELDS:
+                profile[field] = getattr(table, field)[team_id]
+        return profile
+
+    def bracket(self):
+        """
+        Exact round-by-round advancement odds of the matchups.xlsx field, given the
+        results so far
+        """
+        if self.live is None:
+            raise ValueError(f"No bracket loaded from {self.matchups_file}")
+        return self.live.odds().to_dict('records')
+
+    def record_result(self, game, winner, score_1=None, score_2=None):
+        """
+        Pin a posted result; it is replayed after every reload
+        """
+        with self.lock:
+            if self.live is None:
+                raise ValueError(f"No bracket loaded from {self.matchups_file}")
+            games = self.live.record_result(game, winner, score_1, score_2)
+            self.results.append((game, winner, score_1, score_2))
+        return {'game': game, 'winner': winner, 'recomputed_games': games}
+
+def _json_default(value):
+    # numpy scalars
+    if hasattr(value, 'item'):
+        return value.item()
+    return str(value)
+
+def handle_request(state, target, method='GET', body=b''):
+    """
+    Answer one request. GET queries the model; POST /result records a game result,
+    given as query parameters or a JSON body (game, winner, optional score_1/score_2)
+
+    Returns:
+        tuple: (HTTP status, JSON-serializable body)
+    """
+    url = urlsplit(target)
+    params = {key: values[0] for key, values in parse_qs(url.query).items()}
+    if method == 'POST' and body:
+        try:
+            params.update(json.loads(body))
+        except ValueError:
+            return 400, {'error': "Request body is not valid JSON"}
+    if (method == 'POST') != (url.path == '/result'):
+        return 405, {'error': f"Method {method} not allowed for {url.path}"}
+    missing = [name for name in REQUIRED_PARAMS.get(url.path, []) if name not in params]
+    if missing:
+        return 400, {'error': f"Missing query parameters {missing}"}
+    try:
+        if url.path == '/matchup':
+            result = state.matchup(params['team1'], params['team2'])
+            return (404 if 'error' in result else 200), result
+        if url.path == '/team':
+            return 200, state.team(params['name'])
+        if url.path == '/bracket':
+            return 200, state.bracket()
+        if url.path == '/result':
+            return 200, state.record_result(int(params['game']), params['winner'],
+                                            params.get('score_1'), params.get('score_2'))
+        if url.path == '/health':
+            return 200, {'teams': len(state.table), 'loaded_at': state.loaded_at}
+        return 404, {'error': f"Unknown endpoint {url.path}"}
+    except KeyError as e:
+        return 404, {'error': e.args[0]}
+    except ValueError as e:
+        return 400, {'error': str(e)}
+    except Exception as e:
+        return 500, {'error': str(e)}
+
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed', 500: 'Internal Server Error'}
+
+async def serve_client(state, reader, writer):
+    """
+    Minimal HTTP/1.1 handler with keep-alive. Queries run inline on the event loop:
+    they only index the resident TeamTable
+    """
+    try:
+        while True:
+            request_line = await reader.readline()
+            if not request_line:
+                break
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b'\n', b''):
+                    break
+                key, _, value = line.decode('latin-1').partition(':')
+                headers[key.strip().lower()] = value.strip()
+
+            parts = request_line.decode('latin-1').split()
+            if len(parts) != 3:
+                break
+            method, target, version = parts
+            keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+            try:
+                length = int(headers.get('content-length', 0) or 0)
+                if length < 0:
+                    raise ValueError(length)
+            except ValueError:
+                # The body cannot be delimited, so the connection cannot be reused
+                length = None
+                keep_alive = False
+            if length is None:
+                status, body = 400, {'error': f"Invalid Content-Length {headers['content-length']!r}"}
+            elif method not in ('GET', 'POST'):
+                await reader.readexactly(length)
+                status, body = 405, {'error': f"Method {method} not allowed"}
+            else:
+                request_body = await reader.readexactly(length) if length else b''
+                status, body = handle_request(state, target, method, request_body)
+
+            payload = json.dumps(body, default=_json_default).encode()
+            writer.write(
+                f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+                f"Content-Type: application/json\r\n"
+                f"Content-Length: {len(payload)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode() + payload
+            )
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+async def watch_files(state, interval):
+    """
+    Poll the input files and hot-reload the table in a worker thread when they change
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            if await loop.run_in_executor(None, state.load):
+                print(f"Reloaded team data ({len(state.table)} teams)")
+        except Exception as e:
+            print(f"Error reloading team data: {e}")
+
+async def run_server(state, host='127.0.0.1', port=DEFAULT_PORT, reload_interval=2.0):
+    server = await asyncio.start_server(lambda r, w: serve_client(state, r, w), host, port)
+    watcher = asyncio.create_task(watch_files(state, reload_interval))
+    print(f"Serving {len(state.table)} teams on http://{host}:{port} (/matchup, /team, /bracket, /health, POST /result)")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        watcher.cancel()
+
+# Example usage
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Long-running matchup query server")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--torvik-file', default='torvik_data_2025.xlsx')
+    parser.add_argument('--data-dir', default='team_data', help="Directory of the Miya CSVs")
+    parser.add_argument('--matchups', default='matchups.xlsx', help="Bracket used by /bracket")
+    parser.add_argument('--form-window', help="Take win_pct, NERVE and ROAD from a form_metrics window "
+                                              "('conference', 'last<N>' or a start date) instead of the season")
+    parser.add_argument('--reload-interval', type=float, default=2.0, help="Seconds between file change checks")
+    args = parser.parse_args()
+
+    state = ModelState(args.torvik_file, args.data_dir, args.matchups, args.form_window)
+    try:
+        loaded = state.load()
+    except ValueError as e:
+        print(f"Error: invalid form window {args.form_window}: {e}")
+        raise SystemExit(1)
+    if not loaded:
+        print("Error loading team data")
+        raise SystemExit(1)
+    try:
+        asyncio.run(run_server(state, args.host, args.port, args.reload_interval))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,266 @@
+import argparse
+import atexit
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from functools import partial
+import pandas as pd
+import instrumentation
+from game_log_store import DEFAULT_STORE_DIR, ingest_game_logs, store_loader
+from miya_metrics import METRICS, build_metrics_table_parallel, compute_metrics
+
+# Bump when a metric's definition changes so values cached by older code are dropped
+CACHE_VERSION = 1
+# The cache file sits inside the game log store it was computed from
+CACHE_FILE_NAME = 'metric_cache.json'
+DEFAULT_CACHE_FILE = os.path.join(DEFAULT_STORE_DIR, CACHE_FILE_NAME)
+
+def field_key(field):
+    """
+    Short hash identifying a tournament field (order-independent)
+    """
+    return hashlib.sha1('\n'.join(sorted(field)).encode()).hexdigest()[:16]
+
+class MetricCache:
+    """
+    Memoized metric values keyed by (team, metric, game log SHA-1, field hash).
+
+    The field hash is empty for metrics that do not depend on the tournament field.
+    Entries live in a bounded LRU in memory and are persisted to a JSON file. When a
+    team's CSV changes its SHA-1 changes, so old values are never served, and they
+    are dropped as soon as a value for the new file is stored
+    """
+    def __init__(self, cache_file=DEFAULT_CACHE_FILE, max_entries=10000):
+        self.cache_file = cache_file
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hashes = {}
+        self.dirty = False
+        self.load()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def load(self):
+        if not self.cache_file or not os.path.exists(self.cache_file):
+            return
+        try:
+            with open(self.cache_file) as f:
+                data = json.load(f)
+            if data.get('version') != CACHE_VERSION:
+                return
+            for team, metric, sha1, field_hash, value in data['entries']:
+                self.entries[(team, metric, sha1, field_hash)] = value
+                self.hashes[team] = sha1
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Error reading metric cache {self.cache_file}, starting empty: {e}")
+            self.entries.clear()
+            self.hashes.clear()
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def save(self):
+        """
+        Write the cache to disk (least recently used entries first) if it changed
+        """
+        if not self.dirty or not self.cache_file:
+            return
+        os.makedirs(os.path.dirname(self.cache_file) or '.', exist_ok=True)
+        tmp_path = self.cache_file + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'version': CACHE_VERSION, 'entries': [[*key, value] for key, value in self.entries.items()]}, f)
+        os.replace(tmp_path, self.cache_file)
+        self.dirty = False
+
+    def get(self, team, metric, sha1, field_hash=''):
+        """
+        Cached value, or None on a miss
+        """
+        key = (team, metric, sha1, field_hash)
+        value = self.entries.get(key)
+        if value is None:
+            if instrumentation.ENABLED:
+                instrumentation.cache_miss('metric_cache')
+            return None
+        self.entries.move_to_end(key)
+        if instrumentation.ENABLED:
+            instrumentation.cache_hit('metric_cache')
+        return value
+
+    def put(self, team, metric, sha1, value, field_hash=''):
+        if self.hashes.get(team, sha1) != sha1:
+            self.invalidate(team)
+        self.hashes[team] = sha1
+        key = (team, metric, sha1, field_hash)
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        self.dirty = True
+
+    def invalidate(self, team):
+        """
+        Drop every cached value of one team
+        """
+        for key in [key for key in self.entries if key[0] == team]:
+            del self.entries[key]
+        self.hashes.pop(team, None)
+        self.dirty = True
+
+class CachedMetrics:
+    """
+    Lazy metric lookup for the teams of a GameLogStore: a value is computed (from the
+    team's stored game log) the first time it is requested and served from the cache
+    afterwards
+    """
+    def __init__(self, store, field=frozenset(), cache=None):
+        """
+        Args:
+            store (GameLogStore): Game logs; its manifest provides each team's CSV SHA-1
+            field (iterable): Tournament field used by field-dependent metrics (WORTH)
+            cache (MetricCache, optional): Shared cache, defaults to the on-disk cache in
+                the store's directory
+        """
+        self.store = store
+        self.field = frozenset(field)
+        self.field_hash = field_key(self.field)
+        self.cache = cache if cache is not None else default_cache(store.store_dir)
+        self._logs = {}
+
+    def _log(self, team):
+        log = self._logs.get(team)
+        if log is None:
+            log = self._logs[team] = self.store.game_log(team)
+        return log
+
+    def get(self, team, metric):
+        """
+        One metric of one team (file name format, e.g. Michigan_State)
+
+        Returns:
+            float: Metric value, or None if the team has no game log
+        """
+        if team not in self.store:
+            print(f"Team data not found in game log store for {team}")
+            return None
+        sha1 = self.store.teams[team]['sha1']
+        field_hash = self.field_hash if METRICS[metric]['uses_field'] else ''
+        value = self.cache.get(team, metric, sha1, field_hash)
+        if value is None:
+            value = compute_metrics(self._log(team), self.field, [metric])[metric]
+            self.cache.put(team, metric, sha1, value, field_hash)
+        return value
+
+    def team(self, team, metrics=None):
+        """
+        Several metrics of one team as a dict (None if the team has no game log)
+        """
+        values = {}
+        for metric in (METRICS.keys() if metrics is None else metrics):
+            value = self.get(team, metric)
+            if value is None:
+                return None
+            values[metric] = value
+        return values
+
+    def prefetch(self, team_names, metrics=None, workers=None):
+        """
+        Compute every uncached value of team_names on a process pool and cache it
+        (miya_metrics.build_metrics_table_parallel)
+        """
+        columns = list(METRICS.keys() if metrics is None else metrics)
+        missing = []
+        for team in team_names:
+            if team not in self.store:
+                continue
+            sha1 = self.store.teams[team]['sha1']
+            for metric in columns:
+                field_hash = self.field_hash if METRICS[metric]['uses_field'] else ''
+                if (team, metric, sha1, field_hash) not in self.cache.entries:
+                    missing.append(team)
+                    break
+        if not missing:
+            return
+        loader = partial(store_loader, self.store.store_dir, self.store.version)
+        computed = build_metrics_table_parallel(missing, loader, self.field, columns, workers)
+        for team, row in zip(computed.index, computed.to_numpy()):
+            sha1 = self.store.teams[team]['sha1']
+            for metric, value in zip(columns, row.tolist()):
+                self.cache.put(team, metric, sha1, value, self.field_hash if METRICS[metric]['uses_field'] else '')
+
+    def table(self, team_names, metrics=None, workers=1):
+        """
+        Metrics table in the same format as miya_metrics.build_metrics_table. With
+        workers other than 1, cache misses are first computed on a process pool
+
+        Returns:
+            pd.DataFrame: One float64 column per metric, indexed by team name
+        """
+        columns = list(METRICS.keys() if metrics is None else metrics)
+        if workers != 1:
+            self.prefetch(team_names, columns, workers)
+        rows = {}
+        for team in team_names:
+            try:
+                values = self.team(team, columns)
+                if values is not None:
+                    rows[team] = values
+            except Exception as e:
+                print(f"Error calculating metrics for {team}: {e}")
+        self.cache.save()
+
+        table = pd.DataFrame.from_dict(rows, orient='index', columns=columns, dtype='float64')
+        table.index.name = 'team'
+        return table
+
+_defaults = {}
+
+def default_cache(store_dir=DEFAULT_STORE_DIR):
+    """
+    Process-wide cache of one game log store, backed by metric_cache.json in the
+    store's directory and saved at exit
+    """
+    caches = _defaults.setdefault('caches', {})
+    key = os.path.abspath(store_dir)
+    cache = caches.get(key)
+    if cache is None:
+        cache = caches[key] = MetricCache(os.path.join(store_dir, CACHE_FILE_NAME))
+        atexit.register(cache.save)
+    return cache
+
+def team_metric(team_name, metric, field=frozenset(), data_dir='team_data'):
+    """
+    Cached value of one metric for one team. The store is refreshed first if the
+    team's CSV changed since it was ingested
+
+    Args:
+        team_name (str): Team name (spaces or underscores)
+        metric (str): Registered metric name
+        field (iterable): Tournament field, used by field-dependent metrics
+    """
+    team = team_name.replace(' ', '_')
+    store = _defaults.get('store')
+    entry = store.teams.get(team) if store is not None else None
+    try:
+        stat = os.stat(os.path.join(data_dir, team + '.csv'))
+        changed = entry is None or (entry['mtime'], entry['size']) != (stat.st_mtime_ns, stat.st_size)
+    except OSError:
+        changed = store is None
+    if changed:
+        store = _defaults['store'] = ingest_game_logs(data_dir)
+    return CachedMetrics(store, field).get(team, metric)
+
+# Example usage
+if __name__ == "__main__":
+    from team_dictionary import get_teams_dictionary
+
+    parser = argparse.ArgumentParser(description="Compute and cache the Miya metrics of every team in team_data")
+    parser.add_argument('--workers', type=int, default=1, help="Worker processes for uncached teams")
+    args = parser.parse_args()
+
+    store = ingest_game_logs()
+    team_names = list(get_teams_dictionary().keys())
+    metrics = CachedMetrics(store, team_names)
+    print(metrics.table(team_names, workers=args.workers).head())
+    print(f"\n{len(metrics.cache)} cached values in {metrics.cache.cache_file}")
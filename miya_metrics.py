@@ -0,0 +1,232 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from instrumentation import traced
+
+# Registry of Miya metrics: name -> {'func': callable, 'uses_field': bool}
+# Every registered metric is computed from the same GameLog in a single pass, so adding
+# a metric never adds another read of the team's CSV
+METRICS = {}
+
+def register_metric(name, uses_field=False):
+    """
+    Decorator that adds a metric to the registry
+
+    Args:
+        name (str): Column name of the metric in the metrics table
+        uses_field (bool): True if the metric depends on the tournament field (e.g. WORTH)
+    """
+    def decorator(func):
+        METRICS[name] = {'func': traced(f'metric:{name}')(func), 'uses_field': uses_field}
+        return func
+    return decorator
+
+class GameLog:
+    """
+    Column arrays for one team's Miya game log. The masks every metric relies on
+    (wins, venue, scoring margin) are computed once here and shared by all metrics.
+    possessions is NaN for games (or logs) without a possessions column
+    """
+    def __init__(self, opponent, opp_rank, win, home, away, margin, possessions=None):
+        self.opponent = opponent
+        self.opp_rank = opp_rank
+        self.win = win
+        self.home = home
+        self.away = away
+        self.margin = margin
+        self.possessions = np.full(len(win), np.nan) if possessions is None else possessions
+
+    @classmethod
+    def from_frame(cls, df):
+        """
+        Build a GameLog from a Miya game analysis DataFrame
+        """
+        venue = df['venue'].to_numpy()
+        return cls(
+            opponent=df['opponent'].to_numpy(),
+            opp_rank=df['opp_rank'].to_numpy(dtype=float),
+            win=(df['result'] == 'W').to_numpy(),
+            home=venue == 'home',
+            away=(venue == 'away') | (venue == 'neutral'),
+            margin=(df['t_score_t'] - df['t_score_o']).to_numpy(dtype=float),
+            possessions=df['possessions'].to_numpy(dtype=float) if 'possessions' in df else None,
+        )
+
+    def __len__(self):
+        return len(self.win)
+
+    def opponent_in(self, field):
+        """
+        Boolean mask of games played against a team in field (a set of opponent names)
+        """
+        return np.fromiter((opp in field for opp in self.opponent), dtype=bool, count=len(self))
+
+@register_metric('WORTH', uses_field=True)
+def worth(log, field):
+    """
+    WORTH (Wins Over Ranked Tournament-Headed Squads)
+    Winning percentage against tournament teams (0 if no games played)
+    """
+    tournament_games = log.opponent_in(field)
+    total_games = np.count_nonzero(tournament_games)
+    if total_games == 0:
+        return 0.0
+    return np.count_nonzero(log.win & tournament_games) / total_games
+
+@register_metric('PRIME')
+def prime(log, field):
+    """
+    PRIME (Performance Rating In Major Engagements)
+    Winning percentage against the top five ranked opponents (missing games count as losses)
+    """
+    ranked = ~np.isnan(log.opp_rank)
+    ranked_wins = log.win[ranked]
+    top_games = np.argsort(log.opp_rank[ranked], kind='quicksort')[:5]
+    return np.count_nonzero(ranked_wins[top_games]) / 5
+
+@register_metric('ROAD')
+def road(log, field):
+    """
+    ROAD (Reliability Outside Accustomed Domain)
+    Road/neutral win percentage minus home win percentage
+    """
+    away_games = np.count_nonzero(log.away)
+    home_games = np.count_nonzero(log.home)
+    away_win_pct = np.count_nonzero(log.win & log.away) / away_games if away_games > 0 else 0
+    home_win_pct = np.count_nonzero(log.win & log.home) / home_games if home_games > 0 else 0
+    return away_win_pct - home_win_pct
+
+@register_metric('NERVE')
+def nerve(log, field):
+    """
+    NERVE (Narrow Endgame Resolution and Victory Evaluation)
+    Winning percentage in close games (4 points or less difference)
+    """
+    close_games = np.abs(log.margin) <= 4
+    total_games = np.count_nonzero(close_games)
+    if total_games == 0:
+        return 0.0
+    return np.count_nonzero(log.win & close_games) / total_games
+
+@register_metric('TEMPO')
+def tempo(log, field):
+    """
+    TEMPO
+    Average possessions per game (NaN if the game log has no possessions data)
+    """
+    counted = ~np.isnan(log.possessions)
+    if not counted.any():
+        return np.nan
+    return log.possessions[counted].mean()
+
+def compute_metrics(log, field=frozenset(), metrics=None):
+    """
+    Run every registered metric (or the names in metrics) over one GameLog
+
+    Returns:
+        dict: Metric name -> float value
+    """
+    names = METRICS.keys() if metrics is None else metrics
+    return {name: float(METRICS[name]['func'](log, field)) for name in names}
+
+@traced('build_metrics_table')
+def build_metrics_table(team_names, loader, tourney_teams=None, metrics=None):
+    """
+    Load each team's game log exactly once and compute all metrics for it
+
+    Args:
+        team_names (list): Teams to compute metrics for
+        loader (callable): Function returning a team's game log as a GameLog or DataFrame (or None)
+        tourney_teams (iterable, optional): Tournament field used by WORTH, defaults to team_names
+        metrics (list, optional): Subset of registered metric names to compute
+    Returns:
+        pd.DataFrame: One float64 column per metric, indexed by team name
+    """
+    field = frozenset(team_names if tourney_teams is None else tourney_teams)
+    columns = list(METRICS.keys() if metrics is None else metrics)
+
+    rows = {}
+    for team in team_names:
+        try:
+            log = loader(team)
+            if log is None:
+                continue
+            if not isinstance(log, GameLog):
+                log = GameLog.from_frame(log)
+            rows[team] = compute_metrics(log, field, columns)
+        except Exception as e:
+            print(f"Error calculating metrics for {team}: {e}")
+
+    table = pd.DataFrame.from_dict(rows, orient='index', columns=columns, dtype='float64')
+    table.index.name = 'team'
+    return table
+
+# Per-process state of metric workers, set once by _init_metrics_worker
+_worker = {}
+
+def _init_metrics_worker(loader_factory, field, columns):
+    _worker['loader'] = loader_factory()
+    _worker['field'] = field
+    _worker['columns'] = columns
+
+def _compute_shard(teams):
+    """
+    Metrics of one shard of teams as a compact array
+
+    Returns:
+        tuple: (values of shape (teams, metrics), mask of teams with a game log, team -> error message)
+    """
+    loader, field, columns = _worker['loader'], _worker['field'], _worker['columns']
+    values = np.full((len(teams), len(columns)), np.nan)
+    found = np.zeros(len(teams), dtype=bool)
+    errors = {}
+    for k, team in enumerate(teams):
+        try:
+            log = loader(team)
+            if log is None:
+                continue
+            if not isinstance(log, GameLog):
+                log = GameLog.from_frame(log)
+            row = compute_metrics(log, field, columns)
+            values[k] = [row[name] for name in columns]
+            found[k] = True
+        except Exception as e:
+            errors[team] = str(e)
+    return values, found, errors
+
+def build_metrics_table_parallel(team_names, loader_factory, tourney_teams=None, metrics=None, workers=None, shards_per_worker=4):
+    """
+    build_metrics_table with teams sharded across a process pool. Each worker builds
+    its loader and receives the tournament field once, in the pool initializer, and
+    returns array shards; the table is identical to the serial one
+
+    Args:
+        team_names (list): Teams to compute metrics for
+        loader_factory (callable): Picklable function, called once per worker, that
+            returns a loader (e.g. functools.partial(store_loader, store_dir))
+        tourney_teams (iterable, optional): Tournament field used by WORTH, defaults to team_names
+        metrics (list, optional): Subset of registered metric names to compute
+        workers (int, optional): Worker processes, defaults to the CPU count
+    Returns:
+        pd.DataFrame: One float64 column per metric, indexed by team name
+    """
+    team_names = list(team_names)
+    field = frozenset(team_names if tourney_teams is None else tourney_teams)
+    columns = list(METRICS.keys() if metrics is None else metrics)
+
+    n_shards = max(1, min(len(team_names), (workers or os.cpu_count() or 1) * shards_per_worker))
+    shards = [list(shard) for shard in np.array_split(np.asarray(team_names, dtype=object), n_shards)]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_metrics_worker,
+                             initargs=(loader_factory, field, columns)) as pool:
+        results = list(pool.map(_compute_shard, shards))
+
+    values = np.concatenate([v for v, _, _ in results]) if results else np.empty((0, len(columns)))
+    found = np.concatenate([f for _, f, _ in results]) if results else np.empty(0, dtype=bool)
+    for _, _, errors in results:
+        for team, error in errors.items():
+            print(f"Error calculating metrics for {team}: {error}")
+
+    table = pd.DataFrame(values[found], index=pd.Index([t for t, f in zip(team_names, found) if f], name='team'),
+                         columns=columns, dtype='float64')
+    return table
@@ -0,0 +1,218 @@
+import argparse
+import os
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from head_to_head import load_team_table
+from tournament_sim import game_rounds, load_field, sample_brackets, win_probability_matrix
+
+# Points for a correct pick in each round (first round ... championship)
+DEFAULT_SCORING = (1, 2, 4, 8, 16, 32)
+
+def sharpen(P, sharpness):
+    """
+    Push probabilities toward (sharpness > 1) or away from (sharpness < 1) the favorite,
+    keeping P[a, b] + P[b, a] = 1 where the model already does
+    """
+    powered = P ** sharpness
+    return powered / (powered + (1 - P) ** sharpness)
+
+def check_scoring(scoring, n_teams):
+    """
+    Raise ValueError unless scoring has one whole number of points per round of an
+    n_teams bracket
+    """
+    n_rounds = int(np.log2(n_teams))
+    if len(scoring) != n_rounds:
+        raise ValueError(f"Scoring needs one value per round: expected {n_rounds} for {n_teams} teams, got {len(scoring)}")
+    if any(int(points) != points for points in scoring):
+        raise ValueError("Scoring must use whole points per round")
+
+def encode_brackets(winners, scoring):
+    """
+    Weighted one-hot encoding of brackets. Each team plays at most one game per
+    round, so (round, team) identifies a pick: column 64 * round + team holds the
+    points that pick is worth. The score of bracket a against outcome b is then
+    encode_brackets(a) @ encode_brackets(b, ones).T
+
+    Returns:
+        np.ndarray: float32 matrix, shape (brackets, rounds * teams)
+    """
+    n_brackets, n_games = winners.shape
+    n_teams = n_games + 1
+    check_scoring(scoring, n_teams)
+    rounds = game_rounds(n_teams)
+    weights = np.asarray(scoring, dtype=np.float32)[rounds]
+    encoded = np.zeros((n_brackets, len(scoring) * n_teams), dtype=np.float32)
+    rows = np.repeat(np.arange(n_brackets), n_games)
+    encoded[rows, (n_teams * rounds + winners).ravel()] = np.tile(weights, n_brackets)
+    return encoded
+
+def opponent_rank_tables(opponent_scores, max_score):
+    """
+    For every simulated outcome s and score v, how many opponents scored more than v
+    and how many scored at least v. Turns finish-position lookups into array indexing
+
+    Returns:
+        tuple: (greater, at_least), each shape (sims, max_score + 2)
+    """
+    n_opponents, n_sims = opponent_scores.shape
+    width = max_score + 2
+    flat = (np.arange(n_sims)[None, :] * width + opponent_scores).ravel()
+    counts = np.bincount(flat, minlength=n_sims * width).reshape(n_sims, width)
+    at_least = np.cumsum(counts[:, ::-1], axis=1)[:, ::-1]
+    greater = np.zeros_like(at_least)
+    greater[:, :-1] = at_least[:, 1:]
+    return greater, at_least
+
+def evaluate_candidates(candidates, opponents, outcomes, scoring, chunk_size=2000):
+    """
+    Score every candidate bracket against every opponent bracket in every simulated
+    outcome. Work is done as (candidates x picks) @ (picks x outcomes) matrix products,
+    chunked over candidates to keep memory bounded
+
+    Returns:
+        pd.DataFrame: expected_score, expected_finish (1 = first) and win_probability
+        (first place, ties split) per candidate
+    """
+    check_scoring(scoring, outcomes.shape[1] + 1)
+    outcome_picks = encode_brackets(outcomes, np.ones(len(scoring))).T
+    opponent_scores = np.rint(encode_brackets(opponents, scoring) @ outcome_picks).astype(np.int64)
+    max_score = int(np.asarray(scoring)[game_rounds(opponents.shape[1] + 1)].sum())
+    greater, at_least = opponent_rank_tables(opponent_scores, max_score)
+    sims = np.arange(outcomes.shape[0])[None, :]
+
+    expected_score = np.empty(len(candidates))
+    expected_finish = np.empty(len(candidates))
+    win_probability = np.empty(len(candidates))
+    for start in range(0, len(candidates), chunk_size):
+        stop = start + chunk_size
+        scores = np.rint(encode_brackets(candidates[start:stop], scoring) @ outcome_picks).astype(np.int64)
+        beaten_by = greater[sims, scores]
+        tied = at_least[sims, scores] - beaten_by
+        expected_score[start:stop] = scores.mean(axis=1)
+        expected_finish[start:stop] = (1 + beaten_by).mean(axis=1)
+        win_probability[start:stop] = np.where(beaten_by == 0, 1 / (1 + tied), 0).mean(axis=1)
+
+    return pd.DataFrame({
+        'expected_score': expected_score,
+        'expected_finish': expected_finish,
+        'win_probability': win_probability,
+    })
+
+def generate_candidates(P, n_candidates, rng, sharpness=(0.75, 1.0, 1.5, 2.0, 3.0)):
+    """
+    Candidate entries: the chalk bracket plus brackets sampled from the model at a
+    spread of sharpness levels, from contrarian to near-chalk
+    """
+    chalk = sample_brackets(np.where(P > 0.5, 1.0, np.where(P < 0.5, 0.0, 0.5)), 1, rng)
+    per_level = -(-(n_candidates - 1) // len(sharpness))
+    sampled = [sample_brackets(sharpen(P, s), per_level, rng) for s in sharpness]
+    return np.concatenate([chalk] + sampled)[:n_candidates]
+
+def optimize_pool_entry(P, n_candidates=100_000, n_opponents=100, n_sims=1000, scoring=DEFAULT_SCORING,
+                        objective='win_probability', public_sharpness=1.5, seed=0, top_k=100):
+    """
+    Search for the bracket with the best expected pool result.
+
+    Opponent entries are drawn from the model sharpened toward favorites (public
+    pools over-pick chalk), actual tournaments are drawn from the model itself.
+    Every candidate is screened on one sample of opponents and tournaments. The
+    top_k (plus chalk) are then re-scored on a fresh sample from an independent seed,
+    and the entry is picked and its scores reported from that one: the screening
+    leader is partly the candidate that got luckiest on its sample
+
+    Returns:
+        tuple: (best bracket as an array of game winners, evaluation table of the
+        re-scored candidates sorted best first, with a 'candidate' column indexing into
+        the candidate array and the screening value of the objective in 'screening')
+    """
+    check_scoring(scoring, len(P))
+    screening_seed, rescoring_seed = np.random.SeedSequence(seed).spawn(2)
+    rng = np.random.default_rng(screening_seed)
+    candidates = generate_candidates(P, n_candidates, rng)
+    opponents = sample_brackets(sharpen(P, public_sharpness), n_opponents, rng)
+    outcomes = sample_brackets(P, n_sims, rng)
+    screening = evaluate_candidates(candidates, opponents, outcomes, scoring)[objective].to_numpy()
+
+    ascending = objective == 'expected_finish'
+    order = np.argsort(screening if ascending else -screening, kind='stable')
+    finalists = np.union1d(order[:top_k], [0])
+
+    rng = np.random.default_rng(rescoring_seed)
+    opponents = sample_brackets(sharpen(P, public_sharpness), n_opponents, rng)
+    outcomes = sample_brackets(P, n_sims, rng)
+    evaluation = evaluate_candidates(candidates[finalists], opponents, outcomes, scoring)
+    evaluation['candidate'] = finalists
+    evaluation['screening'] = screening[finalists]
+    evaluation = evaluation.sort_values(objective, ascending=ascending, kind='stable').reset_index(drop=True)
+    return candidates[evaluation['candidate'].iloc[0]], evaluation
+
+def bracket_to_matchups(winners, field):
+    """
+    Matchups-style table (team_1, team_2, seed_1, seed_2, predicted_winner) for a bracket,
+    in the game order bracket.html reads
+    """
+    teams = field['team'].tolist()
+    seeds = field['seed'].tolist()
+    entrants = list(range(len(teams)))
+    rows = []
+    game = 0
+    while len(entrants) > 1:
+        next_round = []
+        for k in range(0, len(entrants), 2):
+            a, b = entrants[k], entrants[k + 1]
+            winner = int(winners[game])
+            rows.append({'team_1': teams[a], 'team_2': teams[b], 'seed_1': seeds[a], 'seed_2': seeds[b],
+                         'predicted_winner': teams[winner]})
+            next_round.append(winner)
+            game += 1
+        entrants = next_round
+    return pd.DataFrame(rows)
+
+# Example usage
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Find the bracket entry with the best expected pool result")
+    parser.add_argument('--candidates', type=int, default=100_000, help="Candidate brackets to evaluate")
+    parser.add_argument('--opponents', type=int, default=100, help="Other entries in the pool")
+    parser.add_argument('--sims', type=int, default=1000, help="Simulated tournaments to score against")
+    parser.add_argument('--scoring', default=','.join(map(str, DEFAULT_SCORING)),
+                        help="Points per correct pick in each round, comma separated")
+    parser.add_argument('--objective', choices=['win_probability', 'expected_finish', 'expected_score'],
+                        default='win_probability')
+    parser.add_argument('--public-sharpness', type=float, default=1.5,
+                        help="How strongly simulated opponents favor the model's favorites")
+    parser.add_argument('--top-k', type=int, default=100,
+                        help="Best screened candidates re-scored on a fresh sample before picking")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    field = load_field()
+    P = win_probability_matrix(field['team'], load_team_table())
+    scoring = tuple(int(points) for points in args.scoring.split(','))
+    try:
+        best, evaluation = optimize_pool_entry(P, args.candidates, args.opponents, args.sims, scoring,
+                                               args.objective, args.public_sharpness, args.seed, args.top_k)
+    except ValueError as e:
+        print(f"Error: {e}")
+        raise SystemExit(1)
+
+    top = evaluation.iloc[0]
+    print(f"Re-scored the top {len(evaluation)} of {args.candidates} candidates on {args.sims} fresh tournaments")
+    print(f"Best entry: win probability {top['win_probability']:.2%}, "
+          f"expected finish {top['expected_finish']:.1f} of {args.opponents + 1}, "
+          f"expected score {top['expected_score']:.1f} ({args.objective} on the screening sample: {top['screening']:.4g})")
+    chalk = evaluation[evaluation['candidate'] == 0].iloc[0]
+    print(f"Chalk entry: win probability {chalk['win_probability']:.2%}, "
+          f"expected finish {chalk['expected_finish']:.1f}, expected score {chalk['expected_score']:.1f}")
+
+    bracket = bracket_to_matchups(best, field)
+    print(f"Champion pick: {bracket['predicted_winner'].iloc[-1]}")
+
+    predictions_dir = "predictions"
+    if not os.path.exists(predictions_dir):
+        os.makedirs(predictions_dir)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    output_file = os.path.join(predictions_dir, f'pool_entry_{timestamp}.xlsx')
+    bracket.to_excel(output_file, index=False)
+    print(f"\nBracket saved to {output_file}")
@@ -0,0 +1,216 @@
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from game_log_store import VENUES, ingest_game_logs
+from team_names import TeamNameResolver
+
+# Possessions assumed for games whose log has no possessions column
+DEFAULT_POSSESSIONS = 70
+
+# Ridge penalty (in games) pulling every rating toward the league average; it pins
+# down the otherwise free offset between offense and defense and steadies teams
+# that have played only a few games
+RIDGE = 1.0
+
+# Pythagorean exponent turning adjoe/adjde into a barthag-style power rating
+BARTHAG_EXPONENT = 11.5
+
+def game_table(store):
+    """
+    One row per game from the game log store, with both teams' scores. A game that
+    appears in both teams' logs is kept once. Opponent names are resolved (exactly,
+    never fuzzily) to the team names, so each team is rated once whichever spelling
+    its opponents' logs use
+
+    Returns:
+        pd.DataFrame: date, team, opponent, team_score, opp_score, location (+1 when
+        team was at home, -1 away, 0 neutral) and possessions
+    """
+    arrays = store.arrays
+    lengths = [entry['length'] for entry in store.teams.values()]
+    offsets = [entry['offset'] for entry in store.teams.values()]
+    rows = np.concatenate([np.arange(o, o + n) for o, n in zip(offsets, lengths)]) if lengths else np.empty(0, dtype=np.int64)
+    venue = np.asarray(arrays['venue'])[rows]
+    location = np.select([venue == VENUES.index('home'), venue == VENUES.index('away')], [1, -1], 0)
+    possessions = np.asarray(arrays['possessions'])[rows]
+    teams = [team.replace('_', ' ') for team in store.teams]
+    resolver = TeamNameResolver(teams)
+    opponents = []
+    for name in store.opponents:
+        team_id = resolver.resolve_id(name, fuzzy=False)
+        opponents.append(teams[team_id] if team_id is not None else name.replace('_', ' '))
+    games = pd.DataFrame({
+        'date': np.asarray(arrays['date'])[rows],
+        'team': np.repeat(teams, lengths),
+        'opponent': np.asarray(opponents, dtype=object)[np.asarray(arrays['opponent'])[rows]],
+        'team_score': np.asarray(arrays['t_score_t'])[rows],
+        'opp_score': np.asarray(arrays['t_score_o'])[rows],
+        'location': location,
+        'possessions': np.where(np.isnan(possessions), DEFAULT_POSSESSIONS, possessions),
+    })
+    games = games.dropna(subset=['team_score', 'opp_score'])
+
+    # The same game seen from the opponent's log: same date, teams swapped
+    first = np.minimum(games['team'].to_numpy(), games['opponent'].to_numpy())
+    second = np.maximum(games['team'].to_numpy(), games['opponent'].to_numpy())
+    dated = games['date'].notna().to_numpy()
+    duplicate = pd.DataFrame({'date': games['date'], 'first': first, 'second': second}).duplicated() & dated
+    return games[~duplicate.to_numpy()].reset_index(drop=True)
+
+class RatingSolver:
+    """
+    Opponent-adjusted offensive and defensive efficiency from game scores.
+
+    Each game gives two observations, one per offense: points per 100 possessions
+    = league average + offense of the scoring team + defense of the other team
+    +/- home-court advantage. The ratings are the ridge least-squares solution,
+    found with conjugate gradient on the normal equations. The normal matrix is
+    never formed: its products are np.bincount sums over the observations, so each
+    iteration is linear in the number of games. Every solve starts from the previous
+    solution, so re-solving after a day of new games takes a few iterations
+    """
+    def __init__(self, ridge=RIDGE, tol=1e-16, max_iter=1000):
+        self.ridge = ridge
+        self.tol = tol
+        self.max_iter = max_iter
+        self.teams = []
+        self.team_ids = {}
+        self.solution = None
+        self.iterations = 0
+        self.average = None
+
+    def _ids(self, names):
+        for name in pd.unique(names):
+            if name not in self.team_ids:
+                self.team_ids[name] = len(self.teams)
+                self.teams.append(name)
+        return np.array([self.team_ids[name] for name in names], dtype=np.intp)
+
+    def solve(self, games):
+        """
+        Solve for every team in games (game_table format), warm-starting from the last solution
+
+        Returns:
+            pd.DataFrame: Ratings (see ratings_table)
+        """
+        team = self._ids(games['team'].to_numpy())
+        opponent = self._ids(games['opponent'].to_numpy())
+        possessions = games['possessions'].to_numpy(dtype=float)
+        location = games['location'].to_numpy(dtype=float)
+
+        # Two observations per game: team on offense, then opponent on offense
+        offense = np.concatenate([team, opponent])
+        defense = np.concatenate([opponent, team])
+        home = np.concatenate([location, -location])
+        y = 100 * np.concatenate([games['team_score'].to_numpy(dtype=float), games['opp_score'].to_numpy(dtype=float)]) / np.tile(possessions, 2)
+        self.average = y.mean()
+        y = y - self.average
+
+        n = len(self.teams)
+        # x = [offense ratings (n), defense ratings (n), home-court advantage]
+        x = np.zeros(2 * n + 1)
+        if self.solution is not None:
+            # Teams are only ever appended, so the previous ratings keep their ids
+            previous = (len(self.solution) - 1) // 2
+            x[:previous] = self.solution[:previous]
+            x[n:n + previous] = self.solution[previous:2 * previous]
+            x[-1] = self.solution[-1]
+
+        def residual_products(r):
+            # A^T r
+            return np.concatenate([np.bincount(offense, r, n), np.bincount(defense, r, n), [home @ r]])
+
+        def normal_product(v):
+            # (A^T A + ridge * I) v, with the home-court term left unpenalized
+            product = residual_products(v[offense] + v[n + defense] + v[-1] * home)
+            product[:-1] += self.ridge * v[:-1]
+            return product
+
+        # Jacobi preconditioner: the diagonal of the normal matrix
+        diagonal = np.concatenate([np.bincount(offense, minlength=n) + self.ridge,
+                                   np.bincount(defense, minlength=n) + self.ridge, [home @ home or 1]])
+        b = residual_products(y)
+        r = b - normal_product(x)
+        z = r / diagonal
+        p = z.copy()
+        rz = r @ z
+        threshold = self.tol * max(b @ b, 1e-300)
+        iterations = 0
+        while iterations < self.max_iter and r @ r > threshold:
+            Ap = normal_product(p)
+            alpha = rz / (p @ Ap)
+            x += alpha * p
+            r -= alpha * Ap
+            z = r / diagonal
+            rz_next = r @ z
+            p = z + (rz_next / rz) * p
+            rz = rz_next
+            iterations += 1
+
+        self.solution = x
+        self.iterations = iterations
+        counts = np.bincount(offense, minlength=n)
+        return ratings_table(self.teams, self.average + x[:n], self.average + x[n:2 * n], x[-1], counts)
+
+def ratings_table(teams, adjoe, adjde, home_advantage, games):
+    """
+    Ratings with the same column names as the Torvik sheet, sorted by barthag
+
+    Returns:
+        pd.DataFrame: team, games, adjoe, adjde, barthag, rank (home_advantage in .attrs)
+    """
+    barthag = adjoe ** BARTHAG_EXPONENT / (adjoe ** BARTHAG_EXPONENT + adjde ** BARTHAG_EXPONENT)
+    table = pd.DataFrame({'team': teams, 'games': games, 'adjoe': adjoe, 'adjde': adjde, 'barthag': barthag})
+    table = table.sort_values('barthag', ascending=False).reset_index(drop=True)
+    table['rank'] = np.arange(1, len(table) + 1)
+    table.attrs['home_advantage'] = home_advantage
+    return table
+
+def solve_by_day(games, solver=None):
+    """
+    Re-solve after each day of games, warm-starting every solve from the previous day
+
+    Yields:
+        tuple: (date, ratings, CG iterations)
+    """
+    solver = solver or RatingSolver()
+    dated = games[games['date'].notna()].sort_values('date', kind='stable')
+    dates = dated['date'].to_numpy()
+    for day in np.unique(dates):
+        ratings = solver.solve(dated[dates <= day])
+        yield day, ratings, solver.iterations
+
+# Example usage
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Opponent-adjusted efficiency ratings from the team_data game logs")
+    parser.add_argument('--as-of', help="Only use games up to this date (YYYY-MM-DD)")
+    parser.add_argument('--by-day', action='store_true', help="Re-solve after every day of games, with warm starts")
+    parser.add_argument('--top', type=int, default=25)
+    parser.add_argument('--output', help="Optional path to save the ratings (.csv or .xlsx)")
+    args = parser.parse_args()
+
+    games = game_table(ingest_game_logs())
+    if args.as_of:
+        games = games[games['date'] <= np.datetime64(args.as_of)]
+    solver = RatingSolver()
+
+    if args.by_day:
+        start = time.perf_counter()
+        days = 0
+        for day, ratings, iterations in solve_by_day(games, solver):
+            days += 1
+        print(f"Solved {days} days in {time.perf_counter() - start:.2f}s (last solve {iterations} iterations)")
+    else:
+        start = time.perf_counter()
+        ratings = solver.solve(games)
+        print(f"Solved {len(games)} games, {len(solver.teams)} teams in {(time.perf_counter() - start) * 1000:.0f}ms ({solver.iterations} iterations)")
+
+    print(f"Home-court advantage: {ratings.attrs['home_advantage']:.2f} points per 100 possessions")
+    print(ratings.head(args.top).to_string(index=False, float_format=lambda v: f"{v:.3f}"))
+    if args.output:
+        if args.output.endswith('.csv'):
+            ratings.to_csv(args.output, index=False)
+        else:
+            ratings.to_excel(args.output, index=False)
+        print(f"\nRatings saved to {args.output}")
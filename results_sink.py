@@ -0,0 +1,277 @@
+import argparse
+import json
+import os
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+FORMATS = {'.csv': 'csv', '.jsonl': 'jsonl', '.parquet': 'parquet'}
+
+# Excel's sheet limit, header row included
+EXCEL_MAX_ROWS = 1048576
+
+# Typed columns of one prediction, in output order. Metrics are NaN for teams without Miya data
+PREDICTION_COLUMNS = {
+    'predicted_winner': 'object',
+    'confidence': 'float64',
+    'predicted_score': 'object',
+    'team1_WORTH': 'float64',
+    'team1_PRIME': 'float64',
+    'team1_ROAD': 'float64',
+    'team1_NERVE': 'float64',
+    'team2_WORTH': 'float64',
+    'team2_PRIME': 'float64',
+    'team2_ROAD': 'float64',
+    'team2_NERVE': 'float64',
+    'WORTH_advantage': 'float64',
+    'PRIME_advantage': 'float64',
+    'ROAD_advantage': 'float64',
+    'NERVE_advantage': 'float64',
+}
+
+METRIC_NAMES = ['WORTH', 'PRIME', 'ROAD', 'NERVE']
+
+# Bump when the layout of the bracket JSON read by bracket.html changes
+BRACKET_JSON_VERSION = 1
+
+def prediction_record(prediction):
+    """
+    Flatten a predict_winner result into the PREDICTION_COLUMNS fields
+    """
+    record = {
+        'predicted_winner': prediction['prediction']['winner'],
+        'confidence': prediction['prediction']['win_probability'],
+        'predicted_score': prediction['prediction']['score'],
+    }
+    for side in ('team1', 'team2'):
+        if 'WORTH' in prediction[side]:
+            for metric in METRIC_NAMES:
+                record[f'{side}_{metric}'] = prediction[side][metric]
+    if 'WORTH' in prediction['team1'] and 'WORTH' in prediction['team2']:
+        for metric in METRIC_NAMES:
+            record[f'{metric}_advantage'] = prediction['team1'][metric] - prediction['team2'][metric]
+    return record
+
+def _column_dtype(dtype):
+    """
+    numpy dtype for numeric/bool columns, object for everything else (strings, pandas extension types)
+    """
+    try:
+        dtype = np.dtype(dtype)
+    except TypeError:
+        return np.dtype(object)
+    return dtype if dtype.kind in 'fiub' else np.dtype(object)
+
+def _arrow_type(dtype):
+    if dtype.kind == 'f':
+        return pa.float64()
+    if dtype.kind in 'iu':
+        return pa.int64()
+    if dtype.kind == 'b':
+        return pa.bool_()
+    return pa.string()
+
+class ResultsSink:
+    """
+    Streams records to CSV, JSONL or Parquet in fixed-size chunks.
+
+    Records are buffered as one list per column and written (with the declared dtypes)
+    every chunk_size rows, so memory stays flat however many rows are appended
+    """
+    def __init__(self, file_path, columns, chunk_size=10000):
+        """
+        Args:
+            file_path (str): Output file; the format comes from its extension
+            columns (dict): Column name -> dtype, in output order
+            chunk_size (int): Rows buffered before each write
+        """
+        self.format = FORMATS.get(os.path.splitext(file_path)[1].lower())
+        if self.format is None:
+            raise ValueError(f"Unsupported results format {file_path}, expected one of {list(FORMATS)}")
+        if self.format == 'parquet' and pa is None:
+            raise ImportError("Parquet output requires pyarrow (pip install pyarrow)")
+
+        self.file_path = file_path
+        self.columns = {name: _column_dtype(dtype) for name, dtype in columns.items()}
+        self.chunk_size = chunk_size
+        self.rows_written = 0
+        self._buffer = {name: [] for name in self.columns}
+        self._buffered = 0
+
+        if self.format == 'parquet':
+            schema = pa.schema([(name, _arrow_type(dtype)) for name, dtype in self.columns.items()])
+            self._writer = pq.ParquetWriter(file_path, schema)
+        else:
+            self._file = open(file_path, 'w', newline='', encoding='utf-8')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def append(self, record):
+        """
+        Buffer one record (a dict); missing fields are written as empty/NaN
+        """
+        for name, values in self._buffer.items():
+            values.append(record.get(name))
+        self._buffered += 1
+        if self._buffered >= self.chunk_size:
+            self.flush()
+
+    def chunk(self):
+        """
+        Buffered rows as a DataFrame with the declared dtypes
+        """
+        return pd.DataFrame({name: pd.Series(values, dtype=self.columns[name]) for name, values in self._buffer.items()})
+
+    def flush(self):
+        if not self._buffered:
+            return
+        df = self.chunk()
+        if self.format == 'csv':
+            df.to_csv(self._file, header=self.rows_written == 0, index=False)
+        elif self.format == 'jsonl':
+            self._file.write(df.to_json(orient='records', lines=True).rstrip('\n') + '\n')
+        else:
+            self._writer.write_table(pa.Table.from_pandas(df, schema=self._writer.schema, preserve_index=False))
+        self.rows_written += self._buffered
+        self._buffer = {name: [] for name in self.columns}
+        self._buffered = 0
+
+    def close(self):
+        self.flush()
+        if self.format == 'parquet':
+            self._writer.close()
+        else:
+            self._file.close()
+
+def read_results(file_path, chunk_size=10000):
+    """
+    Iterate over a results file written by ResultsSink in DataFrame chunks. Excel
+    results (.xlsx, e.g. final_results_3-17.xlsx or an export_excel copy) are read too
+    """
+    extension = os.path.splitext(file_path)[1].lower()
+    fmt = FORMATS.get(extension)
+    if extension == '.xlsx':
+        # A sheet holds at most EXCEL_MAX_ROWS rows, so it is read whole and then chunked
+        df = pd.read_excel(file_path)
+        for start in range(0, len(df), chunk_size):
+            yield df.iloc[start:start + chunk_size]
+    elif fmt == 'csv':
+        yield from pd.read_csv(file_path, chunksize=chunk_size)
+    elif fmt == 'jsonl':
+        yield from pd.read_json(file_path, lines=True, chunksize=chunk_size)
+    elif fmt == 'parquet':
+        if pq is None:
+            raise ImportError("Reading Parquet results requires pyarrow (pip install pyarrow)")
+        for batch in pq.ParquetFile(file_path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    else:
+        raise ValueError(f"Unsupported results format {file_path}, expected one of {list(FORMATS) + ['.xlsx']}")
+
+def export_excel(results_path, excel_path, chunk_size=10000):
+    """
+    Copy a streamed results file into an Excel sheet, chunk by chunk (write-only
+    workbook, so memory stays flat). Results beyond Excel's row limit are not exported
+
+    Returns:
+        int: Rows exported
+    """
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    rows = 0
+    header = False
+    for df in read_results(results_path, chunk_size):
+        if not header:
+            sheet.append(list(df.columns))
+            header = True
+        df = df.astype(object).where(df.notna(), None)
+        for row in df.itertuples(index=False, name=None):
+            if rows + 1 >= EXCEL_MAX_ROWS:
+                print(f"Excel export of {results_path} truncated at {rows} rows")
+                workbook.save(excel_path)
+                return rows
+            sheet.append(row)
+            rows += 1
+    workbook.save(excel_path)
+    return rows
+
+def _json_value(value):
+    # NaN/missing -> None, numpy scalars -> Python scalars
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return None
+    return value.item() if hasattr(value, 'item') else value
+
+def bracket_game(game, row):
+    """
+    Compact bracket entry of one results row. Scores are given team_1 first
+    (predicted_score is written winner first); winner is 0 for team_1, 1 for team_2
+    """
+    teams = [_json_value(row['team_1']), _json_value(row['team_2'])]
+    winner = _json_value(row.get('predicted_winner'))
+    entry = {
+        'game': game,
+        'teams': teams,
+        'seeds': [_json_value(row.get('seed_1')), _json_value(row.get('seed_2'))],
+        'winner': teams.index(winner) if winner in teams else None,
+        'confidence': _json_value(row.get('confidence')),
+        'score': None,
+    }
+    score = _json_value(row.get('predicted_score'))
+    if entry['winner'] is not None and isinstance(score, str) and '-' in score:
+        winner_score, loser_score = (int(points) for points in score.split('-', 1))
+        entry['score'] = [winner_score, loser_score] if entry['winner'] == 0 else [loser_score, winner_score]
+    if entry['confidence'] is not None:
+        entry['confidence'] = round(entry['confidence'], 4)
+    return entry
+
+def export_bracket_json(results_path, json_path, odds=None, chunk_size=10000):
+    """
+    Write the compact bracket JSON loaded by bracket.html: one entry per game (rows
+    of the results file, in bracket order) plus optional advancement odds
+
+    Args:
+        results_path (str): Results file written by ResultsSink, or an .xlsx results sheet
+        json_path (str): Output .json file
+        odds (pd.DataFrame, optional): Advancement table (team, seed and one column per round)
+    Returns:
+        int: Games exported
+    """
+    games = []
+    for df in read_results(results_path, chunk_size):
+        for row in df.to_dict('records'):
+            games.append(bracket_game(len(games), row))
+
+    bracket = {'version': BRACKET_JSON_VERSION, 'games': games}
+    if odds is not None:
+        rounds = [column for column in odds.columns if column not in ('team', 'seed')]
+        bracket['odds'] = {
+            'rounds': rounds,
+            'teams': {str(row['team']): [round(float(row[r]), 4) for r in rounds] for row in odds.to_dict('records')},
+        }
+    with open(json_path, 'w', encoding='utf-8') as f:
+        json.dump(bracket, f, separators=(',', ':'))
+    return len(games)
+
+# Example usage
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert a results file to the bracket JSON loaded by bracket.html")
+    parser.add_argument('results', help="Results file (.csv, .jsonl, .parquet or .xlsx), in bracket order")
+    parser.add_argument('--output', help="Bracket JSON to write (default: the results path with a .json extension)")
+    args = parser.parse_args()
+
+    output = args.output or os.path.splitext(args.results)[0] + '.json'
+    try:
+        games = export_bracket_json(args.results, output)
+    except (OSError, ValueError) as e:
+        print(f"Error converting {args.results}: {e}")
+        raise SystemExit(1)
+    print(f"Bracket JSON with {games} games saved to {output}")
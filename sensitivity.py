@@ -0,0 +1,290 @@
+import argparse
+import itertools
+import numpy as np
+import pandas as pd
+from head_to_head import load_team_table
+from win_model import FEATURES, close_game_adjustment, linear_probability, load_model_config, matchup_features, weight_vector
+
+# How a unit change in a team input moves the features: input -> ((feature, change) if
+# the team is team1, (feature, change) if it is team2). Mirrors matchup_features
+INPUT_EFFECTS = {
+    'adjoe': (('offense', 0.01), ('defense', -0.01)),
+    'adjde': (('defense', 0.01), ('offense', -0.01)),
+    'barthag': (('barthag', 1), ('barthag', -1)),
+    'win_pct': (('win_pct', 1), ('win_pct', -1)),
+    'WORTH': (('WORTH', 1), ('WORTH', -1)),
+    'PRIME': (('PRIME', 1), ('PRIME', -1)),
+    'ROAD': (('ROAD', 1), ('ROAD', -1)),
+    'NERVE': (('NERVE', 1), ('NERVE', -1)),
+}
+
+# Range scanned for input flip thresholds (+/- this much)
+INPUT_RANGES = {'adjoe': 10, 'adjde': 10, 'barthag': 0.2, 'win_pct': 0.3, 'WORTH': 0.5, 'PRIME': 0.5, 'ROAD': 0.5, 'NERVE': 0.5}
+
+# Rows of weights x matchups evaluated per broadcast chunk
+CHUNK_CELLS = 2_000_000
+
+def model_probability_grid(X, weights, delta=None, config=None):
+    """
+    Final team1 win probability for a stack of scenarios in one broadcast evaluation
+
+    Args:
+        X (np.ndarray): Base features, shape (matchups, len(FEATURES))
+        weights (np.ndarray): One weight vector per scenario, shape (scenarios, len(FEATURES))
+        delta (np.ndarray, optional): Feature shifts broadcastable to (scenarios, matchups, len(FEATURES))
+    Returns:
+        np.ndarray: Shape (scenarios, matchups)
+    """
+    config = config or load_model_config()
+    weights = np.asarray(weights, dtype=float)
+    low, high = config['close_game']['low'], config['close_game']['high']
+    result = np.empty((len(weights), len(X)))
+    step = max(1, CHUNK_CELLS // max(len(weights), 1))
+    for start in range(0, len(X), step):
+        stop = start + step
+        features = X[start:stop] if delta is None else X[start:stop] + np.broadcast_to(
+            delta, (len(weights), len(X), len(FEATURES)))[:, start:stop]
+        result[:, start:stop] = close_game_adjustment(linear_probability(features, weights), features, low, high)
+    return result
+
+def feature_delta(input_name, side, values):
+    """
+    Feature shifts of changing one team input by each of values
+
+    Args:
+        input_name (str): Key of INPUT_EFFECTS
+        side (int): 0 to shift team1's input, 1 for team2's
+    Returns:
+        np.ndarray: Shape (len(values), 1, len(FEATURES))
+    """
+    feature, change = INPUT_EFFECTS[input_name][side]
+    delta = np.zeros((len(values), 1, len(FEATURES)))
+    delta[:, 0, FEATURES.index(feature)] = np.asarray(values) * change
+    return delta
+
+def team_delta(input_name, team_id, value, team1_ids, team2_ids):
+    """
+    Feature shifts of changing one team's input by value in every matchup it plays
+
+    Returns:
+        np.ndarray: Shape (matchups, len(FEATURES))
+    """
+    delta = np.zeros((len(team1_ids), len(FEATURES)))
+    for side, ids in enumerate((team1_ids, team2_ids)):
+        feature, change = INPUT_EFFECTS[input_name][side]
+        delta[:, FEATURES.index(feature)] += (np.asarray(ids) == team_id) * value * change
+    return delta
+
+def partial_derivatives(X, config=None, h=1e-5):
+    """
+    Central-difference derivatives of win probability with respect to every weight
+    and every team input, all scenarios evaluated in one batch
+
+    Returns:
+        pd.DataFrame: Columns d_w_<feature>, d_<input>_team1, d_<input>_team2 (one row per matchup)
+    """
+    config = config or load_model_config()
+    base = weight_vector(config)
+    weights = []
+    deltas = []
+    names = []
+    for k, feature in enumerate(FEATURES):
+        for sign in (1, -1):
+            w = base.copy()
+            w[k] += sign * h
+            weights.append(w)
+            deltas.append(np.zeros((1, len(FEATURES))))
+        names.append(f'd_w_{feature}')
+    for input_name in INPUT_EFFECTS:
+        for side in (0, 1):
+            for sign in (1, -1):
+                weights.append(base)
+                deltas.append(feature_delta(input_name, side, [sign * h])[0])
+            names.append(f'd_{input_name}_team{side + 1}')
+
+    p = model_probability_grid(X, np.array(weights), np.array(deltas), config)
+    return pd.DataFrame(((p[0::2] - p[1::2]) / (2 * h)).T, columns=names)
+
+def _nearest_flip(values, p, base_value, base_pick):
+    """
+    Value nearest base_value at which the pick flips, linearly interpolated between
+    scanned points (NaN if it never flips in the scanned range)
+
+    Args:
+        values (np.ndarray): Scanned values, ascending, shape (steps,)
+        p (np.ndarray): Win probability at each value, shape (steps, matchups)
+    """
+    picks = p > 0.5
+    flipped = picks != base_pick
+    crossing = picks[1:] != picks[:-1]
+    # Interpolated location of every crossing between consecutive scanned values
+    p0, p1 = p[:-1], p[1:]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t = np.clip((0.5 - p0) / (p1 - p0), 0, 1)
+    location = values[:-1, None] + t * (values[1:] - values[:-1])[:, None]
+    distance = np.where(crossing, np.abs(location - base_value), np.inf)
+    nearest = np.argmin(distance, axis=0)
+    columns = np.arange(p.shape[1])
+    result = location[nearest, columns]
+    return np.where(np.isfinite(distance[nearest, columns]) & flipped.any(axis=0), result, np.nan)
+
+def flip_thresholds(X, config=None, steps=401):
+    """
+    For every matchup, the weight value (per feature) and the input shift (per team
+    input, for either team) nearest the current model at which the pick flips.
+    Each sweep is one broadcast evaluation over all matchups
+
+    Returns:
+        pd.DataFrame: Columns flip_w_<feature> (weight value) and
+        flip_<input>_team1/2 (shift of that team's input); NaN where the pick never flips
+    """
+    config = config or load_model_config()
+    base = weight_vector(config)
+    base_pick = model_probability_grid(X, base[None], config=config)[0] > 0.5
+    columns = {}
+    for k, feature in enumerate(FEATURES):
+        values = np.linspace(0, max(2 * base[k], 0.1), steps)
+        weights = np.repeat(base[None], steps, axis=0)
+        weights[:, k] = values
+        p = model_probability_grid(X, weights, config=config)
+        columns[f'flip_w_{feature}'] = _nearest_flip(values, p, base[k], base_pick)
+    for input_name, limit in INPUT_RANGES.items():
+        values = np.linspace(-limit, limit, steps)
+        weights = np.repeat(base[None], steps, axis=0)
+        for side in (0, 1):
+            p = model_probability_grid(X, weights, feature_delta(input_name, side, values), config)
+            columns[f'flip_{input_name}_team{side + 1}'] = _nearest_flip(values, p, 0.0, base_pick)
+    return pd.DataFrame(columns)
+
+def parse_weight_spec(spec):
+    """
+    'barthag=0.14,0.18,0.22' -> ('barthag', [0.14, 0.18, 0.22])
+    """
+    name, _, values = spec.partition('=')
+    if name not in FEATURES:
+        raise ValueError(f"Unknown weight {name}, expected one of {FEATURES}")
+    return name, [float(v) for v in values.split(',')]
+
+def parse_shift_spec(spec):
+    """
+    'Duke:adjde=1,2' -> ('Duke', 'adjde', [1.0, 2.0])
+    """
+    team, _, rest = spec.rpartition(':')
+    name, _, values = rest.partition('=')
+    if name not in INPUT_EFFECTS:
+        raise ValueError(f"Unknown input {name}, expected one of {list(INPUT_EFFECTS)}")
+    return team, name, [float(v) for v in values.split(',')]
+
+def scenario_grid(X, table, team1_ids, team2_ids, weight_specs=(), shift_specs=(), config=None):
+    """
+    Every combination of the weight and input settings, evaluated in one batch
+
+    Args:
+        weight_specs (list): (feature, values) pairs, e.g. from parse_weight_spec
+        shift_specs (list): (team, input, values) triples, e.g. from parse_shift_spec
+    Returns:
+        tuple: (scenario labels, win probabilities of shape (scenarios, matchups))
+    """
+    config = config or load_model_config()
+    base = weight_vector(config)
+    axes = [[(feature, value) for value in values] for feature, values in weight_specs]
+    axes += [[(team, name, value) for value in values] for team, name, values in shift_specs]
+
+    labels = []
+    weights = []
+    deltas = []
+    for combination in itertools.product(*axes):
+        w = base.copy()
+        delta = np.zeros((len(X), len(FEATURES)))
+        for setting in combination:
+            if len(setting) == 2:
+                w[FEATURES.index(setting[0])] = setting[1]
+            else:
+                team, name, value = setting
+                delta += team_delta(name, table.team_id(team), value, team1_ids, team2_ids)
+        labels.append(', '.join(f"{s[0]}={s[1]:g}" if len(s) == 2 else f"{s[0]} {s[1]}{s[2]:+g}" for s in combination))
+        weights.append(w)
+        deltas.append(delta)
+    return labels, model_probability_grid(X, np.array(weights), np.array(deltas), config)
+
+def sensitivity_report(table, team1_ids, team2_ids, weight_specs=(), shift_specs=(), config=None):
+    """
+    Base probabilities, derivatives, flip thresholds and scenario flips for every
+    matchup, plus a fragility ranking
+
+    Returns:
+        tuple: (per-matchup report DataFrame, scenario labels, scenario probabilities)
+    """
+    config = config or load_model_config()
+    X = matchup_features(table, team1_ids, team2_ids)
+    base = model_probability_grid(X, weight_vector(config)[None], config=config)[0]
+
+    report = pd.DataFrame({
+        'team_1': [table.names[i] for i in team1_ids],
+        'team_2': [table.names[j] for j in team2_ids],
+        'team1_win_probability': base,
+        'pick': np.where(base > 0.5, [table.names[i] for i in team1_ids], [table.names[j] for j in team2_ids]),
+    })
+    labels, scenarios = scenario_grid(X, table, team1_ids, team2_ids, weight_specs, shift_specs, config)
+    report['scenario_flips'] = ((scenarios > 0.5) != (base > 0.5)).sum(axis=0)
+
+    thresholds = flip_thresholds(X, config)
+    derivatives = partial_derivatives(X, config)
+
+    # Fragility: the smallest relative weight change or input shift (in units of its
+    # scan range) that flips the pick, so 0 is a coin flip and 1 never flips in range
+    base_weights = weight_vector(config)
+    relative = [np.abs(thresholds[f'flip_w_{f}'] - w) / max(w, 0.05) for f, w in zip(FEATURES, base_weights)]
+    relative += [np.abs(thresholds[f'flip_{name}_team{side}']) / limit
+                 for name, limit in INPUT_RANGES.items() for side in (1, 2)]
+    report['fragility'] = 1 - np.clip(np.fmin.reduce(np.array(relative), axis=0), 0, 1)
+    report['fragility'] = report['fragility'].fillna(0)
+
+    return pd.concat([report, thresholds, derivatives], axis=1), labels, scenarios
+
+# Example usage
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="What-if and sensitivity analysis of every matchup")
+    parser.add_argument('--matchups', default='matchups.xlsx')
+    parser.add_argument('--weight', action='append', default=[], help="Weight values to try, e.g. barthag=0.18,0.26")
+    parser.add_argument('--shift', action='append', default=[], help="Team input shifts to try, e.g. 'Duke:adjde=1,2'")
+    parser.add_argument('--top', type=int, default=15, help="Fragile picks to show")
+    parser.add_argument('--output', help="Optional path to save the full report (.csv or .xlsx)")
+    args = parser.parse_args()
+
+    table = load_team_table()
+    if table is None:
+        raise SystemExit(1)
+    matchups = pd.read_excel(args.matchups)
+    team1_ids = table.team_ids(matchups['team_1'])
+    team2_ids = table.team_ids(matchups['team_2'])
+
+    try:
+        weight_specs = [parse_weight_spec(spec) for spec in args.weight]
+        shift_specs = [parse_shift_spec(spec) for spec in args.shift]
+        report, labels, scenarios = sensitivity_report(table, team1_ids, team2_ids, weight_specs, shift_specs)
+    except (KeyError, ValueError) as e:
+        print(f"Error: {e}")
+        raise SystemExit(1)
+
+    if weight_specs or shift_specs:
+        base_pick = report['team1_win_probability'].to_numpy() > 0.5
+        print("Scenarios:")
+        for label, p in zip(labels, scenarios):
+            flipped = np.flatnonzero((p > 0.5) != base_pick)
+            games = ', '.join(f"{report['team_1'][g]} vs {report['team_2'][g]}" for g in flipped)
+            print(f"  {label}: {len(flipped)} picks flip" + (f" ({games})" if games else ""))
+
+    print("\nMost fragile picks:")
+    fragile = report.sort_values('fragility', ascending=False).head(args.top)
+    for _, row in fragile.iterrows():
+        print(f"  {row['team_1']} vs {row['team_2']}: {row['pick']} ({max(row['team1_win_probability'], 1 - row['team1_win_probability']):.1%}), "
+              f"fragility {row['fragility']:.2f}, flips at barthag weight {row['flip_w_barthag']:.3f}, "
+              f"team1 adjde {row['flip_adjde_team1']:+.2f}, team2 adjde {row['flip_adjde_team2']:+.2f}")
+
+    if args.output:
+        if args.output.endswith('.csv'):
+            report.to_csv(args.output, index=False)
+        else:
+            report.to_excel(args.output, index=False)
+        print(f"\nReport saved to {args.output}")
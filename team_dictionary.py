@@ -1,20 +1,27 @@
 import os
 
-def get_teams_dictionary():
+def get_teams_dictionary(resolver=None, data_dir='team_data'):
     """
     Creates a dictionary of all teams that have a file in the team_data directory.
     Returns a dictionary with team names as keys and empty dictionaries as values.
+
+    Args:
+        resolver (TeamNameResolver, optional): When given, each entry records the
+            canonical name its file resolves to under 'team' (None if unmatched)
+        data_dir (str): Directory of the Miya CSVs
     """
     teams_dict = {}
     
     # Get all CSV files from the team_data directory
-    team_files = [f for f in os.listdir('team_data') if f.endswith('.csv') and not f.startswith('.')]
+    team_files = [f for f in os.listdir(data_dir) if f.endswith('.csv') and not f.startswith('.')]
     
     # Create dictionary entries for each team
     for team_file in team_files:
         # Remove the .csv extension to get the team name
         team_name = team_file[:-4]
         teams_dict[team_name] = {}
+        if resolver is not None:
+            teams_dict[team_name]['team'] = resolver.resolve(team_name)
     
     return teams_dict
 
@@ -0,0 +1,179 @@
+import re
+from collections import defaultdict
+
+# Normalization rules, compiled once. A trailing "St." is "State" (Michigan St.), any
+# other "St." is "Saint" (St. John's, Mount St. Mary's)
+_STATE_SUFFIX = re.compile(r'\bst\.?$')
+_SAINT = re.compile(r'\bst\.?\s+')
+_INSTITUTION = re.compile(r'\b(?:university|college|univ)\b')
+_THE_PREFIX = re.compile(r'^the\s+')
+_PUNCTUATION = re.compile(r'[^\w\s]')
+_SPACES = re.compile(r'\s+')
+
+_MISSING = object()
+
+def normalize_team_name(name, keep_institution=False):
+    """
+    Normalize team names to handle common variations (case, Saint/State/St.,
+    ampersands, "University", "The", hyphens/underscores and punctuation).
+    keep_institution leaves "University"/"College" in, so Boston College and
+    Boston University stay apart
+    """
+    name = str(name).lower().replace('&', ' and ').replace('-', ' ').replace('_', ' ')
+    name = _SPACES.sub(' ', name).strip()
+    name = _STATE_SUFFIX.sub('state', name)
+    name = _SAINT.sub('saint ', name)
+    if not keep_institution:
+        name = _INSTITUTION.sub('', name)
+    name = _THE_PREFIX.sub('', name)
+    name = _PUNCTUATION.sub('', name)
+    return _SPACES.sub(' ', name).strip()
+
+def name_ngrams(normalized, n=3):
+    """
+    Set of character n-grams of a normalized name, padded so word edges count
+    """
+    padded = f" {normalized} "
+    return {padded[i:i + n] for i in range(max(len(padded) - n + 1, 1))}
+
+def _add_key(index, key, team_id):
+    # A key shared by several teams maps to the tuple of their ids
+    current = index.get(key)
+    if current is None:
+        index[key] = team_id
+    elif isinstance(current, tuple):
+        if team_id not in current:
+            index[key] = current + (team_id,)
+    elif current != team_id:
+        index[key] = (current, team_id)
+
+class TeamNameResolver:
+    """
+    Resolves team names from any source (Torvik sheet, team_data file names, user input)
+    to one list of canonical names.
+
+    Every canonical name is normalized once into two hash indexes: spelling only
+    (Michigan St. -> michigan state) and, looser, without "University"/"College". A
+    normalized key shared by several teams (Boston College and Boston University are
+    both "boston") resolves to none of them. Names that miss both fall back to an
+    n-gram index, which only scores the canonical names sharing an n-gram with the
+    query, so an unknown name never costs a scan of every team. Results are memoized
+    """
+    def __init__(self, names, n=3, cutoff=0.75):
+        """
+        Args:
+            names (iterable): Canonical team names; a name's id is its position
+            n (int): n-gram length of the fuzzy index
+            cutoff (float): Minimum Dice similarity for a fuzzy match
+        """
+        self.names = [str(name) for name in names]
+        self.n = n
+        self.cutoff = cutoff
+        self.exact = {}
+        self.spelling = {}
+        self.index = {}
+        self.grams = defaultdict(list)
+        self.gram_counts = []
+        self._resolved = {}
+
+        for team_id, name in enumerate(self.names):
+            self.exact.setdefault(name, team_id)
+            self.exact.setdefault(name.casefold(), team_id)
+            _add_key(self.spelling, normalize_team_name(name, keep_institution=True), team_id)
+            normalized = normalize_team_name(name)
+            _add_key(self.index, normalized, team_id)
+            grams = name_ngrams(normalized, n)
+            self.gram_counts.append(len(grams))
+            for gram in grams:
+                self.grams[gram].append(team_id)
+
+    def __len__(self):
+        return len(self.names)
+
+    def matches(self, name, limit=3):
+        """
+        Closest canonical names by n-gram (Dice) similarity
+
+        Returns:
+            list: (team id, similarity) pairs, best first
+        """
+        grams = name_ngrams(normalize_team_name(name), self.n)
+        shared = defaultdict(int)
+        for gram in grams:
+            for team_id in self.grams.get(gram, ()):
+                shared[team_id] += 1
+        scored = [(team_id, 2 * count / (len(grams) + self.gram_counts[team_id])) for team_id, count in shared.items()]
+        scored.sort(key=lambda item: (-item[1], item[0]))
+        return scored[:limit]
+
+    def candidates(self, name):
+        """
+        Ids of the teams an ambiguous name could be (its normalized key is shared by
+        several teams), or an empty tuple
+        """
+        team_ids = self.spelling.get(normalize_team_name(name, keep_institution=True))
+        if team_ids is None:
+            team_ids = self.index.get(normalize_team_name(name))
+        return team_ids if isinstance(team_ids, tuple) else ()
+
+    def resolve_id(self, name, fuzzy=False):
+        """
+        Id of the canonical name matching name: exact, then case-insensitive, then
+        normalized, then (if fuzzy) the best n-gram match above the cutoff. A name
+        whose normalized key is shared by several teams is ambiguous and resolves to
+        None, fuzzy or not; did_you_mean lists the candidates.
+
+        Fuzzy matching is off by default: a near miss such as 'Mississippi' would
+        resolve to a different real team (Mississippi State). Model paths stay exact;
+        use did_you_mean for suggestions
+
+        Returns:
+            int: Team id, or None if nothing matches
+        """
+        team_id = self.exact.get(name)
+        if team_id is not None:
+            return team_id
+
+        key = (name, fuzzy)
+        team_id = self._resolved.get(key, _MISSING)
+        if team_id is not _MISSING:
+            return team_id
+
+        team_id = self.exact.get(str(name).casefold())
+        if team_id is None:
+            team_id = self.spelling.get(normalize_team_name(name, keep_institution=True))
+        if team_id is None:
+            team_id = self.index.get(normalize_team_name(name))
+        if isinstance(team_id, tuple):
+            team_id = None
+        elif team_id is None and fuzzy:
+            best = self.matches(name, limit=1)
+            if best and best[0][1] >= self.cutoff:
+                team_id = best[0][0]
+
+        if len(self._resolved) >= 4096:
+            self._resolved.clear()
+        self._resolved[key] = team_id
+        return team_id
+
+    def did_you_mean(self, name, limit=3):
+        """
+        ' (did you mean ...?)' suffix for an error message about an unknown name, or ''
+        """
+        suggestions = [self.names[team_id] for team_id in self.candidates(name)]
+        if not suggestions:
+            suggestions = [self.names[team_id] for team_id, score in self.matches(name, limit) if score >= self.cutoff]
+        return f" (did you mean {', '.join(suggestions)}?)" if suggestions else ""
+
+    def resolve(self, name, fuzzy=False):
+        """
+        Canonical name matching name (None if nothing matches)
+        """
+        team_id = self.resolve_id(name, fuzzy)
+        return None if team_id is None else self.names[team_id]
+
+# Example usage
+if __name__ == "__main__":
+    resolver = TeamNameResolver(["Michigan State", "Saint John's", "Mount St. Mary's", "Texas A&M", "Boston College", "Boston University"])
+    for query in ["Michigan_St.", "St. John's", "Mount Saint Marys", "texas a&m", "Michigan Stat", "Boston_College", "Boston"]:
+        print(f"{query!r} -> {resolver.resolve(query)!r}{resolver.did_you_mean(query) if resolver.resolve(query) is None else ''}")
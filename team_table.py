@@ -0,0 +1,110 @@
+import numpy as np
+import pandas as pd
+from team_names import TeamNameResolver
+
+# Torvik columns copied into the table as float arrays
+TORVIK_FIELDS = ['wins', 'losses', 'adjoe', 'adjde', 'barthag', 'rank']
+
+# MIYA metrics used as predict_winner inputs
+MIYA_FIELDS = ['WORTH', 'PRIME', 'ROAD', 'NERVE']
+
+class TeamTable:
+    """
+    Compact index of every Torvik team, built once at load time.
+
+    Teams are identified by their row position (an integer id). Canonical names,
+    case-folded names and underscore file names (Michigan_State) all resolve to that
+    id through one dictionary, and every model input is a contiguous float64 array,
+    so predictions never touch pandas. Other spellings (St./Saint/State, punctuation,
+    near misses) go through a TeamNameResolver.
+    """
+    def __init__(self, torvik_data, miya_data=None):
+        """
+        Args:
+            torvik_data (pd.DataFrame): DataFrame containing team data
+            miya_data (dict or pd.DataFrame, optional): MIYA metrics keyed by file name
+        """
+        self.names = torvik_data['team'].astype(str).tolist()
+        self.records = torvik_data['record'].astype(str).tolist() if 'record' in torvik_data else [''] * len(self.names)
+        n = len(self.names)
+
+        self.ids = {}
+        for team_id, name in enumerate(self.names):
+            file_name = name.replace(' ', '_')
+            for key in (name, name.casefold(), file_name, file_name.casefold()):
+                self.ids.setdefault(key, team_id)
+        self.resolver = TeamNameResolver(self.names)
+
+        for field in TORVIK_FIELDS:
+            setattr(self, field, np.ascontiguousarray(torvik_data[field].to_numpy(dtype=np.float64)))
+        self.win_pct = self.wins / (self.wins + self.losses)
+        # Tempo is optional (older sheets and caches lack adjt): NaN when unknown
+        self.adjt = np.ascontiguousarray(torvik_data['adjt'].to_numpy(dtype=np.float64)) if 'adjt' in torvik_data else np.full(n, np.nan)
+
+        # MIYA metrics default to 0, with the same mid-major caps as predict_winner
+        if isinstance(miya_data, pd.DataFrame):
+            miya_data = miya_data.to_dict('index')
+        self.has_miya = np.zeros(n, dtype=bool)
+        for field in MIYA_FIELDS:
+            setattr(self, field, np.zeros(n))
+        self.TEMPO = np.full(n, np.nan)
+        if miya_data is not None:
+            for team_id, name in enumerate(self.names):
+                metrics = miya_data.get(name.replace(' ', '_'))
+                if metrics is None:
+                    continue
+                self.has_miya[team_id] = True
+                for field in MIYA_FIELDS:
+                    getattr(self, field)[team_id] = metrics.get(field, 0)
+                self.TEMPO[team_id] = metrics.get('TEMPO', np.nan)
+                # Windowed form data (form_metrics) replaces the season win percentage
+                if 'win_pct' in metrics:
+                    self.win_pct[team_id] = metrics['win_pct']
+            self.WORTH[self.WORTH == 1] = .25
+            self.NERVE[self.NERVE == 1] = .8
+
+    def update_miya(self, team_id, metrics):
+        """
+        Replace one team's MIYA metrics in place, with the same caps as at load time
+        """
+        self.has_miya[team_id] = True
+        for field in MIYA_FIELDS:
+            getattr(self, field)[team_id] = metrics.get(field, 0)
+        self.TEMPO[team_id] = metrics.get('TEMPO', np.nan)
+        if self.WORTH[team_id] == 1:
+            self.WORTH[team_id] = .25
+        if self.NERVE[team_id] == 1:
+            self.NERVE[team_id] = .8
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return self.lookup(name) is not None
+
+    def lookup(self, name):
+        """
+        Team id for a canonical, case-insensitive or underscore file name, falling back
+        to the name resolver's normalized spellings (None if unknown; never a fuzzy guess)
+        """
+        team_id = self.ids.get(name)
+        if team_id is None:
+            team_id = self.ids.get(name.casefold())
+        if team_id is None:
+            team_id = self.resolver.resolve_id(name)
+        return team_id
+
+    def team_id(self, name):
+        """
+        Team id for a name, raising KeyError if the team is not in the table
+        """
+        team_id = self.lookup(name)
+        if team_id is None:
+            raise KeyError(f"Team '{name}' not found in data{self.resolver.did_you_mean(name)}")
+        return team_id
+
+    def team_ids(self, names):
+        """
+        Array of team ids for an iterable of names
+        """
+        return np.fromiter((self.team_id(name) for name in names), dtype=np.intp)
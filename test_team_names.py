@@ -0,0 +1,23 @@
+from team_names import TeamNameResolver
+
+TEAMS = ["Boston College", "Boston University", "Michigan State", "Mississippi State"]
+
+def test_shared_normalized_key_is_ambiguous():
+    resolver = TeamNameResolver(TEAMS)
+    # "University"/"College" are stripped, so both schools normalize to "boston"
+    assert resolver.resolve("Boston") is None
+    assert resolver.resolve("Boston Univ.") is None
+    assert resolver.resolve("Boston", fuzzy=True) is None
+    assert resolver.did_you_mean("Boston") == " (did you mean Boston College, Boston University?)"
+
+def test_distinct_spellings_still_resolve():
+    resolver = TeamNameResolver(TEAMS)
+    assert resolver.resolve("Boston College") == "Boston College"
+    assert resolver.resolve("boston university") == "Boston University"
+    assert resolver.resolve("Boston_College") == "Boston College"
+    assert resolver.resolve("Michigan St.") == "Michigan State"
+
+def test_near_miss_is_only_a_suggestion():
+    resolver = TeamNameResolver(TEAMS)
+    assert resolver.resolve("Mississippi") is None
+    assert "Mississippi State" in resolver.did_you_mean("Mississippi")
@@ -0,0 +1,151 @@
+import json
+import os
+import pandas as pd
+import instrumentation
+from game_log_store import file_sha1
+
+CACHE_VERSION = 1
+
+# Columns the prediction model and tools use, out of the 47 in the Torvik sheet
+MODEL_COLUMNS = ['rank', 'team', 'conf', 'record', 'wins', 'losses', 'adjoe', 'adjde', 'barthag', 'adjt']
+
+# Torvik's CSV is parsed without quoting, which leaves a stray quote on the tempo header
+RENAMED_COLUMNS = {'adjt"': 'adjt'}
+
+# Compact dtypes for the projected columns; the efficiency columns stay float64 so
+# predictions are unchanged
+COLUMN_DTYPES = {
+    'rank': 'int16',
+    'wins': 'int16',
+    'losses': 'int16',
+    'conf': 'category',
+}
+
+def cache_paths(file_path):
+    """
+    Cache data and metadata paths that sit next to a Torvik source file
+    """
+    base = os.path.splitext(file_path)[0]
+    return f"{base}.cache.pkl", f"{base}.cache.json"
+
+def select_columns(df, columns):
+    return df[[c for c in columns if c in df.columns]]
+
+def project_columns(df, columns=MODEL_COLUMNS):
+    """
+    Keep only the needed columns (those present) and convert them to compact dtypes
+    """
+    df = select_columns(df.rename(columns=RENAMED_COLUMNS), columns).copy()
+    for column, dtype in COLUMN_DTYPES.items():
+        if column in df.columns:
+            df[column] = df[column].astype(dtype)
+    return df.reset_index(drop=True)
+
+def write_cache(df, file_path, source=None):
+    """
+    Store a projected Torvik frame in the binary cache for file_path
+
+    Args:
+        df (pd.DataFrame): Projected Torvik data
+        file_path (str): Source file the cache belongs to (it need not exist)
+        source (dict, optional): Staleness info about the source (mtime, size, sha1, ...)
+    """
+    data_path, meta_path = cache_paths(file_path)
+    tmp_path = data_path + '.tmp'
+    df.to_pickle(tmp_path)
+    os.replace(tmp_path, data_path)
+    with open(meta_path, 'w') as f:
+        json.dump({'version': CACHE_VERSION, 'columns': list(df.columns), 'source': source or {}}, f)
+
+def source_info(file_path, sha1=None):
+    stat = os.stat(file_path)
+    return {'mtime': stat.st_mtime_ns, 'size': stat.st_size, 'sha1': sha1 or file_sha1(file_path)}
+
+def read_cache_meta(file_path):
+    _, meta_path = cache_paths(file_path)
+    try:
+        with open(meta_path) as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return meta if meta.get('version') == CACHE_VERSION else None
+
+def data_signature(file_path):
+    """
+    Identity of the data load_torvik_data(file_path) would serve, found without loading
+    it. A cache written by base_data_grab is identified by its fetch stamp (fetched_at
+    and sha1) while it is at least as new as the sheet; otherwise the sheet's mtime and
+    size identify it. Parsing the sheet rewrites the cache but not this signature
+
+    Returns:
+        tuple: Signature (None if there is neither a sheet nor a cache)
+    """
+    data_path, _ = cache_paths(file_path)
+    meta = read_cache_meta(file_path)
+    source = meta['source'] if meta is not None and os.path.exists(data_path) else None
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        stat = None
+    if source is not None and 'fetched_at' in source and (stat is None or stat.st_mtime_ns <= source['fetched_at']):
+        return ('cache', source['fetched_at'], source.get('sha1'))
+    if stat is not None:
+        return ('sheet', stat.st_mtime_ns, stat.st_size)
+    if source is not None:
+        # Cache of a sheet that has since been removed
+        stat = os.stat(data_path)
+        return ('cache', stat.st_mtime_ns, stat.st_size)
+    return None
+
+def _record_cache_read(path, hit):
+    if not instrumentation.ENABLED:
+        return
+    if hit:
+        instrumentation.cache_hit('torvik_cache')
+    else:
+        instrumentation.cache_miss('torvik_cache')
+    instrumentation.add_bytes('torvik_cache', os.path.getsize(path))
+
+def load_torvik_data(file_path='torvik_data_2025.xlsx', columns=MODEL_COLUMNS):
+    """
+    Torvik data for file_path, served from the binary cache whenever it is fresh.
+
+    The cache is fresh when the source's mtime and size are unchanged, or when they
+    changed but its SHA-1 did not. Otherwise the xlsx is parsed once, projected to the
+    model columns and cached. Seasons written directly by base_data_grab are served as
+    is unless the xlsx is newer than the fetch
+
+    Returns:
+        pd.DataFrame: Projected Torvik data
+    """
+    data_path, meta_path = cache_paths(file_path)
+    meta = read_cache_meta(file_path)
+
+    if meta is not None and os.path.exists(data_path):
+        if not os.path.exists(file_path):
+            _record_cache_read(data_path, hit=True)
+            return select_columns(pd.read_pickle(data_path), columns)
+
+        source = meta['source']
+        stat = os.stat(file_path)
+        fresh = source.get('mtime') == stat.st_mtime_ns and source.get('size') == stat.st_size
+        if 'fetched_at' in source:
+            # Written by base_data_grab: fresh unless the xlsx was saved after the fetch
+            fresh = stat.st_mtime_ns <= source['fetched_at']
+        if not fresh and source.get('sha1') == file_sha1(file_path):
+            # Touched but unchanged: remember the new mtime so the hash is skipped next time
+            meta['source'] = source_info(file_path, source['sha1'])
+            with open(meta_path, 'w') as f:
+                json.dump(meta, f)
+            fresh = True
+        if fresh:
+            _record_cache_read(data_path, hit=True)
+            return select_columns(pd.read_pickle(data_path), columns)
+
+    _record_cache_read(file_path, hit=False)
+    df = project_columns(pd.read_excel(file_path), MODEL_COLUMNS)
+    try:
+        write_cache(df, file_path, source_info(file_path))
+    except OSError as e:
+        print(f"Error writing Torvik cache for {file_path}: {e}")
+    return select_columns(df, columns)
@@ -0,0 +1,143 @@
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from head_to_head import load_team_table, predict_winners_batch
+
+# Column names of the advancement table: P(team wins its game in round r)
+ROUND_NAMES = ['Round of 32', 'Sweet 16', 'Elite 8', 'Final Four', 'Championship', 'Champion']
+
+def load_field(matchups_file='matchups.xlsx'):
+    """
+    The 64-team field in bracket order, taken from the 32 first-round games of matchups.xlsx
+
+    Returns:
+        pd.DataFrame: team and seed columns, one row per bracket slot
+    """
+    matchups = pd.read_excel(matchups_file).head(32)
+    teams = []
+    seeds = []
+    for _, row in matchups.iterrows():
+        teams += [row['team_1'], row['team_2']]
+        seeds += [row['seed_1'], row['seed_2']]
+    return pd.DataFrame({'team': teams, 'seed': seeds})
+
+def win_probability_matrix(teams, table):
+    """
+    Pairwise predict_winner probabilities for the field, evaluated in one batch
+
+    Returns:
+        np.ndarray: P[a, b] = probability that bracket slot a beats slot b
+    """
+    ids = table.team_ids(teams)
+    n = len(ids)
+    a, b = np.meshgrid(np.arange(n), np.arange(n), indexing='ij')
+    batch = predict_winners_batch(ids[a.ravel()], ids[b.ravel()], table=table)
+    P = batch['team1_win_probability'].reshape(n, n)
+    np.fill_diagonal(P, 0.5)
+    return P
+
+def simulate_bracket(P, n_sims, rng):
+    """
+    Play n_sims tournaments at once. Every round is one vectorized draw over all
+    simulations: slot pairs (0, 1), (2, 3), ... meet and the winners move on
+
+    Returns:
+        np.ndarray: counts[r, t] = number of simulations in which team t won its round r game
+    """
+    n_teams = P.shape[0]
+    n_rounds = int(np.log2(n_teams))
+    counts = np.zeros((n_rounds, n_teams), dtype=np.int64)
+    alive = np.broadcast_to(np.arange(n_teams, dtype=np.intp), (n_sims, n_teams))
+    for r in range(n_rounds):
+        top = alive[:, 0::2]
+        bottom = alive[:, 1::2]
+        alive = np.where(rng.random(top.shape) < P[top, bottom], top, bottom)
+        counts[r] = np.bincount(alive.ravel(), minlength=n_teams)
+    return counts
+
+def sample_brackets(P, n_brackets, rng):
+    """
+    Draw complete brackets from the probability matrix
+
+    Returns:
+        np.ndarray: winners[b, g] = slot of the team that wins game g in bracket b, with
+        games in bracket.html order (0-31 first round, 32-47 second round, ..., 62 title)
+    """
+    n_teams = P.shape[0]
+    alive = np.broadcast_to(np.arange(n_teams, dtype=np.intp), (n_brackets, n_teams))
+    rounds = []
+    while alive.shape[1] > 1:
+        top = alive[:, 0::2]
+        bottom = alive[:, 1::2]
+        alive = np.where(rng.random(top.shape) < P[top, bottom], top, bottom)
+        rounds.append(alive)
+    return np.concatenate(rounds, axis=1)
+
+def game_rounds(n_teams=64):
+    """
+    Round index (0 = first round) of every game, in bracket.html order
+    """
+    n_rounds = int(np.log2(n_teams))
+    return np.repeat(np.arange(n_rounds), [n_teams >> (r + 1) for r in range(n_rounds)])
+
+def _simulate_chunk(args):
+    P, n_sims, seed_seq = args
+    return simulate_bracket(P, n_sims, np.random.default_rng(seed_seq))
+
+def run_simulation(P, n_sims=1_000_000, seed=0, workers=None, chunk_size=100_000):
+    """
+    Run n_sims tournaments spread over a process pool.
+
+    The work is cut into fixed-size chunks, each seeded from its own child of one
+    SeedSequence, so results depend only on seed and chunk_size, not on the number
+    of workers
+
+    Returns:
+        np.ndarray: Advancement probabilities, shape (rounds, teams)
+    """
+    n_chunks = -(-n_sims // chunk_size)
+    sizes = [min(chunk_size, n_sims - i * chunk_size) for i in range(n_chunks)]
+    seeds = np.random.SeedSequence(seed).spawn(n_chunks)
+    tasks = [(P, size, seq) for size, seq in zip(sizes, seeds)]
+
+    if workers == 1 or n_chunks == 1:
+        counts = sum(map(_simulate_chunk, tasks))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            counts = sum(pool.map(_simulate_chunk, tasks))
+    return counts / n_sims
+
+def advancement_table(field, probabilities):
+    """
+    Combine the field with per-round probabilities into a table sorted by title odds
+    """
+    table = field.copy()
+    for r, name in enumerate(ROUND_NAMES[:probabilities.shape[0]]):
+        table[name] = probabilities[r]
+    return table.sort_values(ROUND_NAMES[probabilities.shape[0] - 1], ascending=False).reset_index(drop=True)
+
+# Example usage
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Monte Carlo tournament simulation")
+    parser.add_argument('--sims', type=int, default=1_000_000, help="Number of tournaments to simulate")
+    parser.add_argument('--seed', type=int, default=0, help="Base random seed")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="Worker processes")
+    parser.add_argument('--output', help="Optional path to save the advancement table (.csv or .xlsx)")
+    args = parser.parse_args()
+
+    field = load_field()
+    table = load_team_table()
+    P = win_probability_matrix(field['team'], table)
+    probabilities = run_simulation(P, args.sims, args.seed, args.workers)
+    results = advancement_table(field, probabilities)
+
+    pd.set_option('display.width', 200)
+    print(results.to_string(float_format=lambda x: f"{x:.1%}"))
+    if args.output:
+        if args.output.endswith('.xlsx'):
+            results.to_excel(args.output, index=False)
+        else:
+            results.to_csv(args.output, index=False)
+        print(f"\nResults saved to {args.output}")
@@ -0,0 +1,149 @@
+import json
+import os
+from datetime import datetime
+import numpy as np
+
+CONFIG_VERSION = 1
+DEFAULT_CONFIG_FILE = 'model_weights.json'
+
+# Model features, in the order they are summed. Each is a team1 - team2 difference
+# (offense/defense compare one team's offense with the other's defense)
+FEATURES = ['win_pct', 'offense', 'defense', 'barthag', 'WORTH', 'PRIME', 'ROAD', 'NERVE']
+
+# Hand-tuned coefficients, used when no model_weights.json is present
+DEFAULT_CONFIG = {
+    'version': CONFIG_VERSION,
+    'weights': {
+        'win_pct': 0.03,
+        'offense': 0.07,
+        'defense': 0.07,
+        'barthag': 0.22,
+        'WORTH': 0.04,
+        'PRIME': 0.06,
+        'ROAD': 0.02,
+        'NERVE': 0.02,
+    },
+    'close_game': {'low': 0.45, 'high': 0.55},
+}
+
+_config_cache = {}
+
+def load_model_config(file_path=DEFAULT_CONFIG_FILE):
+    """
+    Model coefficients from a versioned config file, re-read only when the file
+    changes. Falls back to DEFAULT_CONFIG if the file is missing or invalid
+    """
+    try:
+        mtime = os.stat(file_path).st_mtime_ns
+    except OSError:
+        return DEFAULT_CONFIG
+
+    cached = _config_cache.get(file_path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    try:
+        with open(file_path) as f:
+            config = json.load(f)
+        if config.get('version') != CONFIG_VERSION:
+            raise ValueError(f"unsupported config version {config.get('version')}")
+        missing = [name for name in FEATURES if name not in config['weights']]
+        if missing:
+            raise ValueError(f"missing weights {missing}")
+        if not {'low', 'high'} <= set(config.get('close_game', {})):
+            raise ValueError("missing close_game band")
+    except Exception as e:
+        print(f"Error loading model config {file_path}, using default weights: {e}")
+        config = DEFAULT_CONFIG
+
+    _config_cache[file_path] = (mtime, config)
+    return config
+
+def save_model_config(weights, close_low, close_high, file_path=DEFAULT_CONFIG_FILE, metadata=None):
+    """
+    Write fitted coefficients as a versioned config file
+
+    Args:
+        weights (array-like): One coefficient per entry of FEATURES
+        close_low (float): Lower edge of the close-game band
+        close_high (float): Upper edge of the close-game band
+        metadata (dict, optional): Extra information stored with the fit (seasons, scores, ...)
+    """
+    config = {
+        'version': CONFIG_VERSION,
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'weights': {name: float(w) for name, w in zip(FEATURES, weights)},
+        'close_game': {'low': float(close_low), 'high': float(close_high)},
+        'metadata': metadata or {},
+    }
+    with open(file_path, 'w') as f:
+        json.dump(config, f, indent=2)
+    return config
+
+def weight_vector(config):
+    """
+    Coefficients of a config as an array in FEATURES order
+    """
+    return np.array([config['weights'][name] for name in FEATURES])
+
+def matchup_features(table, team1_ids, team2_ids):
+    """
+    Feature matrix of matchups from a TeamTable
+
+    Returns:
+        np.ndarray: Shape (matchups, len(FEATURES))
+    """
+    i = np.asarray(team1_ids, dtype=np.intp)
+    j = np.asarray(team2_ids, dtype=np.intp)
+    return np.stack([
+        table.win_pct[i] - table.win_pct[j],
+        (table.adjoe[i] - table.adjde[j]) / 100,
+        (table.adjoe[j] - table.adjde[i]) / -100,
+        table.barthag[i] - table.barthag[j],
+        table.WORTH[i] - table.WORTH[j],
+        table.PRIME[i] - table.PRIME[j],
+        table.ROAD[i] - table.ROAD[j],
+        table.NERVE[i] - table.NERVE[j],
+    ], axis=-1)
+
+def linear_probability(features, weights):
+    """
+    0.5 + weighted feature sum, clipped to [0.01, 0.99].
+
+    Terms are added one at a time in FEATURES order, the same order as the expression
+    in predict_winner, so results are bit-identical to it. weights may carry leading
+    dimensions (e.g. a grid of weight vectors), which broadcast against the matchups
+
+    Returns:
+        np.ndarray: Shape weights.shape[:-1] + (matchups,)
+    """
+    weights = np.asarray(weights, dtype=float)
+    total = weights[..., 0, None] * features[..., 0]
+    for k in range(1, len(FEATURES)):
+        total = total + weights[..., k, None] * features[..., k]
+    return np.clip(0.5 + total, 0.01, 0.99)
+
+def close_game_adjustment(win_prob, features, close_low=0.45, close_high=0.55):
+    """
+    WORTH, PRIME and NERVE nudges for games whose probability falls inside the
+    close-game band. close_low/close_high may be arrays that broadcast against win_prob
+    """
+    worth_advantage = features[..., FEATURES.index('WORTH')]
+    prime_advantage = features[..., FEATURES.index('PRIME')]
+    nerve_advantage = features[..., FEATURES.index('NERVE')]
+
+    close = (win_prob > close_low) & (win_prob < close_high)
+    closeness = 1 - np.abs(win_prob - 0.5) / 0.1
+    for advantage in (worth_advantage, prime_advantage):
+        adjustment = np.minimum(np.abs(advantage), 0.5) * 0.08
+        win_prob = np.where(close, np.where(advantage > 0, win_prob + adjustment, win_prob - adjustment), win_prob)
+    nerve_adjustment = (0.02 + (0.04 * closeness)) * (0.35 + np.minimum(np.abs(nerve_advantage), 0.5))
+    return np.where(close, np.where(nerve_advantage > 0, win_prob + nerve_adjustment, win_prob - nerve_adjustment), win_prob)
+
+def model_probability(features, config=None):
+    """
+    Final team1 win probability of the model for a feature matrix
+    """
+    config = config or load_model_config()
+    win_prob = linear_probability(features, weight_vector(config))
+    return close_game_adjustment(win_prob, features, config['close_game']['low'], config['close_game']['high'])